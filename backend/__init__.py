@@ -0,0 +1,150 @@
+"""
+NeuroPilot Backend Package
+Server-side building blocks for the voice practice API (/api/audio/*):
+model request scheduling, mock providers and pipeline helpers.
+"""
+
+from .llm_scheduler import (
+    LLMScheduler,
+    Priority,
+    RateLimitError,
+    TokenBucket,
+    retry_after_from_headers
+)
+
+from .mock_providers import (
+    InMemoryMongoDatabase,
+    MockLLMProvider,
+    MockSTTProvider,
+    MockTTSProvider,
+    MockUpdateOne
+)
+
+from .mock_servers import MockProviderServer
+
+from .feedback_jobs import (
+    FeedbackJobQueue,
+    build_stream_response,
+    format_sse
+)
+
+from .tts_stream import (
+    SentenceChunker,
+    split_sentences,
+    stream_tts,
+    ndjson_audio_stream,
+    gtts_synthesizer,
+    elevenlabs_synthesizer
+)
+
+from .audio_cache import (
+    AudioCache,
+    get_deterministic_lines
+)
+
+from .audio_store import (
+    AudioBufferStore,
+    audio_url,
+    build_audio_response
+)
+
+from .audio_preprocess import (
+    find_speech_bounds,
+    preprocess_upload
+)
+
+from .stt_stream import (
+    StreamingTranscriber,
+    groq_transcriber,
+    run_transcription_session
+)
+
+from .speculative_reply import (
+    SpeculativeReplier,
+    build_reply_system_prompt,
+    transcripts_match
+)
+
+from .session_store import (
+    Session,
+    SessionStore
+)
+
+from .persistence import (
+    WriteBehindWriter,
+    ensure_indexes
+)
+
+from .telemetry import (
+    MetricsRegistry,
+    Tracer,
+    build_metrics_response,
+    current_request_id
+)
+
+__all__ = [
+    # LLM Scheduler
+    'LLMScheduler',
+    'Priority',
+    'RateLimitError',
+    'TokenBucket',
+    'retry_after_from_headers',
+    
+    # Mock Providers
+    'MockLLMProvider',
+    'MockSTTProvider',
+    'MockTTSProvider',
+    'MockUpdateOne',
+    'MockProviderServer',
+    'InMemoryMongoDatabase',
+    
+    # Deferred Feedback Jobs
+    'FeedbackJobQueue',
+    'build_stream_response',
+    'format_sse',
+    
+    # Streaming TTS
+    'SentenceChunker',
+    'split_sentences',
+    'stream_tts',
+    'ndjson_audio_stream',
+    'gtts_synthesizer',
+    'elevenlabs_synthesizer',
+    
+    # TTS Audio Cache
+    'AudioCache',
+    'get_deterministic_lines',
+    
+    # Binary Audio Transport
+    'AudioBufferStore',
+    'audio_url',
+    'build_audio_response',
+    
+    # Upload Audio Preprocessing
+    'find_speech_bounds',
+    'preprocess_upload',
+    
+    # Streaming Speech-to-Text
+    'StreamingTranscriber',
+    'groq_transcriber',
+    'run_transcription_session',
+    
+    # Speculative Reply Generation
+    'SpeculativeReplier',
+    'build_reply_system_prompt',
+    'transcripts_match',
+    
+    # Session Store
+    'Session',
+    'SessionStore',
+    
+    # Write-Behind Persistence
+    'WriteBehindWriter',
+    'ensure_indexes',
+    
+    # Pipeline Telemetry
+    'MetricsRegistry',
+    'Tracer',
+    'build_metrics_response',
+    'current_request_id',
+]
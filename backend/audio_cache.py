@@ -0,0 +1,282 @@
+"""
+NeuroPilot - TTS Audio Cache
+Content-hashed cache of synthesized audio keyed by (text, voice, engine, format),
+pre-warmed at startup with the fixed lines NeuroPilot speaks over and over
+(quick encouragements, check-ins, exit lines). Memory LRU with a byte cap plus
+an optional size-capped disk tier.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+from prompts.adaptive_agent_system import CONVERSATION_CHECKPOINT_SYSTEM
+from prompts.summary_prompts import QUICK_ENCOURAGEMENT_TEMPLATES
+
+# Quoted bullet lines, e.g. - "Want to keep going, or is this a good place to pause?"
+_QUOTED_LINE = re.compile(r'^- "(.+)"$', re.MULTILINE)
+
+
+def get_deterministic_lines() -> list:
+    """
+    Fixed text worth pre-rendering: quick encouragements plus the check-in and exit lines.
+    """
+    lines = list(QUICK_ENCOURAGEMENT_TEMPLATES)
+    for line in _QUOTED_LINE.findall(CONVERSATION_CHECKPOINT_SYSTEM):
+        if line not in lines:
+            lines.append(line)
+    return lines
+
+
+def make_audio_key(text: str, voice: str, engine: str, audio_format: str = "mp3") -> str:
+    """Hex SHA-256 over everything that changes the rendered audio."""
+    return hashlib.sha256(f"{engine}\0{voice}\0{audio_format}\0{text.strip()}".encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """
+    Two-tier cache of rendered TTS audio.
+
+    Memory tier: LRU bounded by total bytes. Disk tier (optional): one file
+    per key, least recently used files evicted once the directory exceeds
+    max_disk_bytes. The directory is scanned once at startup; after that its
+    size and LRU order are tracked in memory.
+    """
+
+    def __init__(self, max_memory_bytes: int = 32 * 1024 * 1024, cache_dir: str = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = cache_dir
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.chars_saved = 0  # Characters we did not send to the TTS provider
+        self._entries = OrderedDict()  # key -> audio bytes
+        self._disk_entries = OrderedDict()  # file path -> size, least recently used first
+        self._lock = threading.Lock()
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._scan_disk()
+
+    def get(self, text: str, voice: str, engine: str, audio_format: str = "mp3") -> bytes:
+        """
+        Look up rendered audio.
+
+        Returns:
+            Audio bytes, or None on a miss
+        """
+        key = make_audio_key(text, voice, engine, audio_format)
+        audio = self._get_memory(key, text)
+        if audio is None:
+            audio = self._get_disk(key, text, audio_format)
+        return audio
+
+    def put(self, text: str, voice: str, engine: str, audio: bytes, audio_format: str = "mp3"):
+        """Store rendered audio in both tiers."""
+        key = make_audio_key(text, voice, engine, audio_format)
+        with self._lock:
+            self._store(key, audio)
+        self._write_disk(key, audio_format, audio)
+
+    async def get_or_synthesize(self, text: str, voice: str, engine: str, synthesize,
+                                audio_format: str = "mp3") -> bytes:
+        """
+        Return cached audio or render it with `synthesize` (async callable(text) -> bytes) and cache it.
+
+        Disk reads and writes run in a worker thread so they never block the event loop.
+        """
+        key = make_audio_key(text, voice, engine, audio_format)
+        audio = self._get_memory(key, text)
+        if audio is None:
+            audio = await self._run_disk(self._get_disk, key, text, audio_format)
+        if audio is None:
+            audio = await synthesize(text)
+            await self._put_async(key, audio, audio_format)
+        return audio
+
+    def cached_synthesizer(self, synthesize, voice: str, engine: str, audio_format: str = "mp3"):
+        """Wrap a synthesize() callable (e.g., for stream_tts) so it goes through this cache."""
+        async def cached(text):
+            return await self.get_or_synthesize(text, voice, engine, synthesize, audio_format)
+        return cached
+
+    async def prewarm(self, voices: list, engine: str, synthesize_for_voice, lines: list = None,
+                      audio_format: str = "mp3", max_concurrency: int = 2) -> int:
+        """
+        Render deterministic lines for each voice ahead of time (call at startup).
+
+        Args:
+            voices: Voice/avatar ids to render for
+            engine: Engine name used in the cache key ('elevenlabs', 'gtts')
+            synthesize_for_voice: Callable(voice) -> async synthesize(text) -> bytes
+            lines: Texts to render (defaults to get_deterministic_lines())
+            max_concurrency: Parallel synthesis requests
+
+        Returns:
+            Number of lines newly rendered (already cached lines are skipped)
+        """
+        lines = lines if lines is not None else get_deterministic_lines()
+        slots = asyncio.Semaphore(max_concurrency)
+        rendered = 0
+
+        async def warm(voice, synthesize, text):
+            nonlocal rendered
+            key = make_audio_key(text, voice, engine, audio_format)
+            if self._contains(key, audio_format):
+                return
+            async with slots:
+                audio = await synthesize(text)
+            await self._put_async(key, audio, audio_format)
+            rendered += 1
+
+        tasks = []
+        for voice in voices:
+            synthesize = synthesize_for_voice(voice)
+            tasks.extend(warm(voice, synthesize, text) for text in lines)
+        await asyncio.gather(*tasks)
+        return rendered
+
+    def stats(self) -> dict:
+        """Hit-rate and size metrics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self.memory_bytes,
+                "disk_entries": len(self._disk_entries),
+                "disk_bytes": self.disk_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "chars_saved": self.chars_saved
+            }
+
+    def _get_memory(self, key, text):
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.chars_saved += len(text)
+            return audio
+
+    def _get_disk(self, key, text, audio_format):
+        audio = self._read_disk(key, audio_format)
+        with self._lock:
+            if audio is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self.chars_saved += len(text)
+            self._store(key, audio)
+        return audio
+
+    async def _put_async(self, key, audio, audio_format):
+        with self._lock:
+            self._store(key, audio)
+        await self._run_disk(self._write_disk, key, audio_format, audio)
+
+    async def _run_disk(self, function, *args):
+        # Without a disk tier the helpers return immediately; skip the thread hop
+        if not self.cache_dir:
+            return function(*args)
+        return await asyncio.to_thread(function, *args)
+
+    def _store(self, key, audio):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.memory_bytes -= len(old)
+        if len(audio) > self.max_memory_bytes:
+            return
+        self._entries[key] = audio
+        self.memory_bytes += len(audio)
+        while self.memory_bytes > self.max_memory_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+
+    def _contains(self, key, audio_format):
+        path = self._disk_path(key, audio_format)
+        with self._lock:
+            return key in self._entries or path in self._disk_entries
+
+    def _disk_path(self, key, audio_format):
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"{key}.{audio_format}")
+
+    def _scan_disk(self):
+        files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        for _, size, path in sorted(files):
+            self._disk_entries[path] = size
+            self.disk_bytes += size
+        self._evict_disk()
+
+    def _read_disk(self, key, audio_format):
+        path = self._disk_path(key, audio_format)
+        with self._lock:
+            if path not in self._disk_entries:
+                return None
+            self._disk_entries.move_to_end(path)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except OSError:
+            with self._lock:
+                size = self._disk_entries.pop(path, None)
+                if size is not None:
+                    self.disk_bytes -= size
+            return None
+        try:
+            os.utime(path)  # Keeps LRU order across restarts
+        except OSError:
+            pass
+        return audio
+
+    def _write_disk(self, key, audio_format, audio):
+        path = self._disk_path(key, audio_format)
+        if path is None:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.disk_bytes += len(audio) - self._disk_entries.pop(path, 0)
+            self._disk_entries[path] = len(audio)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        with self._lock:
+            evicted = []
+            while self.disk_bytes > self.max_disk_bytes and self._disk_entries:
+                path, size = self._disk_entries.popitem(last=False)
+                self.disk_bytes -= size
+                evicted.append(path)
+        for path in evicted:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+
+# Export all components
+__all__ = [
+    'AudioCache',
+    'get_deterministic_lines',
+    'make_audio_key'
+]
@@ -0,0 +1,142 @@
+"""
+NeuroPilot - Upload Audio Preprocessing
+Prepares the MediaRecorder upload from /api/audio/converse before STT:
+energy-based voice activity trimming of leading/trailing silence, downmix and
+resample to 16 kHz mono, and compact re-encoding (Opus in Ogg by default).
+If the re-encode is not smaller than the upload, the original bytes are sent
+unchanged. Reports bytes saved and time spent so the gain is visible per turn.
+"""
+
+import io
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from pydub import AudioSegment
+except ImportError:
+    AudioSegment = None
+
+STT_SAMPLE_RATE = 16000  # What Whisper-family STT models work at internally
+
+
+def find_speech_bounds(samples, sample_rate: int, frame_ms: int = 30, min_db: float = -50.0,
+                       margin_db: float = 12.0, speech_db: float = -35.0, padding_ms: int = 200):
+    """
+    Locate speech in mono int16 samples with a frame-energy VAD.
+
+    A frame counts as speech when its RMS level is above min_db (dBFS) and
+    above the estimated noise floor (10th percentile frame level) + margin_db.
+    The relative threshold is capped at speech_db, so a clip with no silence
+    (where the 10th percentile is itself speech) is not trimmed into its
+    loudest frames.
+
+    Args:
+        samples: 1-D int16 NumPy array
+        sample_rate: Samples per second
+        frame_ms: Analysis frame length
+        min_db: Absolute floor below which nothing is speech
+        margin_db: How far above the noise floor speech must be
+        speech_db: Absolute level (dBFS) at or above which a frame is always speech
+        padding_ms: Audio kept before the first and after the last speech frame
+
+    Returns:
+        (start_sample, end_sample) to keep, or None if no speech was found
+    """
+    frame_len = max(int(sample_rate * frame_ms / 1000), 1)
+    frame_count = len(samples) // frame_len
+    if frame_count == 0:
+        return None
+
+    frames = samples[:frame_count * frame_len].astype(np.float32).reshape(frame_count, frame_len)
+    rms = np.sqrt(np.mean(frames * frames, axis=1)) / 32768.0
+    levels_db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+    threshold = max(min_db, min(float(np.percentile(levels_db, 10)) + margin_db, speech_db))
+    voiced = np.flatnonzero(levels_db > threshold)
+    if voiced.size == 0:
+        return None
+
+    padding = int(sample_rate * padding_ms / 1000)
+    start = max(int(voiced[0]) * frame_len - padding, 0)
+    end = min((int(voiced[-1]) + 1) * frame_len + padding, len(samples))
+    return start, end
+
+
+def preprocess_upload(data: bytes, input_format: str = None, output_format: str = "ogg",
+                      target_rate: int = STT_SAMPLE_RATE, trim_silence: bool = True,
+                      frame_ms: int = 30, padding_ms: int = 200):
+    """
+    Trim, downmix, resample and re-encode an uploaded recording for STT.
+
+    Args:
+        data: Raw upload bytes (MediaRecorder output; often webm/opus despite the .wav label)
+        input_format: Container hint for ffmpeg, or None to let it sniff
+        output_format: 'ogg' (opus), 'mp3', 'flac' or 'wav'
+        target_rate: Output sample rate
+        trim_silence: Apply the energy VAD
+        frame_ms: VAD frame length
+        padding_ms: Audio kept around detected speech
+
+    Returns:
+        tuple: (processed_bytes, report dict with bytes_in, bytes_out, bytes_saved,
+        duration_in_ms, duration_out_ms, speech_detected, reencoded, elapsed_ms, format);
+        processed_bytes is the original upload (reencoded=False, format=input_format)
+        when re-encoding would not make it smaller
+    """
+    if AudioSegment is None or np is None:
+        raise ImportError("Audio preprocessing requires pydub and numpy (and ffmpeg for compressed formats)")
+
+    started = time.perf_counter()
+    segment = AudioSegment.from_file(io.BytesIO(data), format=input_format)
+    duration_in_ms = len(segment)
+
+    segment = segment.set_channels(1).set_frame_rate(target_rate).set_sample_width(2)
+
+    speech_detected = True
+    if trim_silence:
+        samples = np.frombuffer(segment.raw_data, dtype=np.int16)
+        bounds = find_speech_bounds(samples, target_rate, frame_ms=frame_ms, padding_ms=padding_ms)
+        if bounds is None:
+            speech_detected = False
+        else:
+            start, end = bounds
+            segment = segment._spawn(samples[start:end].tobytes())
+
+    buffer = io.BytesIO()
+    export_args = {"format": output_format}
+    if output_format == "ogg":
+        export_args["codec"] = "libopus"
+        export_args["bitrate"] = "24k"
+    elif output_format == "mp3":
+        export_args["bitrate"] = "32k"
+    segment.export(buffer, **export_args)
+    processed = buffer.getvalue()
+
+    reencoded = len(processed) < len(data)
+    if not reencoded:
+        processed = data
+
+    report = {
+        "bytes_in": len(data),
+        "bytes_out": len(processed),
+        "bytes_saved": len(data) - len(processed),
+        "duration_in_ms": duration_in_ms,
+        "duration_out_ms": len(segment) if reencoded else duration_in_ms,
+        "speech_detected": speech_detected,
+        "reencoded": reencoded,
+        "elapsed_ms": (time.perf_counter() - started) * 1000.0,
+        "format": output_format if reencoded else input_format
+    }
+    return processed, report
+
+
+# Export all components
+__all__ = [
+    'STT_SAMPLE_RATE',
+    'find_speech_bounds',
+    'preprocess_upload'
+]
@@ -0,0 +1,175 @@
+"""
+NeuroPilot - Binary Audio Transport
+Short-lived in-memory store for rendered audio so /api/audio/start and
+/api/audio/converse can return an audio URL instead of base64-in-JSON.
+Bytes are kept as-is and served through memoryview slices (no copies),
+with HTTP range support for the browser's <audio> element.
+"""
+
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+AUDIO_URL_PREFIX = "/api/audio/clip/"
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """The Range header does not overlap the clip (HTTP 416)."""
+
+
+def parse_range_header(range_header: str, size: int):
+    """
+    Parse a single-range 'Range: bytes=start-end' header.
+
+    Args:
+        range_header: Header value, or None
+        size: Total clip size in bytes
+
+    Returns:
+        (start, end) inclusive byte offsets, or None to serve the whole clip
+
+    Raises:
+        RangeNotSatisfiable: If the range is outside the clip
+    """
+    if not range_header:
+        return None
+    match = _RANGE.match(range_header.strip())
+    if match is None:
+        return None  # Multi-range or malformed: ignore and send everything
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # Suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable(range_header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(range_header)
+    return start, end
+
+
+class AudioBufferStore:
+    """
+    TTL + byte-capped store of audio clips addressed by random ids.
+
+    Clips are held as the bytes objects the TTS engine returned (not
+    re-encoded or copied); reads hand out memoryview slices.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_bytes: int = 64 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._clips = OrderedDict()  # audio_id -> (bytes, content_type, expires_at)
+        self._lock = threading.Lock()
+
+    def put(self, audio: bytes, content_type: str = "audio/mpeg") -> str:
+        """
+        Store a clip.
+
+        Returns:
+            audio_id for audio_url()
+        """
+        audio_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._clips[audio_id] = (audio, content_type, now + self.ttl_seconds)
+            self.total_bytes += len(audio)
+            self._evict(now)
+        return audio_id
+
+    def get(self, audio_id: str):
+        """
+        Fetch a clip.
+
+        Returns:
+            (memoryview, content_type, expires_at), or None if unknown/expired
+        """
+        with self._lock:
+            entry = self._clips.get(audio_id)
+            if entry is None:
+                return None
+            audio, content_type, expires_at = entry
+            if expires_at < time.time():
+                del self._clips[audio_id]
+                self.total_bytes -= len(audio)
+                return None
+        return memoryview(audio), content_type, expires_at
+
+    def discard(self, audio_id: str):
+        """Drop a clip early (e.g., session ended)."""
+        with self._lock:
+            entry = self._clips.pop(audio_id, None)
+            if entry is not None:
+                self.total_bytes -= len(entry[0])
+
+    def _evict(self, now):
+        # Oldest first: expired clips, then anything over the byte cap
+        while self._clips:
+            audio_id, (audio, _, expires_at) = next(iter(self._clips.items()))
+            if expires_at >= now and self.total_bytes <= self.max_bytes:
+                break
+            del self._clips[audio_id]
+            self.total_bytes -= len(audio)
+
+
+def audio_url(audio_id: str) -> str:
+    """URL the JSON response carries instead of base64 audio."""
+    return f"{AUDIO_URL_PREFIX}{audio_id}"
+
+
+def build_audio_response(store: AudioBufferStore, audio_id: str, range_header: str = None):
+    """
+    Framework-agnostic body of the audio clip endpoint.
+
+    Args:
+        store: AudioBufferStore holding the clip
+        audio_id: Id from the URL path
+        range_header: Value of the request's Range header, if any
+
+    Returns:
+        (status_code, headers dict, body memoryview or b"")
+    """
+    entry = store.get(audio_id)
+    if entry is None:
+        return 404, {}, b""
+    audio, content_type, expires_at = entry
+    size = len(audio)
+    headers = {
+        "Content-Type": content_type,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"private, max-age={max(int(expires_at - time.time()), 0)}",
+        "ETag": f'"{audio_id}"'
+    }
+
+    try:
+        byte_range = parse_range_header(range_header, size)
+    except RangeNotSatisfiable:
+        headers["Content-Range"] = f"bytes */{size}"
+        return 416, headers, b""
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return 200, headers, audio
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return 206, headers, audio[start:end + 1]
+
+
+# Export all components
+__all__ = [
+    'AudioBufferStore',
+    'RangeNotSatisfiable',
+    'audio_url',
+    'build_audio_response',
+    'parse_range_header'
+]
@@ -0,0 +1,239 @@
+"""
+NeuroPilot - Deferred Feedback Jobs
+Runs feedback and overall-summary work in the background so /api/audio/converse
+can return the reply and audio immediately with a job id. Results are
+delivered per session_id via polling or server-sent events (SSE).
+"""
+
+import asyncio
+import itertools
+import json
+import time
+import uuid
+
+JOB_PENDING = "pending"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def format_sse(event: str, data: dict, event_id: int = None) -> str:
+    """
+    Format one server-sent event frame.
+
+    Args:
+        event: Event name (e.g., 'feedback', 'overall_summary')
+        data: JSON-serializable payload
+        event_id: Optional id so clients can resume with Last-Event-ID
+
+    Returns:
+        SSE frame text ending with a blank line
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class _SessionChannel:
+    __slots__ = ("events", "condition", "updated_at")
+
+    def __init__(self):
+        self.events = []  # list of (event_id, event_name, payload)
+        self.condition = asyncio.Condition()
+        self.updated_at = time.time()
+
+
+class FeedbackJobQueue:
+    """
+    Background job runner with per-session result channels.
+
+    submit() starts the work as an asyncio task and returns a job id right
+    away. When the job finishes, an event named after its kind (e.g.,
+    'feedback') is appended to the session channel, where poll() and
+    stream() pick it up.
+    """
+
+    def __init__(self, session_ttl_seconds: float = 3600):
+        self.session_ttl_seconds = session_ttl_seconds
+        self._jobs = {}
+        self._channels = {}
+        self._event_ids = itertools.count(1)
+        self._tasks = set()
+
+    def _channel(self, session_id: str) -> _SessionChannel:
+        channel = self._channels.get(session_id)
+        if channel is None:
+            channel = self._channels[session_id] = _SessionChannel()
+        return channel
+
+    def submit(self, session_id: str, kind: str, work) -> str:
+        """
+        Start a background job.
+
+        Args:
+            session_id: Session the result belongs to
+            kind: Event name for the result ('feedback', 'overall_summary', ...)
+            work: Zero-argument async callable returning a JSON-serializable result
+
+        Returns:
+            Job id to hand back to the client
+        """
+        job_id = uuid.uuid4().hex
+        self._jobs[job_id] = {
+            "job_id": job_id,
+            "session_id": session_id,
+            "kind": kind,
+            "status": JOB_PENDING,
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "finished_at": None
+        }
+        self._channel(session_id)
+        task = asyncio.create_task(self._run(job_id, work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job_id
+
+    async def _run(self, job_id: str, work):
+        job = self._jobs[job_id]
+        try:
+            job["result"] = await work()
+            job["status"] = JOB_DONE
+        except asyncio.CancelledError:
+            job["status"] = JOB_FAILED
+            job["error"] = "cancelled"
+            raise
+        except Exception as exc:
+            job["status"] = JOB_FAILED
+            job["error"] = str(exc)
+        finally:
+            job["finished_at"] = time.time()
+            await self._publish(job)
+
+    async def _publish(self, job: dict):
+        channel = self._channel(job["session_id"])
+        payload = {
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "result": job["result"],
+            "error": job["error"]
+        }
+        async with channel.condition:
+            channel.events.append((next(self._event_ids), job["kind"], payload))
+            channel.updated_at = time.time()
+            channel.condition.notify_all()
+
+    def get_job(self, job_id: str) -> dict:
+        """Return the job record, or None if unknown."""
+        return self._jobs.get(job_id)
+
+    def pending_jobs(self, session_id: str) -> list:
+        """Ids of jobs for a session that have not finished yet."""
+        return [
+            job["job_id"] for job in self._jobs.values()
+            if job["session_id"] == session_id and job["status"] == JOB_PENDING
+        ]
+
+    def poll(self, session_id: str, after: int = 0) -> list:
+        """
+        Polling endpoint body: events for a session newer than `after`.
+
+        Returns:
+            List of dicts with 'id', 'event' and 'data'
+        """
+        channel = self._channels.get(session_id)
+        if channel is None:
+            return []
+        return [
+            {"id": event_id, "event": event, "data": payload}
+            for event_id, event, payload in channel.events
+            if event_id > after
+        ]
+
+    def stream(self, session_id: str, after: int = 0, heartbeat_seconds: float = 15.0):
+        """
+        SSE endpoint body: async generator of frames for new events until the client disconnects.
+
+        Only sessions that already have a channel (a job was submitted) can be
+        followed, so arbitrary ids cannot allocate channels.
+
+        Args:
+            session_id: Session to follow
+            after: Last event id the client has seen (Last-Event-ID header)
+            heartbeat_seconds: Send a comment frame this often to keep proxies open
+
+        Raises:
+            KeyError: If the session is unknown (respond 404)
+        """
+        channel = self._channels.get(session_id)
+        if channel is None:
+            raise KeyError(session_id)
+        return self._stream(channel, after, heartbeat_seconds)
+
+    async def _stream(self, channel: _SessionChannel, last_id: int, heartbeat_seconds: float):
+        while True:
+            async with channel.condition:
+                fresh = [item for item in channel.events if item[0] > last_id]
+                if not fresh:
+                    try:
+                        await asyncio.wait_for(channel.condition.wait(), timeout=heartbeat_seconds)
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+                        continue
+                    fresh = [item for item in channel.events if item[0] > last_id]
+            for event_id, event, payload in fresh:
+                last_id = event_id
+                yield format_sse(event, payload, event_id)
+
+    def prune(self, now: float = None):
+        """Forget finished jobs and idle session channels older than the TTL."""
+        now = now if now is not None else time.time()
+        cutoff = now - self.session_ttl_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job["finished_at"] is not None and job["finished_at"] < cutoff]:
+            del self._jobs[job_id]
+        active_sessions = {job["session_id"] for job in self._jobs.values()}
+        for session_id in [session_id for session_id, channel in self._channels.items()
+                           if channel.updated_at < cutoff and session_id not in active_sessions]:
+            del self._channels[session_id]
+
+    async def close(self):
+        """Cancel all running jobs (call on shutdown)."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+def build_stream_response(queue: FeedbackJobQueue, session_id: str, after: int = 0,
+                          heartbeat_seconds: float = 15.0):
+    """
+    Framework-agnostic body of the SSE results endpoint.
+
+    Returns:
+        (status_code, headers dict, async iterator of frames or None); 404 for unknown sessions
+    """
+    try:
+        frames = queue.stream(session_id, after, heartbeat_seconds)
+    except KeyError:
+        return 404, {}, None
+    headers = {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # Stop nginx from buffering the stream
+    }
+    return 200, headers, frames
+
+
+# Export all components
+__all__ = [
+    'FeedbackJobQueue',
+    'build_stream_response',
+    'format_sse',
+    'JOB_PENDING',
+    'JOB_DONE',
+    'JOB_FAILED'
+]
@@ -0,0 +1,286 @@
+"""
+NeuroPilot - LLM Request Scheduler
+Coordinates all model traffic (roleplay replies, feedback, summaries, progress)
+against each provider's quota with request and token buckets, strict priority
+classes and retry-after handling.
+"""
+
+import asyncio
+import heapq
+import itertools
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """Lower value = served first."""
+    LIVE_REPLY = 0   # Roleplay reply the user is waiting on
+    INLINE_TIP = 1   # create_inline_feedback_prompt
+    FEEDBACK = 2     # create_feedback_prompt / batched feedback
+    SUMMARY = 3      # create_summary_prompt
+    PROGRESS = 4     # create_progress_prompt
+
+
+class RateLimitError(Exception):
+    """Raised by a provider call when it gets a 429; retry_after is in seconds if known."""
+
+    def __init__(self, message: str = "Rate limited", retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after_from_headers(headers) -> float:
+    """
+    Read a Retry-After header (seconds form) from a provider response.
+
+    Returns:
+        Seconds to wait, or None if the header is missing or not numeric
+    """
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` units refill per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float, now: float = 0.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+        self.blocked_until = now
+
+    def _refill(self, now: float):
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        amount = min(amount, self.capacity)  # Oversized requests wait for a full bucket
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def block(self, seconds: float, now: float):
+        """Stop handing out capacity for `seconds` (provider said retry later)."""
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class _ProviderState:
+    def __init__(self, name, requests_per_minute, tokens_per_minute, max_concurrency, now):
+        self.name = name
+        self.request_bucket = TokenBucket(requests_per_minute / 60.0, max(1.0, requests_per_minute / 60.0 * 10), now)
+        self.token_bucket = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute, now)
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.queue = []  # heap of (priority, seq, job)
+        self.wakeup = asyncio.Event()
+        self.dispatcher = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.total_queue_wait = 0.0
+
+
+class _Job:
+    __slots__ = ("call", "priority", "tokens", "future", "attempts", "enqueued_at")
+
+    def __init__(self, call, priority, tokens, future, enqueued_at):
+        self.call = call
+        self.priority = priority
+        self.tokens = tokens
+        self.future = future
+        self.attempts = 0
+        self.enqueued_at = enqueued_at
+
+
+class LLMScheduler:
+    """
+    Priority-aware async scheduler for model calls.
+
+    Each provider gets a request bucket (requests/minute), a token bucket
+    (tokens/minute) and a concurrency cap. Jobs are served strictly by
+    Priority, FIFO within a class. A RateLimitError from the call blocks the
+    provider for its retry_after and puts the job back at the front of its class.
+    """
+
+    def __init__(self, max_retries: int = 3, default_retry_after: float = 2.0):
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self._providers = {}
+        self._seq = itertools.count()
+        self._tasks = set()  # Strong references so running calls are not garbage collected
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def add_provider(self, name: str, requests_per_minute: float = 30,
+                     tokens_per_minute: float = 6000, max_concurrency: int = 4):
+        """
+        Register a provider quota (e.g., Groq free tier: 30 RPM, 6000 TPM).
+        """
+        loop = asyncio.get_running_loop()
+        self._providers[name] = _ProviderState(name, requests_per_minute, tokens_per_minute, max_concurrency, loop.time())
+
+    async def submit(self, provider: str, call, priority: Priority = Priority.FEEDBACK, estimated_tokens: int = 0):
+        """
+        Queue a model call and wait for its result.
+
+        Args:
+            provider: Name passed to add_provider()
+            call: Zero-argument async callable performing the request
+            priority: Priority class of the request
+            estimated_tokens: Input + expected output tokens (e.g., from estimate_tokens())
+
+        Returns:
+            Whatever `call` returns
+
+        Raises:
+            KeyError: If the provider was never registered
+            RateLimitError: If the call was still rate limited after max_retries
+        """
+        state = self._providers[provider]
+        loop = asyncio.get_running_loop()
+        job = _Job(call, Priority(priority), estimated_tokens, loop.create_future(), loop.time())
+        heapq.heappush(state.queue, (job.priority, next(self._seq), job))
+        state.wakeup.set()
+        if state.dispatcher is None or state.dispatcher.done():
+            state.dispatcher = self._spawn(self._dispatch(state))
+        return await job.future
+
+    async def _dispatch(self, state: _ProviderState):
+        loop = asyncio.get_running_loop()
+        while state.queue:
+            await state.slots.acquire()
+            while True:
+                # Drop jobs whose callers went away
+                while state.queue and state.queue[0][2].future.done():
+                    heapq.heappop(state.queue)
+                if not state.queue:
+                    break
+                job = state.queue[0][2]
+                now = loop.time()
+                wait = max(state.request_bucket.wait_time(1, now), state.token_bucket.wait_time(job.tokens, now))
+                if wait <= 0:
+                    break
+                # Sleep until capacity frees up or a higher-priority job arrives
+                state.wakeup.clear()
+                try:
+                    await asyncio.wait_for(state.wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            if not state.queue:
+                state.slots.release()
+                break
+
+            _, seq, job = heapq.heappop(state.queue)
+            now = loop.time()
+            state.request_bucket.consume(1, now)
+            state.token_bucket.consume(job.tokens, now)
+            if job.attempts == 0:
+                state.total_queue_wait += now - job.enqueued_at
+            state.in_flight += 1
+            self._spawn(self._run(state, seq, job))
+
+    async def _run(self, state: _ProviderState, seq: int, job: _Job):
+        loop = asyncio.get_running_loop()
+        try:
+            result = await job.call()
+        except RateLimitError as exc:
+            state.rate_limited += 1
+            retry_after = exc.retry_after if exc.retry_after is not None else self.default_retry_after
+            now = loop.time()
+            state.request_bucket.block(retry_after, now)
+            state.token_bucket.block(retry_after, now)
+            job.attempts += 1
+            if job.attempts > self.max_retries:
+                state.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            else:
+                state.retries += 1
+                heapq.heappush(state.queue, (job.priority, seq, job))  # Keeps its place in line
+                if state.dispatcher is None or state.dispatcher.done():
+                    state.dispatcher = self._spawn(self._dispatch(state))
+        except Exception as exc:
+            state.failed += 1
+            if not job.future.done():
+                job.future.set_exception(exc)
+        except BaseException as exc:
+            # Cancellation (or interpreter exit) must still resolve the caller's future
+            state.failed += 1
+            if not job.future.done():
+                if isinstance(exc, asyncio.CancelledError):
+                    job.future.cancel()
+                else:
+                    job.future.set_exception(exc)
+            raise
+        else:
+            state.completed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            state.in_flight -= 1
+            state.slots.release()
+            state.wakeup.set()
+
+    def queue_depth(self, provider: str) -> dict:
+        """Queued (not yet started) jobs per priority class."""
+        depth = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, job in self._providers[provider].queue:
+            if not job.future.done():
+                depth[priority.name.lower()] += 1
+        return depth
+
+    def metrics(self) -> dict:
+        """Per-provider queue depth and counters."""
+        metrics = {}
+        for name, state in self._providers.items():
+            started = state.completed + state.failed + state.in_flight
+            metrics[name] = {
+                "queue_depth": self.queue_depth(name),
+                "in_flight": state.in_flight,
+                "completed": state.completed,
+                "failed": state.failed,
+                "rate_limited": state.rate_limited,
+                "retries": state.retries,
+                "avg_queue_wait_seconds": state.total_queue_wait / started if started else 0.0
+            }
+        return metrics
+
+    async def close(self):
+        """Cancel dispatchers and running calls, and cancel anything still queued."""
+        for task in list(self._tasks):
+            task.cancel()
+        for state in self._providers.values():
+            if state.dispatcher is not None:
+                state.dispatcher.cancel()
+            for _, _, job in state.queue:
+                if not job.future.done():
+                    job.future.cancel()
+            state.queue.clear()
+
+
+# Export all components
+__all__ = [
+    'Priority',
+    'RateLimitError',
+    'TokenBucket',
+    'LLMScheduler',
+    'retry_after_from_headers'
+]
@@ -0,0 +1,510 @@
+"""
+NeuroPilot - Load Test Harness
+Drives scripted multi-turn practice sessions (start -> converse x N ->
+verify-quiz) at a configurable concurrency and reports throughput plus
+p50/p95/p99 latency per endpoint and per pipeline stage as JSON, so runs can
+be compared.
+
+Two targets:
+    - HttpTarget: a running API server (stage timings come from its
+      Server-Timing response header when present)
+    - InProcessTarget: the turn pipeline assembled from the prompts package
+      and backend building blocks against mock providers, to size one node
+      without the server or any quota
+
+Usage:
+    python -m backend.loadtest --sessions 200 --concurrency 50 --output run.json
+    python -m backend.loadtest --target http://localhost:8000 --mock-servers
+    python -m backend.loadtest --compare baseline.json run.json
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import struct
+import sys
+import time
+import urllib.request
+import uuid
+
+from backend.audio_store import AudioBufferStore, audio_url
+from backend.llm_scheduler import LLMScheduler, Priority
+from backend.mock_providers import MockLLMProvider, MockSTTProvider, MockTTSProvider
+from backend.session_store import SessionStore
+from backend.stt_stream import pcm_to_wav
+from backend.telemetry import Tracer
+from prompts.adaptive_agent_system import get_adaptive_context
+from prompts.feedback_prompts import create_budgeted_feedback_prompt
+from prompts.prompt_compiler import compile_system_prompt, get_scenario_display_name
+from prompts.token_budget import estimate_tokens
+
+PERCENTILES = (50, 95, 99)
+
+DEFAULT_SCENARIO = "office_lunch"
+
+# User turns for a scripted session (the mock STT produces placeholder text;
+# these drive the recorded audio length)
+DEFAULT_SCRIPT = (
+    "Hi! How's your day going so far?",
+    "I tried the new sandwich place downstairs, it was pretty good.",
+    "Yeah, I've been working on the reporting dashboard this week.",
+    "Do you have any plans for the weekend?",
+    "That sounds fun. I might go hiking if the weather holds.",
+    "Anyway, I should get back to work. Nice chatting with you!",
+)
+
+MOCK_QUIZ = {
+    "dialogue": "I've been swamped with deadlines all week.",
+    "question": "What is the speaker most likely feeling?",
+    "options": ["Excited", "Stressed", "Bored", "Confused"],
+    "correct_answer_index": 1
+}
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(seconds: list) -> dict:
+    """Count, mean, max and PERCENTILES of latencies, in milliseconds."""
+    values = sorted(value * 1000.0 for value in seconds)
+    summary = {"count": len(values), "mean_ms": sum(values) / len(values) if values else 0.0}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = percentile(values, pct)
+    summary["max_ms"] = values[-1] if values else 0.0
+    return summary
+
+
+class LatencyRecorder:
+    """Collects latency samples and error counts per endpoint and per stage."""
+
+    def __init__(self):
+        self.endpoints = {}
+        self.stages = {}
+        self.errors = {}
+
+    def record(self, endpoint: str, seconds: float, stages: dict = None):
+        self.endpoints.setdefault(endpoint, []).append(seconds)
+        for stage, stage_seconds in (stages or {}).items():
+            self.stages.setdefault(stage, []).append(stage_seconds)
+
+    def record_error(self, endpoint: str, error: Exception):
+        counts = self.errors.setdefault(endpoint, {})
+        name = type(error).__name__
+        counts[name] = counts.get(name, 0) + 1
+
+    def summary(self) -> dict:
+        return {
+            "endpoints": {
+                endpoint: {**summarize_latencies(samples), "errors": sum(self.errors.get(endpoint, {}).values())}
+                for endpoint, samples in sorted(self.endpoints.items())
+            },
+            "stages": {stage: summarize_latencies(samples) for stage, samples in sorted(self.stages.items())},
+            "errors": self.errors
+        }
+
+
+def make_test_audio(seconds: float, sample_rate: int = 16000) -> bytes:
+    """WAV of a quiet 220 Hz tone, standing in for a recorded utterance."""
+    count = int(seconds * sample_rate)
+    samples = (int(3000 * math.sin(2 * math.pi * 220 * i / sample_rate)) for i in range(count))
+    return pcm_to_wav(struct.pack(f"<{count}h", *samples), sample_rate)
+
+
+def encode_multipart(fields: dict, files: dict = None):
+    """
+    Build a multipart/form-data body.
+
+    Args:
+        fields: {name: str value}
+        files: {name: (filename, bytes, content_type)}
+
+    Returns:
+        (content_type header value, body bytes)
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8"))
+    for name, (filename, data, content_type) in (files or {}).items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return f"multipart/form-data; boundary={boundary}", b"".join(parts)
+
+
+def parse_server_timing(header: str) -> dict:
+    """Parse a Server-Timing header ('stt;dur=812.4, llm;dur=430') into {stage: seconds}."""
+    stages = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    stages[name] = float(value) / 1000.0
+                except ValueError:
+                    pass
+    return stages
+
+
+class HttpTarget:
+    """Runs the scripted session against a live API server over HTTP."""
+
+    def __init__(self, base_url: str, timeout: float = 120.0, audio_transport: str = "binary"):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.audio_transport = audio_transport
+
+    def _post(self, path: str, fields: dict, files: dict = None):
+        content_type, body = encode_multipart(fields, files)
+        request = urllib.request.Request(self.base_url + path, data=body, method="POST",
+                                         headers={"Content-Type": content_type})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = json.loads(response.read())
+            return data, parse_server_timing(response.headers.get("Server-Timing"))
+
+    async def start(self, scenario: str):
+        return await asyncio.to_thread(self._post, "/api/audio/start", {
+            "user_name": "LoadTest",
+            "scenario": scenario,
+            "audio_transport": self.audio_transport
+        })
+
+    async def converse(self, session_id: str, audio: bytes):
+        return await asyncio.to_thread(self._post, "/api/audio/converse", {
+            "session_id": session_id,
+            "include_feedback": "false",
+            "defer_feedback": "true",
+            "audio_transport": self.audio_transport
+        }, {"audio": ("audio.wav", audio, "audio/wav")})
+
+    async def verify_quiz(self, session_id: str, selected_answer_index: int):
+        return await asyncio.to_thread(self._post, "/api/audio/verify-quiz", {
+            "session_id": session_id,
+            "selected_answer_index": str(selected_answer_index)
+        })
+
+    async def close(self):
+        pass
+
+
+class InProcessTarget:
+    """
+    The voice turn pipeline assembled in-process against mock providers.
+
+    converse() runs STT, adaptive prompt assembly, the roleplay LLM call,
+    feedback (inline, or as a background task with defer_feedback), TTS and
+    audio encoding (binary clip store or base64), with a telemetry span
+    around each stage. Model calls go through an LLMScheduler so 429s are
+    retried the way the server does.
+    """
+
+    def __init__(self, llm: MockLLMProvider = None, stt: MockSTTProvider = None, tts: MockTTSProvider = None,
+                 requests_per_minute: float = 6000, tokens_per_minute: float = 10_000_000,
+                 max_concurrency: int = 64, defer_feedback: bool = True, audio_transport: str = "binary",
+                 quiz_every: int = 3, tracer: Tracer = None):
+        self.llm = llm or MockLLMProvider()
+        self.stt = stt or MockSTTProvider()
+        self.tts = tts or MockTTSProvider()
+        self.quota = (requests_per_minute, tokens_per_minute, max_concurrency)
+        self.defer_feedback = defer_feedback
+        self.audio_transport = audio_transport
+        self.quiz_every = quiz_every
+        self.tracer = tracer or Tracer()
+        self.sessions = SessionStore()
+        self.audio_store = AudioBufferStore()
+        self.scheduler = None
+        self._background = set()
+
+    def _ensure_scheduler(self):
+        if self.scheduler is None:
+            self.scheduler = LLMScheduler()
+            requests_per_minute, tokens_per_minute, max_concurrency = self.quota
+            self.scheduler.add_provider("groq", requests_per_minute, tokens_per_minute, max_concurrency)
+            self.scheduler.add_provider("tts", requests_per_minute, tokens_per_minute, max_concurrency)
+
+    async def _complete(self, system_prompt: str, user_prompt: str, priority: Priority, max_tokens: int = 150):
+        self._ensure_scheduler()
+        tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + max_tokens
+        result = await self.scheduler.submit(
+            "groq", lambda: self.llm.complete(system_prompt, user_prompt, max_tokens), priority, tokens
+        )
+        return result["content"]
+
+    async def _speak(self, text: str) -> dict:
+        self._ensure_scheduler()
+        with self.tracer.span("tts", "mock"):
+            audio = await self.scheduler.submit("tts", lambda: self.tts.synthesize(text), Priority.LIVE_REPLY)
+        with self.tracer.span("encode"):
+            if self.audio_transport == "binary":
+                return {"audio_url": audio_url(self.audio_store.put(audio))}
+            return {"audio_response": base64.b64encode(audio).decode("ascii")}
+
+    async def _feedback(self, session, user_message: str):
+        context = get_scenario_display_name(session.scenario_key)
+        system_prompt, user_prompt, _ = create_budgeted_feedback_prompt(context, session.history()[:-1], user_message)
+        with self.tracer.span("feedback", "mock"):
+            content = await self._complete(system_prompt, user_prompt, Priority.FEEDBACK, 400)
+        feedback = json.loads(content)
+        session.add_scores(feedback)
+        return feedback
+
+    async def start(self, scenario: str):
+        with self.tracer.request("start") as trace:
+            session = self.sessions.create(uuid.uuid4().hex, "loadtest", scenario)
+            with self.tracer.span("prompt"):
+                system_prompt = compile_system_prompt(scenario)
+            with self.tracer.span("llm", "mock"):
+                greeting = await self._complete(system_prompt, "Start the conversation with a short greeting.",
+                                                Priority.LIVE_REPLY)
+            session.add_message("assistant", greeting)
+            response = {"session_id": session.session_id, "ai_text_response": greeting}
+            response.update(await self._speak(greeting))
+        return response, trace.stage_seconds()
+
+    async def converse(self, session_id: str, audio: bytes):
+        with self.tracer.request("converse") as trace:
+            response = await self._converse(session_id, audio)
+        return response, trace.stage_seconds()
+
+    async def _converse(self, session_id: str, audio: bytes) -> dict:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown session {session_id}")
+
+        with self.tracer.span("stt", "mock"):
+            user_text = await self.stt.transcribe(audio)
+        with self.tracer.span("prompt"):
+            tracker = session.tracker
+            recent_lengths = (tracker.recent_lengths + [len(user_text)])[-tracker.window:]
+            adaptive_context = get_adaptive_context(tracker.user_message_count + 1, recent_lengths, user_text)
+            system_prompt = compile_system_prompt(session.scenario_key, session.avatar_id,
+                                                  adaptive_context=adaptive_context)
+            session.add_message("user", user_text)
+            history = "\n".join(f"{m['role']}: {m['content']}" for m in session.history()[-8:])
+        with self.tracer.span("llm", "mock"):
+            reply = await self._complete(system_prompt, history, Priority.LIVE_REPLY)
+        session.add_message("assistant", reply)
+
+        response = {"user_text": user_text, "ai_text_response": reply, "conversation_count": tracker.user_message_count}
+        if self.defer_feedback:
+            task = asyncio.create_task(self._feedback(session, user_text))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            response["job_id"] = uuid.uuid4().hex
+        else:
+            response["feedback"] = await self._feedback(session, user_text)
+
+        if self.quiz_every and tracker.user_message_count % self.quiz_every == 0:
+            session.quiz = MOCK_QUIZ
+            response["quiz"] = {key: value for key, value in MOCK_QUIZ.items() if key != "correct_answer_index"}
+
+        response.update(await self._speak(reply))
+        return response
+
+    async def verify_quiz(self, session_id: str, selected_answer_index: int):
+        with self.tracer.request("verify_quiz") as trace, self.tracer.span("quiz_check"):
+            session = self.sessions.get(session_id)
+            if session is None or session.quiz is None:
+                raise KeyError(f"No pending quiz for session {session_id}")
+            correct = session.quiz["correct_answer_index"]
+            session.quiz = None
+        return {"correct": selected_answer_index == correct, "correct_answer_index": correct}, trace.stage_seconds()
+
+    async def close(self):
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self.scheduler is not None:
+            await self.scheduler.close()
+
+
+async def _run_session(target, recorder: LatencyRecorder, scenario: str, turns: int, utterance_audio: list):
+    async def call(endpoint, request):
+        started = time.perf_counter()
+        try:
+            data, stages = await request
+        except Exception as error:
+            recorder.record_error(endpoint, error)
+            return None
+        recorder.record(endpoint, time.perf_counter() - started, stages)
+        return data
+
+    data = await call("start", target.start(scenario))
+    if data is None:
+        return False
+    session_id = data["session_id"]
+    for turn in range(turns):
+        data = await call("converse", target.converse(session_id, utterance_audio[turn % len(utterance_audio)]))
+        if data is None:
+            return False
+        if data.get("quiz"):
+            if await call("verify_quiz", target.verify_quiz(session_id, 0)) is None:
+                return False
+    return True
+
+
+async def run_load_test(target, sessions: int = 50, concurrency: int = 10, turns: int = len(DEFAULT_SCRIPT),
+                        scenario: str = DEFAULT_SCENARIO, script=DEFAULT_SCRIPT, seconds_per_char: float = 0.06) -> dict:
+    """
+    Run `sessions` scripted sessions, at most `concurrency` at a time.
+
+    Args:
+        target: HttpTarget or InProcessTarget
+        sessions: Total sessions to run
+        concurrency: Sessions in flight at once
+        turns: converse calls per session (cycling through the script)
+        scenario: Scenario key sent to /api/audio/start
+        script: User utterances; their length sets the test audio duration
+        seconds_per_char: Speaking rate used to size the test audio
+
+    Returns:
+        Results dict: config, wall time, throughput and the LatencyRecorder summary
+    """
+    recorder = LatencyRecorder()
+    utterance_audio = [make_test_audio(max(len(line) * seconds_per_char, 0.5)) for line in script]
+    semaphore = asyncio.Semaphore(concurrency)
+    completed = 0
+
+    async def limited():
+        nonlocal completed
+        async with semaphore:
+            if await _run_session(target, recorder, scenario, turns, utterance_audio):
+                completed += 1
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(limited() for _ in range(sessions)))
+    finally:
+        await target.close()
+    elapsed = time.perf_counter() - started
+
+    summary = recorder.summary()
+    tracer = getattr(target, "tracer", None)
+    if tracer is not None:
+        summary["telemetry"] = tracer.registry.snapshot()
+    requests = sum(endpoint["count"] for endpoint in summary["endpoints"].values())
+    return {
+        "config": {
+            "target": getattr(target, "base_url", "in-process"),
+            "sessions": sessions,
+            "concurrency": concurrency,
+            "turns": turns,
+            "scenario": scenario
+        },
+        "elapsed_seconds": elapsed,
+        "sessions_completed": completed,
+        "sessions_per_second": completed / elapsed if elapsed else 0.0,
+        "requests_per_second": requests / elapsed if elapsed else 0.0,
+        **summary
+    }
+
+
+def compare_results(baseline: dict, current: dict) -> dict:
+    """
+    Percent change in p50/p95/p99 per endpoint and stage, plus throughput.
+
+    Positive latency deltas are regressions.
+    """
+    def delta(old, new):
+        return (new - old) / old * 100.0 if old else None
+
+    comparison = {"requests_per_second_pct": delta(baseline["requests_per_second"], current["requests_per_second"])}
+    for section in ("endpoints", "stages"):
+        comparison[section] = {
+            name: {f"p{pct}_pct": delta(baseline[section][name][f"p{pct}_ms"], stats[f"p{pct}_ms"])
+                   for pct in PERCENTILES}
+            for name, stats in current[section].items() if name in baseline[section]
+        }
+    return comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NeuroPilot voice pipeline load test")
+    parser.add_argument("--target", default="in-process", help="'in-process' or the API base URL")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=len(DEFAULT_SCRIPT))
+    parser.add_argument("--scenario", default=DEFAULT_SCENARIO)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--stt-latency", type=float, default=0.2)
+    parser.add_argument("--tts-latency", type=float, default=0.25)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="429 probability per LLM/TTS call")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--inline-feedback", action="store_true", help="Score each turn before replying")
+    parser.add_argument("--audio-transport", choices=("binary", "base64"), default="binary")
+    parser.add_argument("--mock-servers", action="store_true",
+                        help="Also serve mock Groq/ElevenLabs endpoints for an HTTP target's providers")
+    parser.add_argument("--mock-port", type=int, default=8089)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="Compare two results files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        json.dump(compare_results(baseline, current), sys.stdout, indent=2)
+        print()
+        return
+
+    llm = MockLLMProvider(args.llm_latency, args.jitter, args.rate_limit, args.retry_after, args.seed)
+    stt = MockSTTProvider(args.stt_latency, args.jitter, seed=args.seed)
+    tts = MockTTSProvider(args.tts_latency, args.jitter, rate_limit_probability=args.rate_limit,
+                          retry_after=args.retry_after, seed=args.seed)
+
+    mock_server = None
+    if args.target == "in-process":
+        target = InProcessTarget(llm, stt, tts, defer_feedback=not args.inline_feedback,
+                                 audio_transport=args.audio_transport)
+    else:
+        target = HttpTarget(args.target, audio_transport=args.audio_transport)
+        if args.mock_servers:
+            from backend.mock_servers import MockProviderServer
+
+            mock_server = MockProviderServer(llm, stt, tts, port=args.mock_port).start()
+            print(f"Mock providers at {mock_server.base_url} (set GROQ_BASE_URL and the ElevenLabs base_url)",
+                  file=sys.stderr)
+
+    try:
+        results = asyncio.run(run_load_test(target, args.sessions, args.concurrency, args.turns, args.scenario))
+        results["mock_providers"] = {"llm_calls": llm.calls, "llm_rate_limited": llm.rate_limited,
+                                     "stt_calls": stt.calls, "tts_calls": tts.calls,
+                                     "tts_rate_limited": tts.rate_limited}
+    finally:
+        if mock_server is not None:
+            mock_server.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+
+# Export all components
+__all__ = [
+    'HttpTarget',
+    'InProcessTarget',
+    'LatencyRecorder',
+    'compare_results',
+    'run_load_test',
+    'summarize_latencies'
+]
+
+
+if __name__ == "__main__":
+    main()
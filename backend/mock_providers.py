@@ -0,0 +1,250 @@
+"""
+NeuroPilot - Mock Providers
+Local stand-ins for the hosted model APIs with tunable latency, jitter and
+429 rates, for exercising the scheduler and pipeline without spending quota,
+plus an in-process MongoDB stand-in for the persistence layer.
+"""
+
+import asyncio
+import copy
+import io
+import json
+import random
+import wave
+from collections import namedtuple
+
+from backend.llm_scheduler import RateLimitError
+from prompts.token_budget import estimate_tokens
+
+
+class MockLLMProvider:
+    """
+    Fake chat-completion provider (Groq stand-in).
+
+    complete() sleeps for latency +/- jitter, raises RateLimitError with
+    probability rate_limit_probability, and otherwise returns a
+    Groq-shaped dict with content and usage.
+    """
+
+    def __init__(self, latency: float = 0.3, jitter: float = 0.1, rate_limit_probability: float = 0.0,
+                 retry_after: float = 1.0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self.calls = 0
+        self.rate_limited = 0
+        self._random = random.Random(seed)
+
+    async def _delay(self):
+        await asyncio.sleep(max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)))
+
+    async def complete(self, system_prompt: str, user_prompt: str, max_tokens: int = 150) -> dict:
+        """
+        Simulate one chat completion.
+
+        Returns:
+            Dict with 'content' and 'usage' ('prompt_tokens', 'completion_tokens')
+
+        Raises:
+            RateLimitError: Simulated 429
+        """
+        self.calls += 1
+        await self._delay()
+        if self._random.random() < self.rate_limit_probability:
+            self.rate_limited += 1
+            raise RateLimitError("Mock provider: 429 Too Many Requests", retry_after=self.retry_after)
+
+        if "JSON format" in user_prompt:
+            content = json.dumps({
+                **{dimension: {"score": self._random.randint(55, 95), "feedback": "Nice, natural phrasing."}
+                   for dimension in ("tone", "clarity", "empathy", "engagement")},
+                "overall_impression": "Friendly and engaged.",
+                "quick_tip": "Ask a follow-up question next."
+            })
+        else:
+            content = "That sounds great! How has your week been so far?"
+
+        return {
+            "content": content,
+            "usage": {
+                "prompt_tokens": estimate_tokens(system_prompt) + estimate_tokens(user_prompt),
+                "completion_tokens": min(max_tokens, estimate_tokens(content))
+            }
+        }
+
+
+class MockSTTProvider:
+    """
+    Fake speech-to-text provider (Groq Whisper stand-in).
+
+    transcribe() takes WAV bytes and returns words_per_second placeholder
+    words per second of audio, after latency +/- jitter.
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, words_per_second: float = 2.5,
+                 seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.words_per_second = words_per_second
+        self.calls = 0
+        self.audio_seconds = 0.0
+        self._random = random.Random(seed)
+
+    async def transcribe(self, wav_bytes: bytes) -> str:
+        """Simulate one transcription request."""
+        self.calls += 1
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+            seconds = wav.getnframes() / wav.getframerate()
+        self.audio_seconds += seconds
+        await asyncio.sleep(max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)))
+        return " ".join(f"word{i}" for i in range(int(seconds * self.words_per_second)))
+
+
+class MockTTSProvider:
+    """
+    Fake text-to-speech provider (ElevenLabs/gTTS stand-in).
+
+    synthesize() sleeps for latency + seconds_per_char * len(text) +/- jitter
+    and returns placeholder MP3-sized bytes (bytes_per_char per character).
+    """
+
+    def __init__(self, latency: float = 0.25, jitter: float = 0.05, seconds_per_char: float = 0.002,
+                 bytes_per_char: int = 180, rate_limit_probability: float = 0.0, retry_after: float = 1.0,
+                 seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.seconds_per_char = seconds_per_char
+        self.bytes_per_char = bytes_per_char
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self.calls = 0
+        self.characters = 0
+        self.rate_limited = 0
+        self._random = random.Random(seed)
+
+    async def synthesize(self, text: str) -> bytes:
+        """
+        Simulate one synthesis request.
+
+        Raises:
+            RateLimitError: Simulated 429
+        """
+        self.calls += 1
+        self.characters += len(text)
+        delay = self.latency + self.seconds_per_char * len(text) + self._random.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(max(0.0, delay))
+        if self._random.random() < self.rate_limit_probability:
+            self.rate_limited += 1
+            raise RateLimitError("Mock TTS provider: 429 Too Many Requests", retry_after=self.retry_after)
+        return b"ID3" + bytes(max(len(text), 1) * self.bytes_per_char)
+
+
+class MockUpdateOne(namedtuple("MockUpdateOne", ("filter", "update", "upsert"))):
+    """Stand-in for pymongo.UpdateOne with the same (filter, update, upsert=False) signature."""
+
+    __slots__ = ()
+
+    def __new__(cls, filter, update, upsert: bool = False):
+        return super().__new__(cls, filter, update, upsert)
+
+
+class InMemoryMongoCollection:
+    """
+    Minimal async collection with the motor calls WriteBehindWriter uses.
+
+    Supports insert_many (unique _id), bulk_write of MockUpdateOne upserts
+    with $set/$setOnInsert/$inc/$max, create_index, and equality-filter find/count.
+    Set fail_next to make the next N write calls raise ConnectionError.
+    """
+
+    def __init__(self, name: str, latency: float = 0.0):
+        self.name = name
+        self.latency = latency
+        self.documents = []
+        self.indexes = []
+        self.write_calls = 0
+        self.fail_next = 0
+
+    async def _write_call(self):
+        self.write_calls += 1
+        await asyncio.sleep(self.latency)
+        if self.fail_next:
+            self.fail_next -= 1
+            raise ConnectionError(f"Mock MongoDB: {self.name} unavailable")
+
+    @staticmethod
+    def _matches(doc: dict, query: dict) -> bool:
+        return all(doc.get(field) == value for field, value in query.items())
+
+    async def create_index(self, keys, **options):
+        self.indexes.append((keys, options))
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+    async def insert_many(self, documents, ordered: bool = True):
+        from pymongo.errors import BulkWriteError
+
+        await self._write_call()
+        existing = {doc["_id"] for doc in self.documents}
+        errors = []
+        for index, doc in enumerate(documents):
+            if doc["_id"] in existing:
+                errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key error"})
+                if ordered:
+                    break
+                continue
+            existing.add(doc["_id"])
+            self.documents.append(copy.deepcopy(doc))
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(documents) - len(errors)})
+
+    async def bulk_write(self, operations, ordered: bool = True):
+        await self._write_call()
+        for operation in operations:
+            if not isinstance(operation, MockUpdateOne):
+                raise TypeError("InMemoryMongoCollection.bulk_write takes MockUpdateOne operations "
+                                "(pass update_one=MockUpdateOne to WriteBehindWriter)")
+            query, update, upsert = operation
+            doc = next((doc for doc in self.documents if self._matches(doc, query)), None)
+            if doc is None:
+                if not upsert:
+                    continue
+                doc = dict(query)
+                doc.update(update.get("$setOnInsert", {}))
+                self.documents.append(doc)
+            doc.update(copy.deepcopy(update.get("$set", {})))
+            for field, amount in update.get("$inc", {}).items():
+                doc[field] = doc.get(field, 0) + amount
+            for field, value in update.get("$max", {}).items():
+                doc[field] = max(doc.get(field, value), value)
+
+    async def find(self, query: dict = None) -> list:
+        return [copy.deepcopy(doc) for doc in self.documents if self._matches(doc, query or {})]
+
+    async def count_documents(self, query: dict) -> int:
+        return sum(1 for doc in self.documents if self._matches(doc, query))
+
+
+class InMemoryMongoDatabase:
+    """Dict of InMemoryMongoCollection, indexable like a motor database."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.collections = {}
+
+    def __getitem__(self, name: str) -> InMemoryMongoCollection:
+        collection = self.collections.get(name)
+        if collection is None:
+            collection = self.collections[name] = InMemoryMongoCollection(name, self.latency)
+        return collection
+
+
+# Export all components
+__all__ = [
+    'InMemoryMongoCollection',
+    'InMemoryMongoDatabase',
+    'MockLLMProvider',
+    'MockSTTProvider',
+    'MockTTSProvider',
+    'MockUpdateOne'
+]
@@ -0,0 +1,182 @@
+"""
+NeuroPilot - Mock Provider Servers
+HTTP stand-ins for the Groq (OpenAI-compatible chat + Whisper transcription)
+and ElevenLabs text-to-speech APIs, backed by the mock providers, so a real
+API server can be load tested without spending quota. Point the SDKs at it:
+
+    GROQ_BASE_URL=http://127.0.0.1:<port>          (groq.Groq reads this)
+    ElevenLabs(base_url="http://127.0.0.1:<port>")
+
+Latency, jitter and 429 rates come from the provider objects; 429 responses
+carry a retry-after header.
+"""
+
+import asyncio
+import email.parser
+import email.policy
+import io
+import json
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend.llm_scheduler import RateLimitError
+from backend.mock_providers import MockLLMProvider, MockSTTProvider, MockTTSProvider
+
+CHAT_PATH = "/openai/v1/chat/completions"
+TRANSCRIPTION_PATH = "/openai/v1/audio/transcriptions"
+TTS_PATH_PREFIX = "/v1/text-to-speech/"
+
+
+def parse_multipart(content_type: str, body: bytes) -> dict:
+    """Parse a multipart/form-data body into {field name: bytes}."""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    return {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+            for part in message.iter_parts()}
+
+
+def _is_wav(data: bytes) -> bool:
+    try:
+        with wave.open(io.BytesIO(data), "rb"):
+            return True
+    except (wave.Error, EOFError):
+        return False
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    server_version = "NeuroPilotMock/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep load-test output clean
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: dict, headers: dict = None):
+        self._send(status, json.dumps(data).encode("utf-8"), headers=headers)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        server.requests += 1
+        try:
+            if self.path == CHAT_PATH:
+                self._chat(json.loads(body))
+            elif self.path == TRANSCRIPTION_PATH:
+                self._transcribe(body)
+            elif self.path.startswith(TTS_PATH_PREFIX):
+                self._text_to_speech(json.loads(body))
+            else:
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+        except RateLimitError as error:
+            server.rate_limited += 1
+            self._send_json(429, {"error": {"message": str(error), "type": "rate_limit_exceeded"}},
+                            headers={"retry-after": f"{error.retry_after or 1.0:g}"})
+
+    def _chat(self, request: dict):
+        messages = request.get("messages", [])
+        system_prompt = "\n".join(m["content"] for m in messages if m.get("role") == "system")
+        user_prompt = "\n".join(m["content"] for m in messages if m.get("role") != "system")
+        result = asyncio.run(self.server.llm.complete(system_prompt, user_prompt, request.get("max_tokens") or 150))
+        usage = result["usage"]
+        self._send_json(200, {
+            "id": f"chatcmpl-mock-{self.server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": result["content"]},
+                "finish_reason": "stop"
+            }],
+            "usage": {**usage, "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"]}
+        })
+
+    def _transcribe(self, body: bytes):
+        fields = parse_multipart(self.headers.get("Content-Type", ""), body)
+        audio = fields.get("file") or b""
+        if _is_wav(audio):
+            text = asyncio.run(self.server.stt.transcribe(audio))
+        else:
+            # Compressed upload: assume ~4 KB per second of speech
+            text = " ".join(f"word{i}" for i in range(int(len(audio) / 4000 * self.server.stt.words_per_second)))
+        if (fields.get("response_format") or b"json").decode() == "text":
+            self._send(200, text.encode("utf-8"), content_type="text/plain")
+        else:
+            self._send_json(200, {"text": text})
+
+    def _text_to_speech(self, request: dict):
+        audio = asyncio.run(self.server.tts.synthesize(request.get("text", "")))
+        self._send(200, audio, content_type="audio/mpeg")
+
+
+class MockProviderServer:
+    """
+    Threaded HTTP server serving the mock Groq and ElevenLabs endpoints.
+
+    Usage:
+        with MockProviderServer(llm=MockLLMProvider(rate_limit_probability=0.05)) as server:
+            os.environ["GROQ_BASE_URL"] = server.base_url
+    """
+
+    def __init__(self, llm: MockLLMProvider = None, stt: MockSTTProvider = None, tts: MockTTSProvider = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), _MockHandler)
+        self._server.daemon_threads = True
+        self._server.llm = llm or MockLLMProvider()
+        self._server.stt = stt or MockSTTProvider()
+        self._server.tts = tts or MockTTSProvider()
+        self._server.requests = 0
+        self._server.rate_limited = 0
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockProviderServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="mock-providers", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self) -> dict:
+        """Request counters across all mock endpoints."""
+        return {
+            "requests": self._server.requests,
+            "rate_limited": self._server.rate_limited,
+            "llm_calls": self._server.llm.calls,
+            "stt_calls": self._server.stt.calls,
+            "tts_calls": self._server.tts.calls
+        }
+
+
+# Export all components
+__all__ = [
+    'MockProviderServer',
+    'parse_multipart'
+]
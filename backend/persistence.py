@@ -0,0 +1,311 @@
+"""
+NeuroPilot - Write-Behind Persistence
+Buffers session events (messages, feedback results, session start/end) in
+memory and writes them to MongoDB in batches, so the request path never waits
+on a database round-trip. Batches flush when max_batch events are pending or
+every flush_interval seconds, whichever comes first, and close() drains the
+buffer on shutdown.
+
+Works with a motor AsyncIOMotorDatabase or any object exposing the same
+awaitable collection API (see InMemoryMongoDatabase in mock_providers).
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+try:
+    from bson import ObjectId
+    from pymongo import ASCENDING, DESCENDING, UpdateOne
+    from pymongo.errors import BulkWriteError
+except ImportError:
+    ObjectId = None
+    UpdateOne = None
+
+from prompts.summary_prompts import SCORE_DIMENSIONS
+
+logger = logging.getLogger(__name__)
+
+SESSIONS = "sessions"
+MESSAGES = "messages"
+FEEDBACK = "feedback"
+
+DUPLICATE_KEY_ERROR = 11000
+
+INDEXES = {
+    SESSIONS: [
+        ([("session_id", 1)], {"unique": True}),
+        ([("user_id", 1), ("created_at", -1)], {}),
+    ],
+    MESSAGES: [
+        ([("session_id", 1), ("created_at", 1)], {}),
+        ([("user_id", 1), ("created_at", -1)], {}),
+    ],
+    FEEDBACK: [
+        ([("session_id", 1), ("created_at", 1)], {}),
+        ([("user_id", 1), ("created_at", -1)], {}),
+    ],
+}
+
+
+async def ensure_indexes(db):
+    """Create the indexes the session/progress queries rely on (idempotent)."""
+    if ObjectId is None:
+        raise ImportError("MongoDB persistence requires pymongo (and motor for async access)")
+    directions = {1: ASCENDING, -1: DESCENDING}
+    for collection, indexes in INDEXES.items():
+        for keys, options in indexes:
+            await db[collection].create_index([(field, directions[order]) for field, order in keys], **options)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class WriteBehindWriter:
+    """
+    Batched, write-behind MongoDB writer.
+
+    record_*() calls only append to an in-memory buffer. Inserts get a
+    client-side ObjectId so a retried batch is idempotent (duplicate-key
+    errors from rows that already landed are ignored); session updates are
+    coalesced into one upsert per session per flush and carry absolute
+    counters ($max of the running message/feedback counts, never $inc), so
+    re-sending a partly applied bulk_write cannot double count. If the buffer reaches
+    max_buffer while the database is unavailable, the oldest inserts are
+    dropped and counted in metrics()['dropped'].
+    """
+
+    def __init__(self, db, max_batch: int = 200, flush_interval: float = 1.0, max_buffer: int = 20000,
+                 update_one=None):
+        if ObjectId is None:
+            raise ImportError("MongoDB persistence requires pymongo (and motor for async access)")
+        self.db = db
+        self.update_one = update_one or UpdateOne  # Operation constructor(filter, update, upsert=...)
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.flushes = 0
+        self.documents_written = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self._inserts = {MESSAGES: [], FEEDBACK: []}
+        self._session_updates = {}  # session_id -> {"$set": {}, "$setOnInsert": {}, "$max": {}}
+        self._session_counts = {}  # session_id -> running message/feedback counts
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Buffered events not yet written."""
+        return sum(len(docs) for docs in self._inserts.values()) + len(self._session_updates)
+
+    def start(self):
+        """Start the background flush loop (call from within the running event loop)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # Counted in self.failures; the batch stays buffered for the next attempt
+                logger.warning("Write-behind flush failed (%d events pending)", self.pending, exc_info=True)
+
+    def _enqueue(self, collection: str, doc: dict):
+        if self._closed:
+            raise RuntimeError("WriteBehindWriter is closed")
+        buffer = self._inserts[collection]
+        buffer.append(doc)
+        if self.pending > self.max_buffer:
+            del buffer[0]
+            self.dropped += 1
+        if self.pending >= self.max_batch:
+            self._wake.set()
+
+    def _update_session(self, session_id: str, set_fields: dict = None, set_on_insert: dict = None,
+                        max_fields: dict = None):
+        update = self._session_updates.get(session_id)
+        if update is None:
+            update = self._session_updates[session_id] = {"$set": {}, "$setOnInsert": {}, "$max": {}}
+        update["$set"].update(set_fields or {})
+        update["$setOnInsert"].update(set_on_insert or {})
+        for field, value in (max_fields or {}).items():
+            update["$max"][field] = max(update["$max"].get(field, value), value)
+
+    def _next_count(self, session_id: str, field: str) -> dict:
+        counts = self._session_counts.setdefault(session_id, {})
+        counts[field] = counts.get(field, 0) + 1
+        return {field: counts[field]}
+
+    def record_session_start(self, session_id: str, user_id: str, scenario_key: str, avatar_id: str = None):
+        """Buffer the session document (upserted on flush)."""
+        now = _utcnow()
+        self._update_session(session_id, set_fields={"updated_at": now}, set_on_insert={
+            "user_id": user_id,
+            "scenario_key": scenario_key,
+            "avatar_id": avatar_id,
+            "created_at": now
+        })
+
+    def record_message(self, session_id: str, user_id: str, role: str, content: str):
+        """Buffer one conversation message."""
+        now = _utcnow()
+        self._enqueue(MESSAGES, {
+            "_id": ObjectId(),
+            "session_id": session_id,
+            "user_id": user_id,
+            "role": role,
+            "content": content,
+            "created_at": now
+        })
+        self._update_session(session_id, set_fields={"updated_at": now},
+                             max_fields=self._next_count(session_id, "message_count"))
+
+    def record_feedback(self, session_id: str, user_id: str, feedback: dict):
+        """Buffer one feedback result (dict shaped like the feedback prompt JSON)."""
+        now = _utcnow()
+        self._enqueue(FEEDBACK, {
+            "_id": ObjectId(),
+            "session_id": session_id,
+            "user_id": user_id,
+            "scores": {dimension: feedback[dimension]["score"] for dimension in SCORE_DIMENSIONS},
+            "feedback": feedback,
+            "created_at": now
+        })
+        self._update_session(session_id, set_fields={"updated_at": now},
+                             max_fields=self._next_count(session_id, "feedback_count"))
+
+    def record_session_end(self, session_id: str, summary: dict = None, average_scores: dict = None):
+        """Buffer the end-of-session summary fields."""
+        now = _utcnow()
+        self._update_session(session_id, set_fields={
+            "updated_at": now,
+            "ended_at": now,
+            "summary": summary,
+            "average_scores": average_scores
+        })
+        self._session_counts.pop(session_id, None)
+
+    async def flush(self) -> int:
+        """
+        Write everything buffered so far.
+
+        Returns:
+            Number of documents written or upserted
+
+        Raises:
+            Exception: The database error; unwritten events stay buffered
+        """
+        async with self._flush_lock:
+            inserts = {collection: docs for collection, docs in self._inserts.items() if docs}
+            session_updates = self._session_updates
+            if not inserts and not session_updates:
+                return 0
+            self._inserts = {MESSAGES: [], FEEDBACK: []}
+            self._session_updates = {}
+
+            started = time.perf_counter()
+            written = 0
+            try:
+                for collection in list(inserts):
+                    docs = inserts[collection]
+                    for i in range(0, len(docs), self.max_batch):
+                        written += await self._insert_batch(collection, docs[i:i + self.max_batch])
+                    del inserts[collection]
+                if session_updates:
+                    operations = [
+                        self.update_one({"session_id": session_id},
+                                        {operator: fields for operator, fields in update.items() if fields},
+                                        upsert=True)
+                        for session_id, update in session_updates.items()
+                    ]
+                    await self.db[SESSIONS].bulk_write(operations, ordered=False)
+                    written += len(operations)
+                    session_updates = {}
+            except Exception:
+                self.failures += 1
+                self._requeue(inserts, session_updates)
+                raise
+            finally:
+                self.documents_written += written
+
+            self.flushes += 1
+            self.last_flush_ms = (time.perf_counter() - started) * 1000.0
+            return written
+
+    async def _insert_batch(self, collection: str, docs: list) -> int:
+        try:
+            await self.db[collection].insert_many(docs, ordered=False)
+        except BulkWriteError as error:
+            errors = error.details.get("writeErrors", [])
+            if any(item.get("code") != DUPLICATE_KEY_ERROR for item in errors):
+                raise
+            return len(docs) - len(errors)  # Retried batch: those rows were already written
+        return len(docs)
+
+    def _requeue(self, inserts: dict, session_updates: dict):
+        # Put unwritten events back ahead of anything buffered during the flush
+        for collection, docs in inserts.items():
+            self._inserts[collection] = docs + self._inserts[collection]
+        newer_updates = self._session_updates
+        self._session_updates = {}
+        for updates in (session_updates, newer_updates):
+            for session_id, update in updates.items():
+                self._update_session(session_id, update["$set"], update["$setOnInsert"], update["$max"])
+        for collection in (MESSAGES, FEEDBACK):
+            overflow = self.pending - self.max_buffer
+            if overflow > 0:
+                dropped = min(overflow, len(self._inserts[collection]))
+                del self._inserts[collection][:dropped]
+                self.dropped += dropped
+
+    async def close(self, timeout: float = 10.0):
+        """Stop the flush loop and drain the buffer (call on application shutdown)."""
+        self._closed = True
+        if self._task is not None:
+            self._wake.set()
+            try:
+                await self._task
+            except Exception:
+                logger.warning("Write-behind flush loop ended with an error", exc_info=True)
+            self._task = None
+        deadline = time.monotonic() + timeout
+        while self.pending:
+            try:
+                await self.flush()
+            except Exception:
+                if time.monotonic() >= deadline:
+                    raise
+                logger.warning("Write-behind drain failed, retrying (%d events pending)", self.pending,
+                               exc_info=True)
+                await asyncio.sleep(min(self.flush_interval, 0.5))
+
+    def metrics(self) -> dict:
+        """Buffer and flush counters."""
+        return {
+            "pending": self.pending,
+            "flushes": self.flushes,
+            "documents_written": self.documents_written,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_ms": self.last_flush_ms
+        }
+
+
+# Export all components
+__all__ = [
+    'INDEXES',
+    'WriteBehindWriter',
+    'ensure_indexes'
+]
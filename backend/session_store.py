@@ -0,0 +1,317 @@
+"""
+NeuroPilot - Session Store
+Bounded in-memory store for practice sessions keyed by the session_id from
+/api/audio/start. Sessions use a compact __slots__ layout (role codes in a
+byte array, scores in a typed array instead of nested dicts) and are evicted
+LRU under a memory cap, spilling to disk while still live, or dropped after
+an idle TTL.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from prompts.adaptive_agent_system import ConversationAdaptationTracker
+from prompts.summary_prompts import SCORE_DIMENSIONS
+
+ROLE_CODES = {"user": 0, "assistant": 1, "system": 2}
+ROLE_NAMES = {code: role for role, code in ROLE_CODES.items()}
+
+
+class Session:
+    """
+    One practice session.
+
+    Messages are parallel arrays (role code byte + text); feedback scores
+    are a flat unsigned-byte array, len(SCORE_DIMENSIONS) values per scored
+    message, in SCORE_DIMENSIONS order.
+    """
+
+    __slots__ = (
+        "session_id", "user_id", "scenario_key", "avatar_id", "created_at", "last_access",
+        "roles", "texts", "scores", "quiz", "tracker", "size_bytes"
+    )
+
+    def __init__(self, session_id: str, user_id: str = None, scenario_key: str = None,
+                 avatar_id: str = None, created_at: float = None):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.scenario_key = scenario_key
+        self.avatar_id = avatar_id
+        self.created_at = created_at if created_at is not None else time.time()
+        self.last_access = self.created_at
+        self.roles = array("B")
+        self.texts = []
+        self.scores = array("B")
+        self.quiz = None
+        self.tracker = ConversationAdaptationTracker()
+        self.size_bytes = 512  # Fixed overhead estimate: slots, arrays, tracker
+
+    def add_message(self, role: str, content: str) -> str:
+        """
+        Append a message.
+
+        Returns:
+            Adaptive context text for user messages (from the session tracker), else ""
+        """
+        self.roles.append(ROLE_CODES[role])
+        self.texts.append(content)
+        self.size_bytes += sys.getsizeof(content) + 9  # text + list slot + role byte
+        if role == "user":
+            return self.tracker.observe(content)
+        return ""
+
+    def add_scores(self, feedback: dict):
+        """Record one feedback result (dict shaped like the feedback prompt JSON)."""
+        for dimension in SCORE_DIMENSIONS:
+            self.scores.append(max(0, min(100, int(round(feedback[dimension]["score"])))))
+        self.size_bytes += len(SCORE_DIMENSIONS)
+
+    @property
+    def message_count(self) -> int:
+        return len(self.texts)
+
+    @property
+    def score_count(self) -> int:
+        return len(self.scores) // len(SCORE_DIMENSIONS)
+
+    def history(self) -> list:
+        """Messages as [{'role', 'content'}] (the create_summary_prompt input shape)."""
+        return [{"role": ROLE_NAMES[code], "content": text} for code, text in zip(self.roles, self.texts)]
+
+    def feedback_scores(self) -> list:
+        """Scores as [{'tone': {'score': n}, ...}] (the create_summary_prompt input shape)."""
+        width = len(SCORE_DIMENSIONS)
+        return [
+            {dimension: {"score": self.scores[i + offset]} for offset, dimension in enumerate(SCORE_DIMENSIONS)}
+            for i in range(0, len(self.scores), width)
+        ]
+
+    def average_scores(self) -> dict:
+        """Per-dimension averages, or None without scores."""
+        count = self.score_count
+        if not count:
+            return None
+        width = len(SCORE_DIMENSIONS)
+        return {
+            dimension: sum(self.scores[offset::width]) / count
+            for offset, dimension in enumerate(SCORE_DIMENSIONS)
+        }
+
+    def to_dict(self) -> dict:
+        """JSON-compatible snapshot for spilling to disk."""
+        return {
+            "session_id": self.session_id,
+            "user_id": self.user_id,
+            "scenario_key": self.scenario_key,
+            "avatar_id": self.avatar_id,
+            "created_at": self.created_at,
+            "last_access": self.last_access,
+            "roles": self.roles.tobytes().hex(),
+            "texts": self.texts,
+            "scores": self.scores.tobytes().hex(),
+            "quiz": self.quiz,
+            "tracker": self.tracker.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Session":
+        """Rebuild a session from to_dict() output."""
+        session = cls(data["session_id"], data["user_id"], data["scenario_key"], data["avatar_id"], data["created_at"])
+        session.last_access = data["last_access"]
+        session.roles.frombytes(bytes.fromhex(data["roles"]))
+        session.texts = data["texts"]
+        session.scores.frombytes(bytes.fromhex(data["scores"]))
+        session.quiz = data["quiz"]
+        session.tracker = ConversationAdaptationTracker.from_dict(data["tracker"])
+        session.size_bytes += sum(sys.getsizeof(text) + 9 for text in session.texts) + len(session.scores)
+        return session
+
+
+class SessionStore:
+    """
+    LRU + idle-TTL session store with an optional disk spill tier.
+
+    When total estimated memory passes max_memory_bytes, the least recently
+    used sessions are written to spill_dir (if set) and dropped from memory;
+    get() rehydrates them transparently. Sessions idle for longer than
+    idle_ttl_seconds are removed from both tiers.
+    """
+
+    def __init__(self, max_memory_bytes: int = 64 * 1024 * 1024, idle_ttl_seconds: float = 1800,
+                 spill_dir: str = None):
+        self.max_memory_bytes = max_memory_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.spill_dir = spill_dir
+        self.evictions = 0
+        self.spills = 0
+        self.rehydrations = 0
+        self.expirations = 0
+        self._sessions = OrderedDict()
+        self._accounted = {}  # session_id -> size_bytes included in _memory_bytes
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def create(self, session_id: str, user_id: str = None, scenario_key: str = None, avatar_id: str = None) -> Session:
+        """Start a new session (replaces any existing one with the same id)."""
+        session = Session(session_id, user_id, scenario_key, avatar_id)
+        with self._lock:
+            self._forget(session_id)
+            self._sessions[session_id] = session
+            self._account(session)
+            self._remove_spill(session_id)
+            self._enforce_limits()
+        return session
+
+    def get(self, session_id: str) -> Session:
+        """
+        Fetch a live session (rehydrating from disk if it was spilled).
+
+        Returns:
+            The Session, or None if unknown or expired
+        """
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._read_spill(session_id)
+                if session is None:
+                    return None
+                self.rehydrations += 1
+                self._sessions[session_id] = session
+            self._account(session)
+            if now - session.last_access > self.idle_ttl_seconds:
+                self._drop(session_id)
+                self.expirations += 1
+                return None
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+            self._enforce_limits()
+        return session
+
+    def end(self, session_id: str) -> Session:
+        """Remove a finished session from both tiers and return it (for persistence)."""
+        with self._lock:
+            session = self._forget(session_id) or self._read_spill(session_id)
+            self._remove_spill(session_id)
+        return session
+
+    def memory_bytes(self) -> int:
+        """
+        Estimated memory held by in-memory sessions.
+
+        A running total: growth of a session is counted the next time it is
+        fetched with get(), not on every add_message().
+        """
+        with self._lock:
+            return self._memory_bytes
+
+    def expire_idle(self) -> int:
+        """Drop sessions idle beyond the TTL (run periodically). Returns how many were dropped."""
+        cutoff = time.time() - self.idle_ttl_seconds
+        dropped = 0
+        with self._lock:
+            for session_id in [sid for sid, session in self._sessions.items() if session.last_access < cutoff]:
+                self._drop(session_id)
+                dropped += 1
+            if self.spill_dir:
+                for name in os.listdir(self.spill_dir):
+                    path = os.path.join(self.spill_dir, name)
+                    if name.endswith(".json") and os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        dropped += 1
+        self.expirations += dropped
+        return dropped
+
+    def metrics(self) -> dict:
+        """Memory-per-session and eviction metrics."""
+        with self._lock:
+            count = len(self._sessions)
+            total = self._memory_bytes
+            spilled = len([name for name in os.listdir(self.spill_dir) if name.endswith(".json")]) if self.spill_dir else 0
+        return {
+            "sessions_in_memory": count,
+            "sessions_spilled": spilled,
+            "memory_bytes": total,
+            "avg_bytes_per_session": total / count if count else 0.0,
+            "evictions": self.evictions,
+            "spills": self.spills,
+            "rehydrations": self.rehydrations,
+            "expirations": self.expirations
+        }
+
+    def _account(self, session):
+        """Bring the running total up to date with a session's current size."""
+        previous = self._accounted.get(session.session_id, 0)
+        self._memory_bytes += session.size_bytes - previous
+        self._accounted[session.session_id] = session.size_bytes
+
+    def _forget(self, session_id):
+        """Remove a session from memory and the running total; returns it (or None)."""
+        session = self._sessions.pop(session_id, None)
+        self._memory_bytes -= self._accounted.pop(session_id, 0)
+        return session
+
+    def _enforce_limits(self):
+        while self._memory_bytes > self.max_memory_bytes and len(self._sessions) > 1:
+            session_id = next(iter(self._sessions))
+            session = self._forget(session_id)
+            self.evictions += 1
+            if self.spill_dir:
+                self._write_spill(session)
+                self.spills += 1
+
+    def _drop(self, session_id):
+        self._forget(session_id)
+        self._remove_spill(session_id)
+
+    def _spill_path(self, session_id):
+        # Hash the client-supplied id so it can never form a path outside spill_dir
+        name = hashlib.sha256(str(session_id).encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.spill_dir, f"{name}.json")
+
+    def _write_spill(self, session):
+        fd, tmp_path = tempfile.mkstemp(dir=self.spill_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(session.to_dict(), f)
+        path = self._spill_path(session.session_id)
+        os.replace(tmp_path, path)
+        os.utime(path, (session.last_access, session.last_access))  # expire_idle() reads idle time from mtime
+
+    def _read_spill(self, session_id):
+        if not self.spill_dir:
+            return None
+        path = self._spill_path(session_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                session = Session.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if session.session_id != session_id:
+            return None
+        os.remove(path)
+        return session
+
+    def _remove_spill(self, session_id):
+        if self.spill_dir:
+            try:
+                os.remove(self._spill_path(session_id))
+            except OSError:
+                pass
+
+
+# Export all components
+__all__ = [
+    'ROLE_CODES',
+    'Session',
+    'SessionStore'
+]
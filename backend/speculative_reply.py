@@ -0,0 +1,152 @@
+"""
+NeuroPilot - Speculative Reply Generation
+Starts the roleplay LLM call on a partial transcript once it has been stable
+for a short window, so most of the model latency hides behind the user's own
+end-of-speech pause. If the final transcript differs in anything but case,
+punctuation or spacing, the speculative call is cancelled and the reply is
+generated again.
+"""
+
+import asyncio
+import time
+
+from prompts.adaptive_agent_system import get_adaptive_context
+from prompts.feedback_cache import normalize_text
+from prompts.roleplay_prompts import get_roleplay_prompt
+
+
+def build_reply_system_prompt(scenario_key: str, tracker, user_message: str, user_profile: dict = None) -> str:
+    """
+    System prompt for a (possibly speculative) reply, without mutating the tracker.
+
+    Args:
+        scenario_key: Key from ROLEPLAY_PROMPTS
+        tracker: The session's ConversationAdaptationTracker (read only here)
+        user_message: Transcript the reply is for
+        user_profile: Optional user profile for personalization
+
+    Returns:
+        get_roleplay_prompt() output followed by the adaptive context
+    """
+    recent_lengths = (tracker.recent_lengths + [len(user_message)])[-tracker.window:]
+    adaptive_context = get_adaptive_context(tracker.user_message_count + 1, recent_lengths, user_message)
+    return get_roleplay_prompt(scenario_key, user_profile) + adaptive_context
+
+
+def transcripts_match(speculated: str, final: str) -> bool:
+    """
+    True if a reply generated for `speculated` is still valid for `final`.
+
+    Only case, punctuation and spacing may differ: any added, dropped or
+    changed word (a trailing clause, a "not") can change the meaning, so
+    it always counts as a miss.
+    """
+    return normalize_text(speculated) == normalize_text(final)
+
+
+class SpeculativeReplier:
+    """
+    Per-turn speculation controller.
+
+    Feed every partial transcript to on_partial(); call on_final() with the
+    final transcript to get the reply (speculative result on a hit, fresh
+    generation on a miss). Counters accumulate across turns for hit-rate metrics.
+    """
+
+    def __init__(self, generate, stability_window: float = 0.35):
+        self.generate = generate  # async callable(user_message) -> reply text
+        self.stability_window = stability_window
+        self.started = 0
+        self.cancelled = 0
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+        self._partial = ""
+        self._timer = None
+        self._speculation = None  # (text, task, started_at)
+
+    def on_partial(self, text: str):
+        """Record a partial transcript; (re)arms the stability timer when the text changes."""
+        if text == self._partial:
+            return
+        self._partial = text
+        if self._timer is not None:
+            self._timer.cancel()
+        if text.strip():
+            self._timer = asyncio.create_task(self._start_when_stable(text))
+
+    async def _start_when_stable(self, text: str):
+        await asyncio.sleep(self.stability_window)
+        if text != self._partial:
+            return
+        if self._speculation is not None:
+            if transcripts_match(self._speculation[0], text):
+                return  # Current speculation still fits
+            self._cancel_speculation()
+        self.started += 1
+        self._speculation = (text, asyncio.create_task(self.generate(text)), time.monotonic())
+
+    def _cancel_speculation(self):
+        if self._speculation is not None:
+            self._speculation[1].cancel()
+            self.cancelled += 1
+            self._speculation = None
+
+    async def on_final(self, text: str) -> str:
+        """
+        Return the reply for the final transcript.
+
+        Uses the speculative call when its transcript matches, otherwise
+        cancels it and generates a fresh reply.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._partial = ""
+
+        speculation, self._speculation = self._speculation, None
+        if speculation is not None:
+            speculated_text, task, started_at = speculation
+            if transcripts_match(speculated_text, text):
+                saved = time.monotonic() - started_at
+                try:
+                    reply = await task
+                except Exception:
+                    pass  # Speculative call failed: fall through to a fresh generation
+                else:
+                    self.hits += 1
+                    self.seconds_saved += saved
+                    return reply
+            else:
+                task.cancel()
+                self.cancelled += 1
+        self.misses += 1
+        return await self.generate(text)
+
+    def reset(self):
+        """Drop any pending speculation (e.g., the user abandoned the turn)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._partial = ""
+        self._cancel_speculation()
+
+    def stats(self) -> dict:
+        """Speculation hit/miss metrics."""
+        turns = self.hits + self.misses
+        return {
+            "started": self.started,
+            "cancelled": self.cancelled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / turns if turns else 0.0,
+            "seconds_saved": self.seconds_saved
+        }
+
+
+# Export all components
+__all__ = [
+    'SpeculativeReplier',
+    'build_reply_system_prompt',
+    'transcripts_match'
+]
@@ -0,0 +1,224 @@
+"""
+NeuroPilot - Streaming Speech-to-Text
+Chunked transcription over a WebSocket while the user is still speaking.
+The client streams 16 kHz mono PCM16 frames; the server emits partial
+transcripts as audio arrives and commits a segment at every pause, so the
+final transcript is ready almost as soon as the user stops talking.
+
+Protocol (JSON text messages from the server):
+    {"type": "partial", "text": "..."}   - best guess so far, may change
+    {"type": "segment", "text": "..."}   - text up to the last pause, stable
+    {"type": "final", "text": "..."}     - complete transcript after "stop"
+Client sends binary PCM frames, then the text message "stop".
+"""
+
+import asyncio
+import io
+import wave
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from backend.audio_preprocess import STT_SAMPLE_RATE
+
+BYTES_PER_SAMPLE = 2
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int = STT_SAMPLE_RATE) -> bytes:
+    """Wrap mono PCM16 in a WAV container for the STT API."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(BYTES_PER_SAMPLE)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class StreamingTranscriber:
+    """
+    Incremental transcription state for one utterance stream.
+
+    add_audio() is cheap (buffer + frame-energy VAD); step() does at most one
+    STT call - committing the current segment after a pause, or producing a
+    partial for the uncommitted audio; finish() returns the final transcript.
+    """
+
+    def __init__(self, transcribe, sample_rate: int = STT_SAMPLE_RATE, partial_interval: float = 0.8,
+                 silence_ms: int = 500, max_segment_seconds: float = 12.0,
+                 frame_ms: int = 30, min_db: float = -45.0):
+        if np is None:
+            raise ImportError("Streaming STT requires numpy")
+        self.transcribe = transcribe  # async callable(wav_bytes) -> text
+        self.sample_rate = sample_rate
+        self.partial_interval = partial_interval
+        self.silence_ms = silence_ms
+        self.max_segment_seconds = max_segment_seconds
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * BYTES_PER_SAMPLE
+        self.frame_ms = frame_ms
+        self.min_db = min_db
+        self.segments = []  # Committed segment texts
+        self.partial = ""
+        self.stt_calls = 0
+        self._pcm = bytearray()
+        self._vad_offset = 0  # Bytes already run through the VAD
+        self._segment_start = 0  # Start of uncommitted audio
+        self._last_partial_end = 0
+        self._segment_has_speech = False
+        self._last_speech_end = 0  # End offset of the most recent speech frame
+        self._trailing_silence_ms = 0
+
+    def add_audio(self, frame: bytes):
+        """Append a PCM16 frame and update the VAD state."""
+        self._pcm.extend(frame)
+        while self._vad_offset + self.frame_bytes <= len(self._pcm):
+            chunk = np.frombuffer(self._pcm, dtype=np.int16, count=self.frame_bytes // BYTES_PER_SAMPLE,
+                                  offset=self._vad_offset).astype(np.float32)
+            rms = float(np.sqrt(np.mean(chunk * chunk))) / 32768.0
+            level_db = 20.0 * np.log10(max(rms, 1e-10))
+            self._vad_offset += self.frame_bytes
+            if level_db > self.min_db:
+                self._segment_has_speech = True
+                self._last_speech_end = self._vad_offset
+                self._trailing_silence_ms = 0
+            else:
+                self._trailing_silence_ms += self.frame_ms
+
+    def _seconds(self, byte_count: int) -> float:
+        return byte_count / (self.sample_rate * BYTES_PER_SAMPLE)
+
+    @property
+    def text(self) -> str:
+        """Committed segments plus the current partial."""
+        return " ".join(part for part in self.segments + [self.partial] if part)
+
+    def due(self) -> bool:
+        """True if step() has work (a pause to commit or enough new audio for a partial)."""
+        if not self._segment_has_speech:
+            return False
+        if self._pause_reached() or self._segment_too_long():
+            return True
+        return self._seconds(len(self._pcm) - self._last_partial_end) >= self.partial_interval
+
+    def _pause_reached(self) -> bool:
+        return self._trailing_silence_ms >= self.silence_ms
+
+    def _segment_too_long(self) -> bool:
+        return self._seconds(len(self._pcm) - self._segment_start) >= self.max_segment_seconds
+
+    async def _transcribe(self, start: int, end: int) -> str:
+        self.stt_calls += 1
+        text = await self.transcribe(pcm_to_wav(bytes(self._pcm[start:end]), self.sample_rate))
+        return (text or "").strip()
+
+    async def step(self):
+        """
+        Do the next unit of transcription work.
+
+        Returns:
+            Event dict ('segment' or 'partial'), or None if nothing was due
+        """
+        if not self.due():
+            return None
+
+        end = len(self._pcm)
+        if self._pause_reached() or self._segment_too_long():
+            text = await self._transcribe(self._segment_start, end)
+            if text:
+                self.segments.append(text)
+            self.partial = ""
+            self._segment_start = end
+            self._last_partial_end = end
+            # Frames added while the STT call was in flight belong to the next segment
+            self._segment_has_speech = self._last_speech_end > end
+            return {"type": "segment", "text": self.text}
+
+        self.partial = await self._transcribe(self._segment_start, end)
+        self._last_partial_end = end
+        return {"type": "partial", "text": self.text}
+
+    async def finish(self) -> dict:
+        """Transcribe any uncommitted speech and return the final event."""
+        end = len(self._pcm)
+        if self._segment_has_speech and end > self._segment_start:
+            text = await self._transcribe(self._segment_start, end)
+            if text:
+                self.segments.append(text)
+            self._segment_start = end
+        self.partial = ""
+        return {"type": "final", "text": self.text}
+
+
+async def run_transcription_session(receive, send, transcriber: StreamingTranscriber) -> str:
+    """
+    Drive one WebSocket STT session.
+
+    STT calls run in the background so receiving frames never waits on the
+    provider; at most one call is in flight at a time.
+
+    Args:
+        receive: Async callable returning bytes (audio), str (control) or None (closed)
+        send: Async callable taking an event dict
+        transcriber: StreamingTranscriber for this utterance
+
+    Returns:
+        Final transcript text
+    """
+    worker = None
+
+    async def work():
+        while transcriber.due():
+            event = await transcriber.step()
+            if event is not None:
+                await send(event)
+
+    while True:
+        message = await receive()
+        if message is None or message == "stop":
+            break
+        if isinstance(message, (bytes, bytearray, memoryview)):
+            transcriber.add_audio(bytes(message))
+            if worker is not None and worker.done():
+                worker.result()  # Surface a failed STT call instead of starting a new worker
+                worker = None
+            if worker is None and transcriber.due():
+                worker = asyncio.create_task(work())
+
+    if worker is not None:
+        await worker
+    final = await transcriber.finish()
+    await send(final)
+    return final["text"]
+
+
+def groq_transcriber(client, model: str = "whisper-large-v3-turbo", language: str = "en"):
+    """
+    Build a transcribe() for StreamingTranscriber backed by Groq's Whisper API.
+
+    Args:
+        client: groq.Groq instance
+    """
+    def request(wav_bytes):
+        return client.audio.transcriptions.create(
+            file=("audio.wav", wav_bytes),
+            model=model,
+            language=language,
+            response_format="text"
+        )
+
+    async def transcribe(wav_bytes):
+        result = await asyncio.to_thread(request, wav_bytes)
+        return result if isinstance(result, str) else getattr(result, "text", "")
+
+    return transcribe
+
+
+# Export all components
+__all__ = [
+    'StreamingTranscriber',
+    'groq_transcriber',
+    'pcm_to_wav',
+    'run_transcription_session'
+]
@@ -0,0 +1,332 @@
+"""
+NeuroPilot - Pipeline Telemetry
+Span-style timing for the voice turn pipeline (upload, STT, prompt assembly,
+LLM, feedback, TTS, audio encoding), tagged with a request id. Durations feed
+in-process histograms per stage and provider (p50/p95/p99 without storing
+samples), which render as Prometheus text for a /metrics endpoint. Spans can
+also be appended to a local JSON-lines file; no external collector is needed.
+
+Usage:
+    tracer = Tracer(span_log_path="logs/spans.jsonl")
+
+    with tracer.request("converse") as trace:
+        with tracer.span("stt", provider="groq"):
+            text = await transcribe(audio)
+        ...
+    response.headers["Server-Timing"] = trace.server_timing()
+"""
+
+import bisect
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Upper bounds in seconds; +Inf is implicit
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+PIPELINE_STAGES = ("upload", "stt", "prompt", "llm", "feedback", "tts", "encode")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_current_trace = contextvars.ContextVar("neuropilot_trace", default=None)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (Prometheus-compatible, O(1) memory)."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by linear interpolation within its bucket
+        (the same estimate as PromQL histogram_quantile()).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]  # Beyond the largest bound
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def cumulative_counts(self) -> list:
+        """(upper bound label, cumulative count) pairs including +Inf."""
+        pairs = []
+        total = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), self.counts):
+            total += bucket_count
+            pairs.append(("+Inf" if bound == float("inf") else f"{bound:g}", total))
+        return pairs
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}"
+
+
+class MetricsRegistry:
+    """Latency histograms per endpoint and per (stage, provider), plus error counters."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.requests = {}  # (endpoint,) -> LatencyHistogram
+        self.stages = {}  # (stage, provider) -> LatencyHistogram
+        self.request_errors = {}  # (endpoint,) -> count
+        self.stage_errors = {}  # (stage, provider) -> count
+        self._lock = threading.Lock()
+
+    def _observe(self, histograms: dict, key: tuple, seconds: float):
+        with self._lock:
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+
+    def _count_error(self, counters: dict, key: tuple):
+        with self._lock:
+            counters[key] = counters.get(key, 0) + 1
+
+    def observe_request(self, endpoint: str, seconds: float, error: bool = False):
+        self._observe(self.requests, (endpoint,), seconds)
+        if error:
+            self._count_error(self.request_errors, (endpoint,))
+
+    def observe_stage(self, stage: str, provider: str, seconds: float, error: bool = False):
+        key = (stage, provider or "local")
+        self._observe(self.stages, key, seconds)
+        if error:
+            self._count_error(self.stage_errors, key)
+
+    def snapshot(self) -> dict:
+        """p50/p95/p99 (ms), count and errors per endpoint and per stage/provider."""
+        def describe(histogram, errors):
+            summary = {f"p{int(q * 100)}_ms": histogram.quantile(q) * 1000.0 for q in QUANTILES}
+            summary["count"] = histogram.count
+            summary["mean_ms"] = histogram.sum / histogram.count * 1000.0 if histogram.count else 0.0
+            summary["errors"] = errors
+            return summary
+
+        with self._lock:
+            return {
+                "requests": {endpoint: describe(histogram, self.request_errors.get((endpoint,), 0))
+                             for (endpoint,), histogram in sorted(self.requests.items())},
+                "stages": {f"{stage}/{provider}": describe(histogram, self.stage_errors.get((stage, provider), 0))
+                           for (stage, provider), histogram in sorted(self.stages.items())}
+            }
+
+    def render_prometheus(self, prefix: str = "neuropilot") -> str:
+        """Prometheus text exposition of every histogram, quantile estimate and error counter."""
+        lines = []
+        with self._lock:
+            families = (
+                (f"{prefix}_request_duration_seconds", "End-to-end API request latency", ("endpoint",),
+                 self.requests, f"{prefix}_request_errors_total", "Failed API requests", self.request_errors),
+                (f"{prefix}_stage_duration_seconds", "Voice pipeline stage latency", ("stage", "provider"),
+                 self.stages, f"{prefix}_stage_errors_total", "Failed pipeline stage calls", self.stage_errors),
+            )
+            for name, help_text, label_names, histograms, error_name, error_help, errors in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(histograms.items()):
+                    for bound, total in histogram.cumulative_counts():
+                        le = f'le="{bound}"'
+                        lines.append(f"{name}_bucket{_labels(label_names, key, le)} {total}")
+                    lines.append(f"{name}_sum{_labels(label_names, key)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_labels(label_names, key)} {histogram.count}")
+
+                lines.append(f"# HELP {name}_quantile Estimated latency quantiles from the histogram buckets")
+                lines.append(f"# TYPE {name}_quantile gauge")
+                for key, histogram in sorted(histograms.items()):
+                    for q in QUANTILES:
+                        quantile = f'quantile="{q:g}"'
+                        lines.append(f"{name}_quantile{_labels(label_names, key, quantile)} {histogram.quantile(q):.6f}")
+
+                lines.append(f"# HELP {error_name} {error_help}")
+                lines.append(f"# TYPE {error_name} counter")
+                for key, count in sorted(errors.items()):
+                    lines.append(f"{error_name}{_labels(label_names, key)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def build_metrics_response(registry: MetricsRegistry):
+    """
+    Framework-agnostic body of the /metrics endpoint.
+
+    Returns:
+        (status_code, headers dict, body bytes)
+    """
+    body = registry.render_prometheus().encode("utf-8")
+    return 200, {"Content-Type": PROMETHEUS_CONTENT_TYPE, "Content-Length": str(len(body))}, body
+
+
+class SpanLogWriter:
+    """Appends finished spans to a local JSON-lines file."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class RequestTrace:
+    """
+    Spans recorded for one API request.
+
+    Background tasks started inside the request inherit it through the
+    context variable; once the request finishes the trace is closed, and
+    their later spans only reach the histograms and span log.
+    """
+
+    __slots__ = ("request_id", "endpoint", "started_at", "spans", "closed")
+
+    def __init__(self, request_id: str, endpoint: str):
+        self.request_id = request_id
+        self.endpoint = endpoint
+        self.started_at = time.time()
+        self.spans = []  # (stage, provider, seconds, error)
+        self.closed = False
+
+    def stage_seconds(self) -> dict:
+        """Total seconds per stage (a stage may run more than once per request)."""
+        totals = {}
+        for stage, _, seconds, _ in self.spans:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value ('stt;dur=812.4, llm;dur=430.0')."""
+        return ", ".join(f"{stage};dur={seconds * 1000.0:.1f}" for stage, seconds in self.stage_seconds().items())
+
+
+class Tracer:
+    """
+    Creates request traces and stage spans.
+
+    The current trace travels in a context variable, so spans opened anywhere
+    below request() (including asyncio tasks started inside it) carry its
+    request id.
+    """
+
+    def __init__(self, registry: MetricsRegistry = None, span_log_path: str = None):
+        self.registry = registry or MetricsRegistry()
+        self.span_log = SpanLogWriter(span_log_path) if span_log_path else None
+
+    @contextmanager
+    def request(self, endpoint: str, request_id: str = None):
+        """Time one API request; yields its RequestTrace."""
+        trace = RequestTrace(request_id or uuid.uuid4().hex, endpoint)
+        token = _current_trace.set(trace)
+        started = time.perf_counter()
+        error = False
+        try:
+            yield trace
+        except BaseException:
+            error = True
+            raise
+        finally:
+            trace.closed = True
+            _current_trace.reset(token)
+            seconds = time.perf_counter() - started
+            self.registry.observe_request(endpoint, seconds, error)
+            self._log(trace, "request", None, trace.started_at, seconds, error)
+            if self.span_log is not None:
+                self.span_log.flush()
+
+    @contextmanager
+    def span(self, stage: str, provider: str = None):
+        """Time one pipeline stage of the current request."""
+        trace = _current_trace.get()
+        started_at = time.time()
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.registry.observe_stage(stage, provider, seconds, error)
+            if trace is not None and not trace.closed:
+                trace.spans.append((stage, provider, seconds, error))
+            self._log(trace, stage, provider, started_at, seconds, error)
+
+    def _log(self, trace, stage, provider, started_at, seconds, error):
+        if self.span_log is None:
+            return
+        self.span_log.write({
+            "request_id": trace.request_id if trace is not None else None,
+            "endpoint": trace.endpoint if trace is not None else None,
+            "stage": stage,
+            "provider": provider,
+            "start": started_at,
+            "duration_ms": round(seconds * 1000.0, 3),
+            "error": error
+        })
+
+    def close(self):
+        if self.span_log is not None:
+            self.span_log.close()
+
+
+def current_request_id() -> str:
+    """Request id of the trace in the current context, or None."""
+    trace = _current_trace.get()
+    return trace.request_id if trace is not None else None
+
+
+# Export all components
+__all__ = [
+    'LatencyHistogram',
+    'MetricsRegistry',
+    'PIPELINE_STAGES',
+    'RequestTrace',
+    'SpanLogWriter',
+    'Tracer',
+    'build_metrics_response',
+    'current_request_id'
+]
@@ -0,0 +1,203 @@
+"""
+NeuroPilot - Streaming TTS
+Splits the AI reply into sentences as LLM tokens stream in, synthesizes the
+sentences concurrently (ElevenLabs or gTTS) and emits the audio chunks in
+order, so playback starts after roughly one sentence's synthesis time.
+"""
+
+import asyncio
+import base64
+import io
+import json
+import re
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+")
+
+
+class SentenceChunker:
+    """
+    Incremental sentence splitter for streamed LLM text.
+
+    Sentences shorter than min_chars are merged with the next one so we do
+    not synthesize tiny clips ("Oh!"), except the very first chunk, which
+    only needs first_min_chars to get audio out quickly.
+    """
+
+    def __init__(self, min_chars: int = 40, first_min_chars: int = 12):
+        self.min_chars = min_chars
+        self.first_min_chars = first_min_chars
+        self._buffer = ""
+        self._emitted = 0
+
+    def feed(self, text: str) -> list:
+        """
+        Add streamed text.
+
+        Returns:
+            List of complete sentence chunks ready for synthesis
+        """
+        self._buffer += text
+        chunks = []
+        search_from = 0
+        while True:
+            match = _SENTENCE_END.search(self._buffer, search_from)
+            if match is None:
+                break
+            minimum = self.first_min_chars if self._emitted == 0 and not chunks else self.min_chars
+            candidate = self._buffer[:match.end()].strip()
+            if len(candidate) < minimum:
+                search_from = match.end()
+                continue
+            chunks.append(candidate)
+            self._buffer = self._buffer[match.end():]
+            search_from = 0
+        self._emitted += len(chunks)
+        return chunks
+
+    def flush(self) -> list:
+        """Return whatever is left once the LLM stream ends."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        if not remainder:
+            return []
+        self._emitted += 1
+        return [remainder]
+
+
+def split_sentences(text: str, min_chars: int = 40, first_min_chars: int = 12) -> list:
+    """Split a complete reply into synthesis chunks (non-streaming callers)."""
+    chunker = SentenceChunker(min_chars, first_min_chars)
+    return chunker.feed(text + " ") + chunker.flush()
+
+
+async def stream_tts(token_stream, synthesize, max_concurrency: int = 3,
+                     min_chars: int = 40, first_min_chars: int = 12):
+    """
+    Turn a stream of LLM tokens into an ordered stream of audio chunks.
+
+    Synthesis of later sentences overlaps with both the LLM stream and the
+    playback of earlier chunks; output order always matches sentence order.
+
+    Args:
+        token_stream: Async iterable of text deltas from the LLM
+        synthesize: Async callable(text) -> audio bytes
+        max_concurrency: Sentences synthesized at the same time
+        min_chars: Minimum chunk length after the first chunk
+        first_min_chars: Minimum length of the first chunk
+
+    Yields:
+        (index, sentence_text, audio_bytes) tuples in order
+    """
+    chunker = SentenceChunker(min_chars, first_min_chars)
+    slots = asyncio.Semaphore(max_concurrency)
+    pending = asyncio.Queue()  # (index, text, task) in sentence order; None ends the stream
+
+    async def synthesize_limited(text):
+        async with slots:
+            return await synthesize(text)
+
+    async def produce():
+        index = 0
+        try:
+            async for delta in token_stream:
+                for sentence in chunker.feed(delta):
+                    await pending.put((index, sentence, asyncio.create_task(synthesize_limited(sentence))))
+                    index += 1
+            for sentence in chunker.flush():
+                await pending.put((index, sentence, asyncio.create_task(synthesize_limited(sentence))))
+                index += 1
+        finally:
+            await pending.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await pending.get()
+            if item is None:
+                break
+            index, sentence, task = item
+            yield index, sentence, await task
+        await producer  # Surface LLM stream errors
+    finally:
+        producer.cancel()
+        while not pending.empty():
+            item = pending.get_nowait()
+            if item is not None:
+                item[2].cancel()
+
+
+def encode_audio_frame(index: int, text: str, audio: bytes) -> bytes:
+    """One NDJSON line carrying a base64 MP3 chunk (see frontend playAudioStream)."""
+    return (json.dumps({
+        "index": index,
+        "text": text,
+        "audio": base64.b64encode(audio).decode("ascii")
+    }) + "\n").encode("utf-8")
+
+
+async def ndjson_audio_stream(chunks):
+    """
+    Wrap stream_tts() output as an NDJSON byte stream for a streaming HTTP response.
+
+    Yields:
+        One encoded line per chunk, then a final {"done": true, "chunks": N} line
+    """
+    count = 0
+    async for index, text, audio in chunks:
+        count += 1
+        yield encode_audio_frame(index, text, audio)
+    yield (json.dumps({"done": True, "chunks": count}) + "\n").encode("utf-8")
+
+
+def gtts_synthesizer(lang: str = "en", tld: str = "com"):
+    """
+    Build a gTTS-backed synthesize() for stream_tts (free fallback engine).
+    """
+    from gtts import gTTS
+
+    def render(text):
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, tld=tld).write_to_fp(buffer)
+        return buffer.getvalue()
+
+    async def synthesize(text):
+        return await asyncio.to_thread(render, text)
+
+    return synthesize
+
+
+def elevenlabs_synthesizer(client, voice_id: str, model_id: str = "eleven_turbo_v2_5",
+                           output_format: str = "mp3_44100_128"):
+    """
+    Build an ElevenLabs-backed synthesize() for stream_tts.
+
+    Args:
+        client: elevenlabs.client.ElevenLabs instance
+        voice_id: Voice to use (e.g., mapped from the selected avatar)
+    """
+    def render(text):
+        audio = client.text_to_speech.convert(
+            voice_id=voice_id,
+            text=text,
+            model_id=model_id,
+            output_format=output_format
+        )
+        return audio if isinstance(audio, bytes) else b"".join(audio)
+
+    async def synthesize(text):
+        return await asyncio.to_thread(render, text)
+
+    return synthesize
+
+
+# Export all components
+__all__ = [
+    'SentenceChunker',
+    'split_sentences',
+    'stream_tts',
+    'encode_audio_frame',
+    'ndjson_audio_stream',
+    'gtts_synthesizer',
+    'elevenlabs_synthesizer'
+]
@@ -19,6 +19,7 @@ function App() {
   const mediaRecorderRef = useRef(null)
   const audioChunksRef = useRef([])
   const messagesEndRef = useRef(null)
+  const resultStreamRef = useRef(null) // SSE stream for deferred feedback/summary
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
@@ -28,13 +29,48 @@ function App() {
     scrollToBottom()
   }, [messages])
 
+  // Close the deferred-results stream on unmount
+  useEffect(() => () => closeResultStream(), [])
+
+  const closeResultStream = () => {
+    if (resultStreamRef.current) {
+      resultStreamRef.current.close()
+      resultStreamRef.current = null
+    }
+  }
+
+  // Feedback and overall summary arrive later over server-sent events
+  const subscribeToResults = (sid) => {
+    if (resultStreamRef.current) return
+    
+    const source = new EventSource(`/api/audio/events/${sid}`)
+    
+    source.addEventListener('feedback', (event) => {
+      const payload = JSON.parse(event.data)
+      if (payload.status === 'done' && payload.result) {
+        setFeedback(payload.result)
+      }
+    })
+    
+    source.addEventListener('overall_summary', (event) => {
+      const payload = JSON.parse(event.data)
+      if (payload.status === 'done' && payload.result) {
+        setOverallSummary(payload.result)
+      }
+    })
+    
+    resultStreamRef.current = source
+  }
+
   const startConversation = async () => {
     setIsProcessing(true)
     setError(null)
+    closeResultStream()
     
     try {
       const formData = new FormData()
       formData.append('user_name', 'User')
+      formData.append('audio_transport', 'binary')  // Ask for an audio URL instead of base64
       
       const response = await fetch('/api/audio/start', {
         method: 'POST',
@@ -51,7 +87,9 @@ function App() {
         timestamp: new Date()
       }])
       
-      if (data.audio_response) {
+      if (data.audio_url) {
+        playAudioUrl(data.audio_url)
+      } else if (data.audio_response) {
         playAudio(data.audio_response)
       }
     } catch (err) {
@@ -105,6 +143,8 @@ function App() {
       formData.append('audio', audioBlob, 'audio.wav')
       formData.append('session_id', sessionId)
       formData.append('include_feedback', 'false')  // ⚡ DISABLED to avoid Groq rate limits
+      formData.append('defer_feedback', 'true')  // Feedback/summary come back later via SSE
+      formData.append('audio_transport', 'binary')
       
       const response = await fetch('/api/audio/converse', {
         method: 'POST',
@@ -128,6 +168,11 @@ function App() {
       
       setMessageCount(data.conversation_count)
       
+      // Deferred feedback/summary jobs - results arrive on the event stream
+      if (data.job_id || data.pending_jobs?.length) {
+        subscribeToResults(sessionId)
+      }
+      
       // Handle feedback
       if (data.feedback) {
         setFeedback(data.feedback)
@@ -145,7 +190,11 @@ function App() {
         setQuizResult(null)
       }
       
-      if (data.audio_response) {
+      if (data.audio_stream_url) {
+        playAudioStream(data.audio_stream_url, data.quiz) // Sentence chunks play as they arrive
+      } else if (data.audio_url) {
+        playAudioUrl(data.audio_url, data.quiz)
+      } else if (data.audio_response) {
         playAudio(data.audio_response, data.quiz) // Pass quiz to show after audio
       }
     } catch (err) {
@@ -156,8 +205,13 @@ function App() {
   }
 
   const playAudio = (base64Audio, quizToShowAfter = null) => {
+    playAudioUrl(`data:audio/mp3;base64,${base64Audio}`, quizToShowAfter)
+  }
+
+  // Plays a served clip (/api/audio/clip/<id>) - the browser streams it with range requests
+  const playAudioUrl = (url, quizToShowAfter = null) => {
     try {
-      const audio = new Audio(`data:audio/mp3;base64,${base64Audio}`)
+      const audio = new Audio(url)
       
       // Show quiz AFTER audio finishes playing
       audio.onended = () => {
@@ -178,6 +232,69 @@ function App() {
     }
   }
 
+  // Play sentence-sized MP3 chunks from an NDJSON stream in order, as soon as each arrives
+  const playAudioStream = async (url, quizToShowAfter = null) => {
+    const queue = []
+    let playing = false
+    let finished = false
+    
+    const showQuiz = () => {
+      if (quizToShowAfter) {
+        setQuiz(quizToShowAfter)
+        setPendingQuiz(null)
+      }
+    }
+    
+    const playNext = () => {
+      const chunk = queue.shift()
+      if (!chunk) {
+        playing = false
+        if (finished) showQuiz()
+        return
+      }
+      playing = true
+      const audio = new Audio(`data:audio/mp3;base64,${chunk}`)
+      // onerror and the play() rejection can both fire for one bad chunk - advance only once
+      let advanced = false
+      const advance = () => {
+        if (advanced) return
+        advanced = true
+        playNext()
+      }
+      audio.onended = advance
+      audio.onerror = advance
+      audio.play().catch(advance)
+    }
+    
+    try {
+      const response = await fetch(url)
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffered = ''
+      
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffered += decoder.decode(value, { stream: true })
+        const lines = buffered.split('\n')
+        buffered = lines.pop()
+        for (const line of lines) {
+          if (!line.trim()) continue
+          const frame = JSON.parse(line)
+          if (frame.audio) {
+            queue.push(frame.audio)
+            if (!playing) playNext()
+          }
+        }
+      }
+    } catch (err) {
+      console.error('Audio stream error:', err)
+    }
+    
+    finished = true
+    if (!playing) showQuiz()
+  }
+
   const submitQuiz = async () => {
     if (!quiz || selectedAnswer === null) return
     
@@ -642,6 +759,7 @@ function App() {
             
             <button
               onClick={() => {
+                closeResultStream()
                 setOverallSummary(null)
                 setSessionId(null)
                 setMessages([])
@@ -2,41 +2,107 @@
 NeuroPilot Prompts Package
 Core prompt templates for conversation simulation, feedback, and summaries.
 Enhanced with adaptive neurodiversity-aware intelligence.
+
+Submodules are imported lazily: `from prompts import X` loads only the
+module that defines X, and scenario/avatar definitions are read from
+prompts/data on first use (see scenario_registry).
 """
 
-from .roleplay_prompts import (
-    get_roleplay_prompt,
-    list_scenarios,
-    ROLEPLAY_PROMPTS
-)
+import importlib
+
+# Submodule -> public names, imported on first attribute access so that
+# importing one submodule (or the package) does not load all the others
+_LAZY_IMPORTS = {
+    'roleplay_prompts': (
+        'get_roleplay_prompt',
+        'list_scenarios',
+        'ROLEPLAY_PROMPTS'
+    ),
+    'feedback_prompts': (
+        'create_feedback_prompt',
+        'create_inline_feedback_prompt',
+        'create_budgeted_feedback_prompt',
+        'create_batch_feedback_prompt',
+        'parse_batch_feedback_response',
+        'validate_feedback_result',
+        'FEEDBACK_SYSTEM_PROMPT',
+        'FEEDBACK_PROMPT_VERSION',
+        'SCORING_RUBRIC'
+    ),
+    'feedback_cache': ('FeedbackCache',),
+    'summary_prompts': (
+        'create_summary_prompt',
+        'create_progress_prompt',
+        'create_budgeted_summary_prompt',
+        'SummaryAccumulator',
+        'SUMMARY_SYSTEM_PROMPT'
+    ),
+    'adaptive_agent_system': (
+        'get_adaptive_context',
+        'get_adaptive_context_batch',
+        'classify_markers',
+        'classify_markers_batch',
+        'ConversationAdaptationTracker',
+        'ADAPTIVE_AGENT_CORE',
+        'NEURODIVERSITY_PATTERNS',
+        'ENGAGEMENT_MONITORING_PROMPT',
+        'CONVERSATION_CHECKPOINT_SYSTEM'
+    ),
+    'adaptive_analytics': (
+        'analyze_adaptation_signals',
+        'marker_flags'
+    ),
+    'progress_rollups': (
+        'compute_trends',
+        'format_trend_summary',
+        'RunningStats',
+        'UserProgressRollup'
+    ),
+    'token_budget': (
+        'estimate_tokens',
+        'trim_to_tokens'
+    ),
+    'token_accounting': (
+        'TokenLedger',
+        'create_policy_feedback_prompt',
+        'template_token_costs'
+    ),
+    'scenario_registry': (
+        'ScenarioRegistry',
+        'get_registry',
+        'get_snapshot'
+    ),
+    'avatar_profiles': (
+        'get_avatar_profile',
+        'get_all_avatars',
+        'get_avatar_for_scenario',
+        'AVATAR_PROFILES'
+    ),
+    'prompt_compiler': (
+        'compile_system_prompt',
+        'get_static_prefix',
+        'get_prompt_version',
+        'lean_token_report',
+        'LEAN_PROMPT_VERSION',
+        'PROMPT_VERSION'
+    ),
+    'prompt_minifier': ('minify_prompt',)
+}
+
+_EXPORTS = {name: module for module, names in _LAZY_IMPORTS.items() for name in names}
 
-from .feedback_prompts import (
-    create_feedback_prompt,
-    create_inline_feedback_prompt,
-    FEEDBACK_SYSTEM_PROMPT,
-    SCORING_RUBRIC
-)
 
-from .summary_prompts import (
-    create_summary_prompt,
-    create_progress_prompt,
-    SUMMARY_SYSTEM_PROMPT
-)
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Not cached in globals(): PROMPT_VERSION and friends follow hot reloads
+    return getattr(importlib.import_module(f".{module}", __name__), name)
 
-from .adaptive_agent_system import (
-    get_adaptive_context,
-    ADAPTIVE_AGENT_CORE,
-    NEURODIVERSITY_PATTERNS,
-    ENGAGEMENT_MONITORING_PROMPT,
-    CONVERSATION_CHECKPOINT_SYSTEM
-)
 
-from .avatar_profiles import (
-    get_avatar_profile,
-    get_all_avatars,
-    get_avatar_for_scenario,
-    AVATAR_PROFILES
-)
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 
 __all__ = [
     # Roleplay
@@ -47,24 +113,71 @@ __all__ = [
     # Feedback
     'create_feedback_prompt',
     'create_inline_feedback_prompt',
+    'create_budgeted_feedback_prompt',
+    'create_batch_feedback_prompt',
+    'parse_batch_feedback_response',
+    'validate_feedback_result',
     'FEEDBACK_SYSTEM_PROMPT',
+    'FEEDBACK_PROMPT_VERSION',
     'SCORING_RUBRIC',
+    'FeedbackCache',
     
     # Summary
     'create_summary_prompt',
     'create_progress_prompt',
+    'create_budgeted_summary_prompt',
+    'SummaryAccumulator',
     'SUMMARY_SYSTEM_PROMPT',
     
     # Adaptive Agent System
     'get_adaptive_context',
+    'get_adaptive_context_batch',
+    'classify_markers',
+    'classify_markers_batch',
+    'ConversationAdaptationTracker',
     'ADAPTIVE_AGENT_CORE',
     'NEURODIVERSITY_PATTERNS',
     'ENGAGEMENT_MONITORING_PROMPT',
     'CONVERSATION_CHECKPOINT_SYSTEM',
     
+    # Adaptive Analytics
+    'analyze_adaptation_signals',
+    'marker_flags',
+    
+    # Progress Rollups
+    'compute_trends',
+    'format_trend_summary',
+    'RunningStats',
+    'UserProgressRollup',
+    
+    # Token Budget
+    'estimate_tokens',
+    'trim_to_tokens',
+    
+    # Token Accounting
+    'TokenLedger',
+    'create_policy_feedback_prompt',
+    'template_token_costs',
+    
     # Avatar Profiles
     'get_avatar_profile',
     'get_all_avatars',
     'get_avatar_for_scenario',
     'AVATAR_PROFILES',
+    
+    # Scenario Registry
+    'ScenarioRegistry',
+    'get_registry',
+    'get_snapshot',
+    
+    # Prompt Compiler
+    'compile_system_prompt',
+    'get_static_prefix',
+    'get_prompt_version',
+    'lean_token_report',
+    'LEAN_PROMPT_VERSION',
+    'PROMPT_VERSION',
+    
+    # Lean Prompts
+    'minify_prompt',
 ]
@@ -3,6 +3,8 @@ NeuroPilot - Adaptive Agent System
 Core intelligence for neurodiversity-aware conversation adaptation
 """
 
+import re
+
 ADAPTIVE_AGENT_CORE = """You are NeuroPilot, an AI social confidence coach specifically designed to support neurodiverse individuals (ADHD, autism, dyslexia, social anxiety, etc.) in practicing real-world conversations.
 
 🧠 CORE PRINCIPLES:
@@ -185,6 +187,110 @@ After approximately every 5-7 message exchanges, naturally offer a check-in:
 """
 
 
+ANXIETY_MARKERS = ["sorry", "um", "uh", "i think", "maybe", "not sure", "probably"]
+ENTHUSIASM_MARKERS = ["!", "love", "excited", "amazing", "awesome", "great"]
+EXIT_SIGNALS = ["should go", "gotta run", "thanks for", "bye", "later", "take care"]
+
+# Adaptation thresholds
+VERY_SHORT_CHARS = 20
+VERY_LONG_CHARS = 200
+ENERGY_DROP_RATIO = 0.5  # Latest length below this fraction of the oldest in the window
+ENERGY_WINDOW = 3
+CHECKPOINT_MESSAGES = (5, 10, 15)
+LONG_CONVERSATION_MESSAGES = 20
+
+
+# Patterns for markers that need more than a word-bounded literal: filler
+# words may be drawn out ("ummm", "uhh"), "bye" also ends "goodbye", and
+# "love"/"great" cover their common inflections
+MARKER_OVERRIDES = {
+    "um": r"\bum+\b",
+    "uh": r"\buh+\b",
+    "love": r"\blov(?:e|ed|es|ely|ing)\b",
+    "great": r"\bgreat\w*",
+    "bye": r"bye\b"
+}
+
+
+def _marker_pattern(markers: list) -> str:
+    """Alternation for one marker list, word-bounded wherever the marker starts/ends with a word char."""
+    parts = []
+    for marker in sorted(markers, key=len, reverse=True):
+        if marker in MARKER_OVERRIDES:
+            parts.append(MARKER_OVERRIDES[marker])
+            continue
+        part = re.escape(marker)
+        if re.match(r"\w", marker):
+            part = r"\b" + part
+        if re.search(r"\w$", marker):
+            part += r"\b"
+        parts.append(part)
+    return "|".join(parts)
+
+
+_MARKER_FIRST_CHARS = "".join(sorted({marker[0] for marker in ANXIETY_MARKERS + ENTHUSIASM_MARKERS + EXIT_SIGNALS}))
+
+# One compiled alternation classifies a message in a single scan
+# (word boundaries stop "um" matching "umbrella" and "later" matching "translater");
+# the leading lookahead skips positions no marker can start at
+MARKER_PATTERN = re.compile(
+    f"(?=[{re.escape(_MARKER_FIRST_CHARS)}])"
+    f"(?:(?P<anxiety>{_marker_pattern(ANXIETY_MARKERS)})"
+    f"|(?P<enthusiasm>{_marker_pattern(ENTHUSIASM_MARKERS)})"
+    f"|(?P<exit>{_marker_pattern(EXIT_SIGNALS)}))",
+    re.IGNORECASE
+)
+
+
+def classify_markers(user_message: str) -> set:
+    """
+    Detect which marker categories appear in a message (single pass).
+    
+    Args:
+        user_message: Message text
+    
+    Returns:
+        Set containing any of 'anxiety', 'enthusiasm', 'exit'
+    """
+    found = set()
+    for match in MARKER_PATTERN.finditer(user_message):
+        found.add(match.lastgroup)
+        if len(found) == 3:
+            break
+    return found
+
+
+def classify_markers_batch(user_messages: list) -> list:
+    """
+    Classify many messages with one scan of MARKER_PATTERN over all of them.
+    
+    Args:
+        user_messages: Message texts
+    
+    Returns:
+        List of category sets (see classify_markers), one per message, in input order
+    """
+    # No marker pattern can match across the newline joining two messages
+    ends = []
+    position = -1
+    for message in user_messages:
+        position += len(message) + 1
+        ends.append(position)  # Index of the separator after each message
+    found = [set() for _ in user_messages]
+    index = 0
+    for match in MARKER_PATTERN.finditer("\n".join(user_messages)):
+        while ends[index] < match.start():
+            index += 1
+        found[index].add(match.lastgroup)
+    return found
+
+
+def _energy_drop(recent_message_lengths: list) -> bool:
+    if len(recent_message_lengths) >= ENERGY_WINDOW:
+        return recent_message_lengths[-1] < recent_message_lengths[0] * ENERGY_DROP_RATIO
+    return False
+
+
 def get_adaptive_context(user_message_count: int, recent_message_lengths: list, user_message: str) -> str:
     """
     Generate adaptive context instructions based on conversation state.
@@ -197,43 +303,48 @@ def get_adaptive_context(user_message_count: int, recent_message_lengths: list,
     Returns:
         Contextual adaptation instructions for the AI
     """
+    return _format_adaptations(user_message_count, bool(recent_message_lengths),
+                               _energy_drop(recent_message_lengths), user_message)
+
+
+def _format_adaptations(user_message_count: int, has_length_history: bool, energy_drop: bool, user_message: str,
+                        markers: set = None) -> str:
+    """Shared rule set behind get_adaptive_context() and ConversationAdaptationTracker."""
     adaptations = []
     
     # Check message length trend
-    if recent_message_lengths:
-        avg_length = sum(recent_message_lengths) / len(recent_message_lengths)
+    if has_length_history:
         current_length = len(user_message)
         
-        if current_length < 20:  # Very short
+        if current_length < VERY_SHORT_CHARS:  # Very short
             adaptations.append("User is sending very brief messages. Respond with 1-2 short sentences. Keep questions simple and direct.")
-        elif current_length > 200:  # Very long
+        elif current_length > VERY_LONG_CHARS:  # Very long
             adaptations.append("User is sending detailed messages. Match their depth. Show you're reading carefully by referencing specific details they mentioned.")
         
         # Detect energy drop
-        if len(recent_message_lengths) >= 3:
-            if recent_message_lengths[-1] < recent_message_lengths[0] * 0.5:
-                adaptations.append("User's message length is decreasing - they may be getting tired. Consider offering a natural pause point soon.")
+        if energy_drop:
+            adaptations.append("User's message length is decreasing - they may be getting tired. Consider offering a natural pause point soon.")
+    
+    if markers is None:
+        markers = classify_markers(user_message)
     
     # Check for anxiety markers
-    anxiety_markers = ["sorry", "um", "uh", "i think", "maybe", "not sure", "probably"]
-    if any(marker in user_message.lower() for marker in anxiety_markers):
+    if "anxiety" in markers:
         adaptations.append("User shows signs of uncertainty. Provide extra reassurance and lower pressure.")
     
     # Check for enthusiasm
-    enthusiasm_markers = ["!", "love", "excited", "amazing", "awesome", "great"]
-    if any(marker in user_message.lower() for marker in enthusiasm_markers):
+    if "enthusiasm" in markers:
         adaptations.append("User is showing enthusiasm! Match their positive energy.")
     
     # Conversation length checkpoints
-    if user_message_count in [5, 10, 15]:
+    if user_message_count in CHECKPOINT_MESSAGES:
         adaptations.append(f"Natural checkpoint (message #{user_message_count}). Consider weaving in a subtle check-in or offering option to continue/pause.")
     
-    if user_message_count >= 20:
+    if user_message_count >= LONG_CONVERSATION_MESSAGES:
         adaptations.append("Long conversation. Gently suggest wrapping up or taking a break unless user is clearly still engaged.")
     
     # Detect exit signals
-    exit_signals = ["should go", "gotta run", "thanks for", "bye", "later", "take care"]
-    if any(signal in user_message.lower() for signal in exit_signals):
+    if "exit" in markers:
         adaptations.append("User is signaling they want to end. Provide warm closure and celebrate their practice.")
     
     if adaptations:
@@ -242,11 +353,143 @@ def get_adaptive_context(user_message_count: int, recent_message_lengths: list,
     return ""
 
 
+def get_adaptive_context_batch(turns: list) -> list:
+    """
+    Generate adaptive context for many turns at once (e.g., nightly transcript re-scoring).
+    
+    Args:
+        turns: List of (user_message_count, recent_message_lengths, user_message) tuples
+    
+    Returns:
+        List of adaptation strings, one per turn, in input order
+    """
+    markers = classify_markers_batch([user_message for _, _, user_message in turns])
+    return [
+        _format_adaptations(user_message_count, bool(recent_message_lengths),
+                            _energy_drop(recent_message_lengths), user_message, message_markers)
+        for (user_message_count, recent_message_lengths, user_message), message_markers in zip(turns, markers)
+    ]
+
+
+class ConversationAdaptationTracker:
+    """
+    Incremental per-session state for get_adaptive_context().
+    
+    Call observe() once per user message instead of rebuilding the message
+    count and length list from the full history. Each update is O(1) and the
+    state round-trips through to_dict()/from_dict() for the session store.
+    """
+    
+    __slots__ = (
+        "window", "user_message_count", "total_length", "last_checkpoint",
+        "energy_trend", "_lengths", "_head", "_filled", "_window_sum"
+    )
+    
+    def __init__(self, window: int = ENERGY_WINDOW):
+        self.window = window
+        self.user_message_count = 0
+        self.total_length = 0
+        self.last_checkpoint = 0
+        self.energy_trend = "steady"  # "rising", "steady" or "dropping"
+        self._lengths = [0] * window  # Ring buffer of recent message lengths
+        self._head = 0  # Next write position (= oldest entry once full)
+        self._filled = 0
+        self._window_sum = 0
+    
+    def observe(self, user_message: str) -> str:
+        """
+        Record a user message and return its adaptation instructions.
+        
+        Args:
+            user_message: Current user message text
+        
+        Returns:
+            Same text get_adaptive_context() returns for the full history
+        """
+        length = len(user_message)
+        self.user_message_count += 1
+        self.total_length += length
+        
+        if self._filled == self.window:
+            self._window_sum -= self._lengths[self._head]
+        else:
+            self._filled += 1
+        self._lengths[self._head] = length
+        self._window_sum += length
+        self._head = (self._head + 1) % self.window
+        
+        energy_drop = False
+        if self._filled >= ENERGY_WINDOW:
+            oldest = self._lengths[self._head % self._filled]
+            energy_drop = length < oldest * ENERGY_DROP_RATIO
+            if energy_drop:
+                self.energy_trend = "dropping"
+            elif length > oldest / ENERGY_DROP_RATIO:
+                self.energy_trend = "rising"
+            else:
+                self.energy_trend = "steady"
+        
+        if self.user_message_count in CHECKPOINT_MESSAGES:
+            self.last_checkpoint = self.user_message_count
+        
+        return _format_adaptations(self.user_message_count, True, energy_drop, user_message)
+    
+    @property
+    def recent_lengths(self) -> list:
+        """Recent message lengths, oldest first."""
+        if self._filled < self.window:
+            return self._lengths[:self._filled]
+        return self._lengths[self._head:] + self._lengths[:self._head]
+    
+    @property
+    def recent_average_length(self) -> float:
+        """Average length over the recent window."""
+        return self._window_sum / self._filled if self._filled else 0.0
+    
+    @property
+    def average_length(self) -> float:
+        """Average length over the whole session."""
+        return self.total_length / self.user_message_count if self.user_message_count else 0.0
+    
+    def to_dict(self) -> dict:
+        """Serialize to a small JSON-compatible dict."""
+        return {
+            "window": self.window,
+            "user_message_count": self.user_message_count,
+            "total_length": self.total_length,
+            "last_checkpoint": self.last_checkpoint,
+            "energy_trend": self.energy_trend,
+            "recent_lengths": self.recent_lengths
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "ConversationAdaptationTracker":
+        """Rebuild a tracker from to_dict() output."""
+        tracker = cls(window=data["window"])
+        tracker.user_message_count = data["user_message_count"]
+        tracker.total_length = data["total_length"]
+        tracker.last_checkpoint = data["last_checkpoint"]
+        tracker.energy_trend = data["energy_trend"]
+        for length in data["recent_lengths"][-tracker.window:]:
+            tracker._lengths[tracker._head] = length
+            tracker._head = (tracker._head + 1) % tracker.window
+            tracker._filled += 1
+            tracker._window_sum += length
+        return tracker
+
+
 # Export all components
 __all__ = [
     'ADAPTIVE_AGENT_CORE',
     'NEURODIVERSITY_PATTERNS',
     'ENGAGEMENT_MONITORING_PROMPT',
     'CONVERSATION_CHECKPOINT_SYSTEM',
-    'get_adaptive_context'
+    'ANXIETY_MARKERS',
+    'ENTHUSIASM_MARKERS',
+    'EXIT_SIGNALS',
+    'classify_markers',
+    'classify_markers_batch',
+    'ConversationAdaptationTracker',
+    'get_adaptive_context',
+    'get_adaptive_context_batch'
 ]
@@ -0,0 +1,118 @@
+"""
+NeuroPilot - Adaptive Analytics
+Vectorized (NumPy) version of the get_adaptive_context() heuristics for
+retroactive analysis over large stores of user messages.
+Returns per-message signal arrays instead of prompt strings.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for offline analytics
+    np = None
+
+from prompts.adaptive_agent_system import (
+    CHECKPOINT_MESSAGES,
+    ENERGY_DROP_RATIO,
+    ENERGY_WINDOW,
+    LONG_CONVERSATION_MESSAGES,
+    VERY_LONG_CHARS,
+    VERY_SHORT_CHARS,
+    classify_markers
+)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Adaptive analytics requires numpy. Install it with: pip install numpy")
+
+
+def marker_flags(messages) -> dict:
+    """
+    Compute marker flags for many messages.
+
+    Args:
+        messages: Iterable of user message strings
+
+    Returns:
+        Dict of boolean arrays: 'anxiety', 'enthusiasm', 'exit'
+    """
+    _require_numpy()
+    categories = [classify_markers(message) for message in messages]
+    return {
+        name: np.fromiter((name in found for found in categories), dtype=bool, count=len(categories))
+        for name in ("anxiety", "enthusiasm", "exit")
+    }
+
+
+def analyze_adaptation_signals(message_lengths, session_ids, anxiety=None, enthusiasm=None,
+                               exit_signals=None, window: int = ENERGY_WINDOW) -> dict:
+    """
+    Compute every adaptation signal for a columnar batch of user messages.
+
+    Rows must be grouped by session and in chronological order within each
+    session (e.g., sorted by session_id, created_at). Results match what
+    ConversationAdaptationTracker.observe() would produce message by message.
+
+    Args:
+        message_lengths: Array-like of character counts
+        session_ids: Array-like of session identifiers, same length
+        anxiety: Optional boolean array of anxiety marker flags
+        enthusiasm: Optional boolean array of enthusiasm marker flags
+        exit_signals: Optional boolean array of exit signal flags
+        window: Number of recent messages the energy-drop rule looks back over
+
+    Returns:
+        Dict of arrays: 'message_number', 'very_short', 'very_long',
+        'energy_drop', 'checkpoint', 'long_conversation', plus the marker
+        flags that were provided and 'adaptation_count' (signals per message)
+    """
+    _require_numpy()
+    lengths = np.asarray(message_lengths, dtype=np.int64)
+    sessions = np.asarray(session_ids)
+    if lengths.shape != sessions.shape:
+        raise ValueError("message_lengths and session_ids must have the same length")
+
+    n = lengths.shape[0]
+
+    # Position of each message within its session (0-based)
+    new_session = np.ones(n, dtype=bool)
+    if n > 1:
+        new_session[1:] = sessions[1:] != sessions[:-1]
+    starts = np.flatnonzero(new_session)
+    group_start = starts[np.cumsum(new_session) - 1] if n else np.zeros(0, dtype=np.int64)
+    position = np.arange(n) - group_start
+    message_number = position + 1
+
+    # Energy drop: latest length vs. oldest length in the recent window
+    oldest = lengths[np.arange(n) - np.minimum(position, window - 1)] if n else lengths
+    energy_drop = (position >= ENERGY_WINDOW - 1) & (lengths < oldest * ENERGY_DROP_RATIO)
+    if window < ENERGY_WINDOW:
+        energy_drop[:] = False
+
+    signals = {
+        "message_number": message_number,
+        "very_short": lengths < VERY_SHORT_CHARS,
+        "very_long": lengths > VERY_LONG_CHARS,
+        "energy_drop": energy_drop,
+        "checkpoint": np.isin(message_number, CHECKPOINT_MESSAGES),
+        "long_conversation": message_number >= LONG_CONVERSATION_MESSAGES
+    }
+
+    for name, flags in (("anxiety", anxiety), ("enthusiasm", enthusiasm), ("exit", exit_signals)):
+        if flags is not None:
+            flags = np.asarray(flags, dtype=bool)
+            if flags.shape != lengths.shape:
+                raise ValueError(f"{name} flags must have the same length as message_lengths")
+            signals[name] = flags
+
+    signals["adaptation_count"] = sum(
+        signals[name].astype(np.int64) for name in signals if name != "message_number"
+    )
+    return signals
+
+
+# Export all components
+__all__ = [
+    'marker_flags',
+    'analyze_adaptation_signals'
+]
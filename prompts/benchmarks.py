@@ -0,0 +1,252 @@
+"""
+NeuroPilot - Prompt Benchmarks
+Microbenchmarks for the per-request prompt builders with realistic and
+worst-case inputs (200-turn histories, 2 KB messages, large user profiles).
+Each case records time per call, memory allocated per call (tracemalloc)
+and output tokens (estimate_tokens). Results can be saved as a baseline and
+later runs fail (exit code 1) when a case regresses beyond the threshold.
+
+Usage:
+    python -m prompts.benchmarks --save-baseline prompts_baseline.json
+    python -m prompts.benchmarks --baseline prompts_baseline.json --threshold 0.25
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from prompts.adaptive_agent_system import get_adaptive_context
+from prompts.avatar_profiles import get_avatar_for_scenario
+from prompts.feedback_prompts import create_feedback_prompt, create_inline_feedback_prompt
+from prompts.roleplay_prompts import ROLEPLAY_PROMPTS, build_personalization, get_roleplay_prompt
+from prompts.summary_prompts import SCORE_DIMENSIONS, create_progress_prompt, create_summary_prompt
+from prompts.token_budget import estimate_tokens
+
+DEFAULT_THRESHOLD = 0.25  # Fractional slowdown/growth that counts as a regression
+MIN_TIME_DELTA_NS = 500  # Ignore timing changes smaller than this (timer noise)
+TARGET_SECONDS = 0.1  # Time budget per repeat when calibrating iterations
+REPEATS = 5
+
+SCENARIO = "office_lunch"
+CONTEXT = ROLEPLAY_PROMPTS[SCENARIO]["context"]
+
+SHORT_MESSAGE = "Oh nice, I haven't tried that place yet. Is the coffee any good?"
+LONG_MESSAGE = ("Um, I think maybe I'm not sure how to say this, but honestly I was really nervous "
+                "about today and I love that you asked. ") * 19  # ~2 KB
+
+
+def _history(turns: int, message: str) -> list:
+    return [{"role": "assistant" if i % 2 else "user", "content": f"{message} ({i})"} for i in range(turns)]
+
+
+def _feedback_scores(count: int) -> list:
+    return [
+        {dimension: {"score": 50 + (i * 7 + offset) % 50, "feedback": "Warm and clear."}
+         for offset, dimension in enumerate(SCORE_DIMENSIONS)}
+        for i in range(count)
+    ]
+
+
+def _session_data(session_num: int) -> dict:
+    return {
+        "session_num": session_num,
+        "context": CONTEXT,
+        "avg_scores": {dimension: 70.0 + session_num for dimension in SCORE_DIMENSIONS}
+    }
+
+
+SMALL_PROFILE = {"previous_sessions": 3, "challenge_areas": ["eye contact", "small talk"]}
+LARGE_PROFILE = {
+    "previous_sessions": 250,
+    "challenge_areas": [f"challenge area {i} with a fairly long description" for i in range(200)],
+    "interests": [f"interest {i}" for i in range(500)],
+    "notes": "x" * 10_000
+}
+
+
+def _uncached_roleplay_prompt(scenario_key, user_profile):
+    build_personalization.cache_clear()
+    return get_roleplay_prompt(scenario_key, user_profile)
+
+
+def get_cases() -> list:
+    """
+    Benchmark cases as (name, function, args) tuples.
+
+    Inputs are built once here so only the function call is measured.
+    """
+    history_20 = _history(20, SHORT_MESSAGE)
+    history_200 = _history(200, SHORT_MESSAGE)
+    history_200_long = _history(200, LONG_MESSAGE)
+    return [
+        ("get_roleplay_prompt/no_profile", get_roleplay_prompt, (SCENARIO, None)),
+        ("get_roleplay_prompt/small_profile", get_roleplay_prompt, (SCENARIO, SMALL_PROFILE)),
+        ("get_roleplay_prompt/large_profile", get_roleplay_prompt, (SCENARIO, LARGE_PROFILE)),
+        ("get_roleplay_prompt/large_profile_uncached", _uncached_roleplay_prompt, (SCENARIO, LARGE_PROFILE)),
+        ("get_adaptive_context/short", get_adaptive_context, (5, [60, 55, 64], SHORT_MESSAGE)),
+        ("get_adaptive_context/2kb_message", get_adaptive_context, (20, [2000, 1500, 400], LONG_MESSAGE)),
+        ("create_feedback_prompt/20_turns", create_feedback_prompt, (CONTEXT, history_20, SHORT_MESSAGE)),
+        ("create_feedback_prompt/200_turns_2kb", create_feedback_prompt, (CONTEXT, history_200_long, LONG_MESSAGE)),
+        ("create_inline_feedback_prompt/short", create_inline_feedback_prompt, (CONTEXT, SHORT_MESSAGE)),
+        ("create_inline_feedback_prompt/2kb_message", create_inline_feedback_prompt, (CONTEXT, LONG_MESSAGE)),
+        ("create_summary_prompt/20_turns", create_summary_prompt, (CONTEXT, history_20, _feedback_scores(10))),
+        ("create_summary_prompt/200_turns", create_summary_prompt, (CONTEXT, history_200, _feedback_scores(100))),
+        ("create_summary_prompt/200_turns_2kb", create_summary_prompt,
+         (CONTEXT, history_200_long, _feedback_scores(100))),
+        ("create_progress_prompt", create_progress_prompt, (_session_data(1), _session_data(2))),
+        ("get_avatar_for_scenario", get_avatar_for_scenario, ("alex", CONTEXT, "Office Lunch")),
+    ]
+
+
+def _output_tokens(result) -> int:
+    if isinstance(result, str):
+        return estimate_tokens(result)
+    return sum(_output_tokens(part) for part in result)
+
+
+def _time_per_call_ns(function, args) -> tuple:
+    function(*args)  # Warm up (caches, first-call costs)
+    iterations = 1
+    while True:
+        started = time.perf_counter_ns()
+        for _ in range(iterations):
+            function(*args)
+        elapsed = time.perf_counter_ns() - started
+        if elapsed >= TARGET_SECONDS * 1e9 / 10 or iterations >= 1_000_000:
+            break
+        iterations *= 10
+    iterations = max(int(iterations * TARGET_SECONDS * 1e9 / max(elapsed, 1)), 1)
+
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter_ns()
+        for _ in range(iterations):
+            function(*args)
+        samples.append((time.perf_counter_ns() - started) / iterations)
+    return min(samples), statistics.median(samples)
+
+
+def _allocated_bytes(function, args) -> tuple:
+    function(*args)
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before, result
+
+
+def run_benchmarks(name_filter: str = None) -> dict:
+    """
+    Run every case (optionally only names containing name_filter).
+
+    Returns:
+        {case name: {'min_ns', 'median_ns', 'peak_alloc_bytes', 'output_tokens'}}
+    """
+    results = {}
+    for name, function, args in get_cases():
+        if name_filter and name_filter not in name:
+            continue
+        peak_bytes, result = _allocated_bytes(function, args)
+        min_ns, median_ns = _time_per_call_ns(function, args)
+        results[name] = {
+            "min_ns": min_ns,
+            "median_ns": median_ns,
+            "peak_alloc_bytes": peak_bytes,
+            "output_tokens": _output_tokens(result)
+        }
+    return results
+
+
+def find_regressions(baseline: dict, results: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Compare results against a baseline.
+
+    A case regresses when its min time, peak allocation or output tokens grow
+    by more than `threshold` (fractional). Timing deltas under
+    MIN_TIME_DELTA_NS are treated as noise.
+
+    Returns:
+        List of human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ("min_ns", "peak_alloc_bytes", "output_tokens"):
+            old, new = previous[metric], current[metric]
+            if new <= old * (1 + threshold):
+                continue
+            if metric == "min_ns" and new - old < MIN_TIME_DELTA_NS:
+                continue
+            change = (new - old) / old * 100.0 if old else float("inf")
+            regressions.append(f"{name}: {metric} {old:,.0f} -> {new:,.0f} (+{change:.0f}%)")
+    return regressions
+
+
+def _print_table(results: dict, baseline: dict = None):
+    print(f"{'case':<45} {'min µs':>10} {'median µs':>10} {'alloc KB':>10} {'tokens':>8} {'vs base':>8}")
+    for name, stats in results.items():
+        versus = ""
+        if baseline and name in baseline and baseline[name]["min_ns"]:
+            versus = f"{(stats['min_ns'] / baseline[name]['min_ns'] - 1) * 100:+.0f}%"
+        print(f"{name:<45} {stats['min_ns'] / 1000:>10.2f} {stats['median_ns'] / 1000:>10.2f} "
+              f"{stats['peak_alloc_bytes'] / 1024:>10.1f} {stats['output_tokens']:>8} {versus:>8}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="NeuroPilot prompt builder benchmarks")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save-baseline", help="Write these results as a baseline JSON")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        _print_table(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results},
+                      f, indent=2)
+
+    if baseline is not None:
+        regressions = find_regressions(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  - {regression}", file=sys.stderr)
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+# Export all components
+__all__ = [
+    'find_regressions',
+    'get_cases',
+    'run_benchmarks'
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
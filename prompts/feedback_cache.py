@@ -0,0 +1,222 @@
+"""
+NeuroPilot - Feedback Result Cache
+Content-addressed cache in front of feedback evaluations so near-identical
+practice messages ("hi", "I'm good, thanks") in the same context cost zero
+model calls. In-memory LRU with an optional on-disk tier and TTL.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from prompts.feedback_prompts import FEEDBACK_PROMPT_VERSION, create_feedback_prompt
+
+# Same window create_feedback_prompt() sends to the model
+HISTORY_WINDOW = 4
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+_VERSION_DIR = re.compile(r"^[0-9a-f]{16}$")  # Directory name of a FEEDBACK_PROMPT_VERSION tier
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a message for cache keys: case-folded, punctuation dropped, whitespace collapsed.
+    """
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.casefold())).strip()
+
+
+def make_cache_key(context: str, conversation_history: list, user_message: str,
+                   version: str = FEEDBACK_PROMPT_VERSION) -> str:
+    """
+    Build the content hash for one feedback evaluation.
+
+    Args:
+        context: String describing the social scenario
+        conversation_history: List of dicts with 'role' and 'content'
+        user_message: The user message being evaluated
+        version: Feedback prompt version the result was produced with
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{version}\0{context}\0".encode("utf-8"))
+    for msg in conversation_history[-HISTORY_WINDOW:]:
+        digest.update(f"{msg['role']}\0{normalize_text(msg['content'])}\0".encode("utf-8"))
+    digest.update(normalize_text(user_message).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class FeedbackCache:
+    """
+    LRU + TTL cache of feedback results, optionally backed by a directory of JSON files.
+
+    Entries are namespaced by FEEDBACK_PROMPT_VERSION, so editing the feedback
+    templates invalidates every cached result automatically. Disk tiers left
+    behind by older template versions are deleted when the cache is created
+    (prune_old_versions=False keeps them).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 24 * 3600,
+                 cache_dir: str = None, version: str = FEEDBACK_PROMPT_VERSION,
+                 prune_old_versions: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self.cache_dir = os.path.join(cache_dir, version) if cache_dir else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (created_at, result)
+        self._lock = threading.Lock()
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if prune_old_versions:
+                self._prune_old_versions(cache_dir)
+
+    def get(self, context: str, conversation_history: list, user_message: str):
+        """
+        Look up a cached feedback result.
+
+        Returns:
+            The cached result dict, or None on a miss
+        """
+        key = make_cache_key(context, conversation_history, user_message, self.version)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, entry)
+        return entry[1]
+
+    def put(self, context: str, conversation_history: list, user_message: str, result: dict):
+        """Store a feedback result for this (context, history, message)."""
+        key = make_cache_key(context, conversation_history, user_message, self.version)
+        entry = (time.time(), result)
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, entry)
+
+    def get_or_evaluate(self, context: str, conversation_history: list, user_message: str, evaluate):
+        """
+        Return a cached result or run the evaluation and cache it.
+
+        Args:
+            context: String describing the social scenario
+            conversation_history: List of dicts with 'role' and 'content'
+            user_message: The user message being evaluated
+            evaluate: Callable(system_prompt, user_prompt) -> result dict (the model call)
+
+        Returns:
+            Feedback result dict
+        """
+        result = self.get(context, conversation_history, user_message)
+        if result is None:
+            system_prompt, user_prompt = create_feedback_prompt(context, conversation_history, user_message)
+            result = evaluate(system_prompt, user_prompt)
+            if result is not None:
+                self.put(context, conversation_history, user_message, result)
+        return result
+
+    def invalidate(self):
+        """Drop every cached result (memory and this version's disk tier)."""
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, key, now):
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            data = None
+        try:
+            created_at, result = data["created_at"], data["result"]
+            fresh = now - created_at <= self.ttl_seconds
+        except (KeyError, TypeError):
+            fresh = False  # Unreadable or wrong-shaped entry: a miss, and not worth keeping
+        if not fresh:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return created_at, result
+
+    def _prune_old_versions(self, root):
+        for entry in os.scandir(root):
+            if entry.name == self.version or not entry.is_dir() or not _VERSION_DIR.match(entry.name):
+                continue
+            for name in os.listdir(entry.path):
+                if name.endswith((".json", ".tmp")):
+                    try:
+                        os.remove(os.path.join(entry.path, name))
+                    except OSError:
+                        pass
+            try:
+                os.rmdir(entry.path)
+            except OSError:
+                pass  # Holds something that is not ours
+
+    def _write_disk(self, key, entry):
+        if not self.cache_dir:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"created_at": entry[0], "result": entry[1]}, f)
+        os.replace(tmp_path, os.path.join(self.cache_dir, f"{key}.json"))
+
+
+# Export all components
+__all__ = [
+    'FeedbackCache',
+    'make_cache_key',
+    'normalize_text'
+]
@@ -4,6 +4,19 @@ These prompts analyze user messages and provide structured scoring.
 Neurodiversity-aware and growth-focused.
 """
 
+import hashlib
+import json
+
+from prompts.token_budget import estimate_tokens, select_recent_lines, trim_to_tokens
+
+# Defaults for token-budgeted feedback prompts
+DEFAULT_FEEDBACK_TOKEN_BUDGET = 2500
+DEFAULT_MAX_TURN_TOKENS = 150
+DEFAULT_MAX_HISTORY_TURNS = 8
+
+# Most user messages evaluated in one batched model call
+MAX_BATCH_SIZE = 10
+
 FEEDBACK_SYSTEM_PROMPT = """You are an expert social communication coach SPECIALIZING in supporting neurodiverse individuals (ADHD, autism, dyslexia, social anxiety, etc.) improve their conversational skills.
 
 🧠 CORE PHILOSOPHY:
@@ -86,15 +99,7 @@ IMPORTANT:
 """
 
 
-FEEDBACK_USER_PROMPT_TEMPLATE = """Analyze this conversational exchange and provide structured feedback.
-
-CONTEXT: {context}
-CONVERSATION HISTORY:
-{conversation_history}
-
-USER'S LATEST MESSAGE: "{user_message}"
-
-**CRITICAL - QUICK TIP RULES:**
+QUICK_TIP_RULES = """**CRITICAL - QUICK TIP RULES:**
 The quick tip MUST address THE LOWEST SCORING dimension from your analysis.
 
 1. MUST be ONE SHORT SENTENCE (5-8 words maximum)
@@ -124,7 +129,18 @@ If ENGAGEMENT is lowest (too brief, no hooks):
 ✅ "Ask follow-up questions naturally"
 ✅ "Give them something to respond to"
 
-RULE: Pick the WEAKEST area and give ONE tip for that specific dimension!
+RULE: Pick the WEAKEST area and give ONE tip for that specific dimension!"""
+
+
+FEEDBACK_USER_PROMPT_TEMPLATE = """Analyze this conversational exchange and provide structured feedback.
+
+CONTEXT: {context}
+CONVERSATION HISTORY:
+{conversation_history}
+
+USER'S LATEST MESSAGE: "{user_message}"
+
+""" + QUICK_TIP_RULES + """
 
 Provide your analysis in the following JSON format:
 {{
@@ -151,6 +167,42 @@ Provide your analysis in the following JSON format:
 Remember: Be encouraging and specific. Focus on VOICE PATTERNS, not generic advice."""
 
 
+BATCH_FEEDBACK_USER_PROMPT_TEMPLATE = """Analyze each of the following {item_count} conversational exchanges INDEPENDENTLY and provide structured feedback for every one.
+Each item may come from a different user - never let one item influence another item's scores.
+
+{items}
+
+""" + QUICK_TIP_RULES + """
+
+Apply these rules to EACH item separately.
+
+Provide your analysis as ONE JSON object in the following format, with exactly one entry per item id:
+{{
+    "results": [
+        {{
+            "id": "<item id exactly as given>",
+            "tone": {{"score": <0-100>, "feedback": "<brief, supportive comment on tone>"}},
+            "clarity": {{"score": <0-100>, "feedback": "<brief comment on clarity>"}},
+            "empathy": {{"score": <0-100>, "feedback": "<brief comment on empathy/engagement with others>"}},
+            "engagement": {{"score": <0-100>, "feedback": "<brief comment on conversation flow>"}},
+            "overall_impression": "<1-2 sentence summary of strengths>",
+            "quick_tip": "<ONE actionable suggestion about their VOICE/SPEAKING STYLE, phrased supportively>"
+        }}
+    ]
+}}
+
+Remember: Be encouraging and specific. Focus on VOICE PATTERNS, not generic advice."""
+
+
+BATCH_FEEDBACK_ITEM_TEMPLATE = """=== ITEM {item_id} ===
+CONTEXT: {context}
+CONVERSATION HISTORY:
+{conversation_history}
+
+USER'S LATEST MESSAGE: "{user_message}"
+"""
+
+
 INLINE_FEEDBACK_PROMPT = """You are a supportive communication coach providing BRIEF real-time feedback during a conversation practice.
 
 The user just sent this message: "{user_message}"
@@ -173,6 +225,12 @@ Examples of good micro-feedback:
 Your response (either a brief tip or "NONE"):"""
 
 
+# Changes whenever the feedback templates change (used to invalidate cached evaluations)
+FEEDBACK_PROMPT_VERSION = hashlib.sha256(
+    f"{FEEDBACK_SYSTEM_PROMPT}\0{FEEDBACK_USER_PROMPT_TEMPLATE}".encode("utf-8")
+).hexdigest()[:16]
+
+
 def create_feedback_prompt(context, conversation_history, user_message):
     """
     Create a complete feedback evaluation prompt.
@@ -200,6 +258,160 @@ def create_feedback_prompt(context, conversation_history, user_message):
     return FEEDBACK_SYSTEM_PROMPT, user_prompt
 
 
+def create_budgeted_feedback_prompt(context, conversation_history, user_message,
+                                    token_budget=DEFAULT_FEEDBACK_TOKEN_BUDGET,
+                                    max_turn_tokens=DEFAULT_MAX_TURN_TOKENS,
+                                    max_history_turns=DEFAULT_MAX_HISTORY_TURNS):
+    """
+    Create a feedback evaluation prompt whose history is sized by tokens, not turn count.
+    
+    Recent turns are kept (newest first, oversized ones trimmed) until the
+    budget is used, instead of always taking the last 4 messages.
+    
+    Args:
+        context: String describing the social scenario
+        conversation_history: List of dicts with 'role' and 'content'
+        user_message: The specific user message to evaluate
+        token_budget: Estimated tokens allowed for system + user prompt
+        max_turn_tokens: Cap for any single history turn
+        max_history_turns: Never include more than this many history turns
+    
+    Returns:
+        tuple: (system_prompt, user_prompt, token_count)
+    """
+    base_tokens = estimate_tokens(FEEDBACK_SYSTEM_PROMPT) + estimate_tokens(
+        FEEDBACK_USER_PROMPT_TEMPLATE.format(
+            context=context,
+            conversation_history="",
+            user_message=user_message
+        )
+    )
+    
+    lines = []
+    for msg in conversation_history[-max_history_turns:]:
+        role = "AI" if msg["role"] == "assistant" else "User"
+        lines.append(f"{role}: {trim_to_tokens(msg['content'], max_turn_tokens)}")
+    kept, _ = select_recent_lines(lines, token_budget - base_tokens)
+    
+    user_prompt = FEEDBACK_USER_PROMPT_TEMPLATE.format(
+        context=context,
+        conversation_history="\n".join(kept).strip(),
+        user_message=user_message
+    )
+    
+    return FEEDBACK_SYSTEM_PROMPT, user_prompt, estimate_tokens(FEEDBACK_SYSTEM_PROMPT) + estimate_tokens(user_prompt)
+
+
+def _format_history(conversation_history):
+    """Format the last 4 messages the same way create_feedback_prompt() does."""
+    return "\n".join(
+        f"{'AI' if msg['role'] == 'assistant' else 'User'}: {msg['content']}"
+        for msg in conversation_history[-4:]
+    ).strip()
+
+
+def create_batch_feedback_prompt(items):
+    """
+    Create one evaluation prompt covering several queued user messages.
+    
+    Args:
+        items: List of dicts with 'context', 'conversation_history', 'user_message'
+            and optional 'id' (defaults to the 1-based position)
+    
+    Returns:
+        tuple: (system_prompt, user_prompt, item_ids)
+    
+    Raises:
+        ValueError: If items is empty or larger than MAX_BATCH_SIZE
+    """
+    if not items:
+        raise ValueError("Batch feedback needs at least one item")
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch too large: {len(items)} items (max {MAX_BATCH_SIZE})")
+    
+    item_ids = [str(item.get("id", i)) for i, item in enumerate(items, 1)]
+    if len(set(item_ids)) != len(item_ids):
+        raise ValueError("Batch feedback item ids must be unique")
+    
+    blocks = [
+        BATCH_FEEDBACK_ITEM_TEMPLATE.format(
+            item_id=item_id,
+            context=item["context"],
+            conversation_history=_format_history(item["conversation_history"]),
+            user_message=item["user_message"]
+        )
+        for item_id, item in zip(item_ids, items)
+    ]
+    
+    user_prompt = BATCH_FEEDBACK_USER_PROMPT_TEMPLATE.format(
+        item_count=len(items),
+        items="\n".join(blocks).strip()
+    )
+    
+    return FEEDBACK_SYSTEM_PROMPT, user_prompt, item_ids
+
+
+def validate_feedback_result(result):
+    """
+    Check that a parsed feedback result has the shape FEEDBACK_USER_PROMPT_TEMPLATE asks for.
+    
+    Args:
+        result: Parsed JSON object for one message
+    
+    Returns:
+        bool: True if all four scored dimensions, overall_impression and quick_tip are valid
+    """
+    if not isinstance(result, dict):
+        return False
+    for dimension in SCORING_RUBRIC:
+        entry = result.get(dimension)
+        if not isinstance(entry, dict):
+            return False
+        score = entry.get("score")
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 100:
+            return False
+        if not isinstance(entry.get("feedback"), str):
+            return False
+    return isinstance(result.get("overall_impression"), str) and isinstance(result.get("quick_tip"), str)
+
+
+def parse_batch_feedback_response(response_text, item_ids):
+    """
+    Split a batched model response into per-message feedback results.
+    
+    Args:
+        response_text: Raw model output (may be wrapped in ```json fences)
+        item_ids: Ids returned by create_batch_feedback_prompt()
+    
+    Returns:
+        dict: item id -> validated result dict, or None for items that are
+        missing or malformed (re-evaluate those individually)
+    """
+    results = dict.fromkeys(item_ids)
+    
+    start = response_text.find("{")
+    end = response_text.rfind("}")
+    if start == -1 or end < start:
+        return results
+    try:
+        payload = json.loads(response_text[start:end + 1])
+    except ValueError:
+        return results
+    
+    entries = payload.get("results") if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        return results
+    
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        item_id = str(entry.get("id"))
+        if item_id in results and results[item_id] is None and validate_feedback_result(entry):
+            results[item_id] = {key: value for key, value in entry.items() if key != "id"}
+    
+    return results
+
+
 def create_inline_feedback_prompt(context, user_message):
     """
     Create a brief inline feedback prompt for real-time tips.
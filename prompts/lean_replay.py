@@ -0,0 +1,159 @@
+"""
+NeuroPilot - Lean Prompt Replay
+Offline comparison of the full and lean compiled system prompts. Recorded
+turns are replayed through the same model once with each prefix; the report
+shows input tokens saved, how often replies keep to the response-length rule,
+and how similar the two replies are, so lean mode can be checked before it
+is switched on.
+
+Usage:
+    python -m prompts.lean_replay                       # token delta per prefix
+    python -m prompts.lean_replay --turns turns.json    # replay through Groq (GROQ_API_KEY)
+
+turns.json is a list of {"scenario", "user_message", "avatar_id"?,
+"history"?, "adaptive_context"?} objects.
+"""
+
+import argparse
+import asyncio
+import difflib
+import json
+import os
+import re
+import sys
+
+from prompts.prompt_compiler import compile_system_prompt, lean_token_report
+from prompts.token_budget import estimate_tokens
+
+MAX_REPLY_SENTENCES = 3  # Upper bound of the CRITICAL LENGTH RULE in ADAPTIVE_AGENT_CORE
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+
+_SENTENCE_END = re.compile(r"[.!?]+(?:\s+|$)")
+
+
+def count_sentences(text: str) -> int:
+    """Number of sentences in a reply (a trailing fragment counts as one)."""
+    text = text.strip()
+    if not text:
+        return 0
+    parts = [part for part in _SENTENCE_END.split(text) if part.strip()]
+    return len(parts)
+
+
+def _user_prompt(turn: dict) -> str:
+    lines = [f"{message['role']}: {message['content']}" for message in turn.get("history", [])]
+    lines.append(f"user: {turn['user_message']}")
+    return "\n".join(lines)
+
+
+def _reply_text(reply) -> str:
+    if isinstance(reply, dict):
+        return reply.get("content", "")
+    return reply or ""
+
+
+async def replay_compare(turns, generate) -> dict:
+    """
+    Replay recorded turns with the full and the lean system prompt.
+
+    Args:
+        turns: Iterable of dicts with 'scenario', 'user_message' and optional
+               'avatar_id', 'history' (list of role/content dicts) and
+               'adaptive_context'
+        generate: async callable (system_prompt, user_prompt) -> reply str
+                  or dict with 'content'
+
+    Returns:
+        Dict with per-turn 'turns' results and an aggregate 'summary'
+    """
+    results = []
+    for turn in turns:
+        prompts = {}
+        for mode, lean in (("full", False), ("lean", True)):
+            prompts[mode] = compile_system_prompt(
+                turn["scenario"], turn.get("avatar_id"),
+                adaptive_context=turn.get("adaptive_context", ""), lean=lean
+            )
+        user_prompt = _user_prompt(turn)
+        full_reply, lean_reply = await asyncio.gather(
+            generate(prompts["full"], user_prompt),
+            generate(prompts["lean"], user_prompt)
+        )
+        full_reply, lean_reply = _reply_text(full_reply), _reply_text(lean_reply)
+        user_tokens = estimate_tokens(user_prompt)
+        results.append({
+            "scenario": turn["scenario"],
+            "avatar_id": turn.get("avatar_id"),
+            "full_input_tokens": estimate_tokens(prompts["full"]) + user_tokens,
+            "lean_input_tokens": estimate_tokens(prompts["lean"]) + user_tokens,
+            "full_sentences": count_sentences(full_reply),
+            "lean_sentences": count_sentences(lean_reply),
+            "similarity": difflib.SequenceMatcher(None, full_reply, lean_reply).ratio(),
+            "full_reply": full_reply,
+            "lean_reply": lean_reply
+        })
+
+    count = max(len(results), 1)
+    full_tokens = sum(result["full_input_tokens"] for result in results)
+    lean_tokens = sum(result["lean_input_tokens"] for result in results)
+    summary = {
+        "turns": len(results),
+        "full_input_tokens": full_tokens,
+        "lean_input_tokens": lean_tokens,
+        "saved_pct": (full_tokens - lean_tokens) / full_tokens * 100.0 if full_tokens else 0.0,
+        "full_length_adherence": sum(r["full_sentences"] <= MAX_REPLY_SENTENCES for r in results) / count,
+        "lean_length_adherence": sum(r["lean_sentences"] <= MAX_REPLY_SENTENCES for r in results) / count,
+        "mean_similarity": sum(r["similarity"] for r in results) / count
+    }
+    return {"turns": results, "summary": summary}
+
+
+def _groq_generate(model: str):
+    from groq import Groq
+
+    client = Groq(api_key=os.environ["GROQ_API_KEY"])
+
+    async def generate(system_prompt, user_prompt):
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
+            model=model,
+            messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+            temperature=0
+        )
+        return response.choices[0].message.content
+
+    return generate
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare full and lean NeuroPilot system prompts")
+    parser.add_argument("--turns", help="JSON file of recorded turns to replay through Groq")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    args = parser.parse_args(argv)
+
+    report = lean_token_report()
+    print(f"{'prefix':<35} {'full':>7} {'lean':>7} {'saved':>7}")
+    for name, stats in report["prefixes"].items():
+        print(f"{name:<35} {stats['full']:>7} {stats['lean']:>7} {stats['saved_pct']:>6.1f}%")
+    total = report["total"]
+    print(f"{'TOTAL':<35} {total['full']:>7} {total['lean']:>7} {total['saved_pct']:>6.1f}%")
+
+    if args.turns:
+        with open(args.turns) as f:
+            turns = json.load(f)
+        summary = asyncio.run(replay_compare(turns, _groq_generate(args.model)))["summary"]
+        print()
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+# Export all components
+__all__ = [
+    'count_sentences',
+    'replay_compare'
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+NeuroPilot - Progress Rollups
+Incrementally maintained score statistics per session and per user, so
+create_progress_prompt() and progress dashboards read precomputed averages
+instead of rescanning stored feedback. Trends across the last N sessions
+(slopes, moving averages, strongest/weakest dimension) are computed with
+NumPy once per finished session and cached.
+"""
+
+import math
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for multi-session trends
+    np = None
+
+from prompts.summary_prompts import SCORE_DIMENSIONS
+
+DEFAULT_HISTORY_SESSIONS = 10
+DEFAULT_TREND_WINDOW = 3
+
+
+class RunningStats:
+    """Welford running mean/variance for one score dimension."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float):
+        """Fold in one observation."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningStats"):
+        """Fold in another RunningStats (parallel/Chan combination)."""
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0.0 with fewer than two observations)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningStats":
+        return cls(data["count"], data["mean"], data["m2"])
+
+
+def _new_stats() -> dict:
+    return {dimension: RunningStats() for dimension in SCORE_DIMENSIONS}
+
+
+class SessionRollup:
+    """Per-session score statistics, updated as feedback arrives."""
+
+    __slots__ = ("session_id", "session_num", "context", "stats")
+
+    def __init__(self, session_id: str, session_num: int, context: str):
+        self.session_id = session_id
+        self.session_num = session_num
+        self.context = context
+        self.stats = _new_stats()
+
+    @property
+    def feedback_count(self) -> int:
+        return self.stats[SCORE_DIMENSIONS[0]].count
+
+    def add_feedback(self, feedback: dict):
+        """Record one feedback result (dict with 'tone', 'clarity', 'empathy', 'engagement' scores)."""
+        for dimension in SCORE_DIMENSIONS:
+            self.stats[dimension].add(feedback[dimension]["score"])
+
+    def avg_scores(self) -> dict:
+        """Per-dimension means, or None if no feedback was recorded."""
+        if not self.feedback_count:
+            return None
+        return {dimension: stats.mean for dimension, stats in self.stats.items()}
+
+    def progress_data(self) -> dict:
+        """Session dict in the shape create_progress_prompt() expects."""
+        return {"session_num": self.session_num, "context": self.context, "avg_scores": self.avg_scores()}
+
+    def to_dict(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "session_num": self.session_num,
+            "context": self.context,
+            "stats": {dimension: stats.to_dict() for dimension, stats in self.stats.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SessionRollup":
+        rollup = cls(data["session_id"], data["session_num"], data["context"])
+        rollup.stats = {dimension: RunningStats.from_dict(stats) for dimension, stats in data["stats"].items()}
+        return rollup
+
+
+def compute_trends(session_averages, window: int = DEFAULT_TREND_WINDOW) -> dict:
+    """
+    Trend statistics across consecutive sessions.
+
+    Args:
+        session_averages: (sessions x len(SCORE_DIMENSIONS)) array-like of
+            per-session average scores, oldest first
+        window: Moving-average window in sessions
+
+    Returns:
+        Dict with 'sessions', per-dimension dicts 'slope' (points per session,
+        least squares), 'moving_average' (latest window mean) and 'latest',
+        plus 'best_dimension', 'worst_dimension', 'most_improved' and
+        'needs_focus' (None when fewer than two sessions for the slope-based ones)
+    """
+    if np is None:
+        raise ImportError("Progress trends require numpy. Install it with: pip install numpy")
+    scores = np.asarray(session_averages, dtype=np.float64).reshape(-1, len(SCORE_DIMENSIONS))
+    count = scores.shape[0]
+    if count == 0:
+        return None
+
+    if count > 1:
+        x = np.arange(count, dtype=np.float64)
+        x -= x.mean()
+        slopes = (x @ (scores - scores.mean(axis=0))) / (x @ x)
+    else:
+        slopes = np.zeros(len(SCORE_DIMENSIONS))
+    moving_average = scores[-min(window, count):].mean(axis=0)
+
+    def by_dimension(values):
+        return {dimension: float(value) for dimension, value in zip(SCORE_DIMENSIONS, values)}
+
+    return {
+        "sessions": count,
+        "slope": by_dimension(slopes),
+        "moving_average": by_dimension(moving_average),
+        "latest": by_dimension(scores[-1]),
+        "best_dimension": SCORE_DIMENSIONS[int(np.argmax(moving_average))],
+        "worst_dimension": SCORE_DIMENSIONS[int(np.argmin(moving_average))],
+        "most_improved": SCORE_DIMENSIONS[int(np.argmax(slopes))] if count > 1 else None,
+        "needs_focus": SCORE_DIMENSIONS[int(np.argmin(slopes))] if count > 1 else None
+    }
+
+
+def format_trend_summary(trends: dict) -> str:
+    """Render compute_trends() output as the trend section for create_progress_prompt()."""
+    lines = [f"TREND ACROSS LAST {trends['sessions']} SESSIONS:"]
+    for dimension in SCORE_DIMENSIONS:
+        lines.append(
+            f"- {dimension.title()}: {trends['moving_average'][dimension]:.1f} recent average, "
+            f"{trends['slope'][dimension]:+.1f} per session"
+        )
+    lines.append(f"Strongest area: {trends['best_dimension'].title()}")
+    lines.append(f"Weakest area: {trends['worst_dimension'].title()}")
+    return "\n".join(lines)
+
+
+class UserProgressRollup:
+    """
+    Per-user progress state.
+
+    Keeps lifetime Welford stats per dimension, the open session's rollup and
+    the last history_size finished sessions. Trends are recomputed only when
+    a session ends, so progress_data() and trends() are O(1) reads.
+    """
+
+    __slots__ = ("user_id", "history_size", "trend_window", "lifetime", "current", "sessions",
+                 "session_count", "_trends")
+
+    def __init__(self, user_id: str, history_size: int = DEFAULT_HISTORY_SESSIONS,
+                 trend_window: int = DEFAULT_TREND_WINDOW):
+        self.user_id = user_id
+        self.history_size = history_size
+        self.trend_window = trend_window
+        self.lifetime = _new_stats()
+        self.current = None
+        self.sessions = deque(maxlen=history_size)
+        self.session_count = 0
+        self._trends = None
+
+    def start_session(self, session_id: str, context: str) -> SessionRollup:
+        """Open a new session rollup (an unfinished previous one is closed first)."""
+        if self.current is not None:
+            self.end_session()
+        self.session_count += 1
+        self.current = SessionRollup(session_id, self.session_count, context)
+        return self.current
+
+    def add_feedback(self, feedback: dict):
+        """Record one feedback result for the open session and the lifetime stats."""
+        if self.current is None:
+            raise RuntimeError("start_session() must be called before add_feedback()")
+        self.current.add_feedback(feedback)
+        for dimension in SCORE_DIMENSIONS:
+            self.lifetime[dimension].add(feedback[dimension]["score"])
+
+    def end_session(self) -> SessionRollup:
+        """Close the open session and refresh the cached trends."""
+        finished, self.current = self.current, None
+        if finished is not None and finished.feedback_count:
+            self.sessions.append(finished)
+            self._refresh_trends()
+        return finished
+
+    def _refresh_trends(self):
+        if np is None or not self.sessions:
+            self._trends = None
+            return
+        self._trends = compute_trends(
+            [[session.stats[dimension].mean for dimension in SCORE_DIMENSIONS] for session in self.sessions],
+            self.trend_window
+        )
+
+    def trends(self) -> dict:
+        """Cached compute_trends() over the stored sessions (None if unavailable)."""
+        return self._trends
+
+    def lifetime_summary(self) -> dict:
+        """Per-dimension lifetime mean, standard deviation and count."""
+        return {
+            dimension: {"mean": stats.mean, "stddev": stats.stddev, "count": stats.count}
+            for dimension, stats in self.lifetime.items()
+        }
+
+    def progress_data(self):
+        """
+        Inputs for create_progress_prompt().
+
+        Returns:
+            (prev_session_data, current_session_data), comparing the open
+            session (or the latest finished one) with the session before it,
+            or None if there are not two scored sessions yet
+        """
+        candidates = list(self.sessions)[-2:]
+        if self.current is not None and self.current.feedback_count:
+            candidates = candidates[-1:] + [self.current]
+        if len(candidates) < 2:
+            return None
+        return candidates[0].progress_data(), candidates[1].progress_data()
+
+    def to_dict(self) -> dict:
+        """JSON-compatible snapshot (e.g., for the user's progress document)."""
+        return {
+            "user_id": self.user_id,
+            "history_size": self.history_size,
+            "trend_window": self.trend_window,
+            "session_count": self.session_count,
+            "lifetime": {dimension: stats.to_dict() for dimension, stats in self.lifetime.items()},
+            "current": self.current.to_dict() if self.current is not None else None,
+            "sessions": [session.to_dict() for session in self.sessions]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "UserProgressRollup":
+        rollup = cls(data["user_id"], data["history_size"], data["trend_window"])
+        rollup.session_count = data["session_count"]
+        rollup.lifetime = {dimension: RunningStats.from_dict(stats) for dimension, stats in data["lifetime"].items()}
+        if data["current"] is not None:
+            rollup.current = SessionRollup.from_dict(data["current"])
+        rollup.sessions.extend(SessionRollup.from_dict(session) for session in data["sessions"])
+        rollup._refresh_trends()
+        return rollup
+
+
+# Export all components
+__all__ = [
+    'RunningStats',
+    'SessionRollup',
+    'UserProgressRollup',
+    'compute_trends',
+    'format_trend_summary'
+]
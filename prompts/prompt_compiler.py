@@ -0,0 +1,176 @@
+"""
+NeuroPilot - Prompt Compiler
+Compiles each scenario x avatar system prompt on first use and caches it on
+the scenario registry snapshot it came from, so a hot reload of the
+definitions never mixes old and new text. Static rules always come first
+(byte-identical across turns, so provider-side prefix/KV caching hits);
+volatile user and adaptive context always come last.
+A lean variant of each prefix (see prompt_minifier) is compiled alongside.
+"""
+
+import hashlib
+
+from prompts.avatar_profiles import get_avatar_for_scenario
+from prompts.roleplay_prompts import build_personalization, profile_fingerprint
+from prompts.prompt_minifier import minify_prompt
+from prompts.scenario_registry import SnapshotView, get_registry
+from prompts.token_budget import estimate_tokens
+
+
+def get_scenario_display_name(scenario_key: str) -> str:
+    """
+    Turn a scenario key into its display name (e.g., 'job_interview' -> 'Job Interview').
+    """
+    return scenario_key.replace("_", " ").title()
+
+
+def _compile_prefix(snapshot, scenario_key: str, avatar_id: str) -> str:
+    data = snapshot.scenario(scenario_key)
+    if avatar_id is None:
+        return data["system_prompt"]
+    avatar_block = get_avatar_for_scenario(
+        avatar_id,
+        data["context"],
+        get_scenario_display_name(scenario_key),
+        snapshot
+    )
+    return f"{data['system_prompt']}\n\n{avatar_block}"
+
+
+def _compile_static_prompts(snapshot, lean: bool = False) -> dict:
+    """Build the static prefix for every scenario, with and without each avatar."""
+    def compile_all():
+        compiled = {}
+        for scenario_key in snapshot.scenarios:
+            for avatar_id in (None, *snapshot.avatars):
+                compiled[(scenario_key, avatar_id)] = get_static_prefix(scenario_key, avatar_id, lean, snapshot)
+        return compiled
+    return snapshot.cached(("compiled_prompts", lean), compile_all)
+
+
+def _hash_prompts(compiled: dict) -> str:
+    """Stable short hash over all compiled static prefixes."""
+    digest = hashlib.sha256()
+    for (scenario_key, avatar_id), prompt in sorted(compiled.items(), key=lambda item: (item[0][0], item[0][1] or "")):
+        digest.update(f"{scenario_key}\0{avatar_id or ''}\0{prompt}\0".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+# Live views of every compiled prefix for the current registry snapshot
+COMPILED_PROMPTS = SnapshotView(get_registry(), _compile_static_prompts)
+
+# Same prefixes without decorative formatting or repeated directives
+LEAN_COMPILED_PROMPTS = SnapshotView(get_registry(), lambda snapshot: _compile_static_prompts(snapshot, lean=True))
+
+
+def __getattr__(name):
+    # PROMPT_VERSION / LEAN_PROMPT_VERSION follow the current snapshot
+    if name == "PROMPT_VERSION":
+        return get_prompt_version()
+    if name == "LEAN_PROMPT_VERSION":
+        return get_prompt_version(lean=True)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_static_prefix(scenario_key: str, avatar_id: str = None, lean: bool = False, snapshot=None) -> str:
+    """
+    Get the compiled (and cached), byte-identical static prompt prefix.
+
+    Args:
+        scenario_key: Key from ROLEPLAY_PROMPTS dict
+        avatar_id: Optional avatar ID from AVATAR_PROFILES
+        lean: Return the minified prefix instead of the human-formatted one
+        snapshot: Registry snapshot pinned by the session (default: current)
+
+    Returns:
+        Static system prompt (core rules + scenario + avatar)
+
+    Raises:
+        ValueError: If the scenario or avatar is unknown
+    """
+    snapshot = snapshot or get_registry().snapshot()
+    if lean:
+        return snapshot.cached(
+            ("lean_prefix", scenario_key, avatar_id),
+            lambda: minify_prompt(get_static_prefix(scenario_key, avatar_id, False, snapshot))
+        )
+    return snapshot.cached(
+        ("prefix", scenario_key, avatar_id),
+        lambda: _compile_prefix(snapshot, scenario_key, avatar_id)
+    )
+
+
+def compile_system_prompt(scenario_key: str, avatar_id: str = None,
+                          user_profile: dict = None, adaptive_context: str = "",
+                          lean: bool = False, snapshot=None) -> str:
+    """
+    Assemble the full per-turn system prompt.
+
+    Args:
+        scenario_key: Key from ROLEPLAY_PROMPTS dict
+        avatar_id: Optional avatar ID from AVATAR_PROFILES
+        user_profile: Optional dict with user preferences/history
+        adaptive_context: Optional output of get_adaptive_context()
+        lean: Use the minified static prefix
+        snapshot: Registry snapshot pinned by the session (default: current)
+
+    Returns:
+        Static prefix, then personalization, then adaptive context
+    """
+    prompt = get_static_prefix(scenario_key, avatar_id, lean, snapshot)
+
+    if user_profile:
+        prompt += build_personalization(profile_fingerprint(user_profile))
+
+    return prompt + adaptive_context
+
+
+def get_prompt_version(lean: bool = False, snapshot=None) -> str:
+    """Return the version hash of the compiled static prompts (or their lean variants)."""
+    snapshot = snapshot or get_registry().snapshot()
+    return snapshot.cached(("prompt_version", lean), lambda: _hash_prompts(_compile_static_prompts(snapshot, lean)))
+
+
+def lean_token_report() -> dict:
+    """
+    Estimated input-token savings of lean mode per static prefix.
+
+    Returns:
+        Dict with 'prefixes' ({'scenario' or 'scenario/avatar': {'full', 'lean',
+        'saved', 'saved_pct'}}) and the same totals under 'total'
+    """
+    snapshot = get_registry().snapshot()
+    compiled = _compile_static_prompts(snapshot)
+    lean_compiled = _compile_static_prompts(snapshot, lean=True)
+    prefixes = {}
+    full_total = lean_total = 0
+    for (scenario_key, avatar_id), prompt in sorted(compiled.items(), key=lambda item: (item[0][0], item[0][1] or "")):
+        full = estimate_tokens(prompt)
+        lean = estimate_tokens(lean_compiled[(scenario_key, avatar_id)])
+        full_total += full
+        lean_total += lean
+        name = f"{scenario_key}/{avatar_id}" if avatar_id else scenario_key
+        prefixes[name] = {"full": full, "lean": lean, "saved": full - lean, "saved_pct": (full - lean) / full * 100.0}
+    return {
+        "prefixes": prefixes,
+        "total": {
+            "full": full_total,
+            "lean": lean_total,
+            "saved": full_total - lean_total,
+            "saved_pct": (full_total - lean_total) / full_total * 100.0 if full_total else 0.0
+        }
+    }
+
+
+# Export all components
+__all__ = [
+    'COMPILED_PROMPTS',
+    'LEAN_COMPILED_PROMPTS',
+    'LEAN_PROMPT_VERSION',
+    'PROMPT_VERSION',
+    'compile_system_prompt',
+    'get_static_prefix',
+    'get_prompt_version',
+    'get_scenario_display_name',
+    'lean_token_report'
+]
@@ -0,0 +1,117 @@
+"""
+NeuroPilot - Prompt Minifier
+Text transforms behind the prompt compiler's lean mode. The source prompts
+stay human-friendly (emoji headers, markdown bold, blank-line spacing); the
+lean output drops that decoration and removes directives that repeat an
+earlier one, so every turn sends fewer input tokens with the same rules.
+"""
+
+import re
+
+# Emoji / pictographs plus the joiners and variation selectors that follow them
+_EMOJI = re.compile("[\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D]+ ?")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+\.)\s*")
+_NON_WORD = re.compile(r"[^\w]+")
+
+# The response-length rule is stated in ADAPTIVE_AGENT_CORE's CRITICAL LENGTH
+# RULE and restated (sometimes with looser numbers) in ALWAYS and every
+# scenario's rules; the first statement is the one that applies
+LENGTH_DIRECTIVE = re.compile(r"\bkeep\s+(?:your\s+)?responses\b.*\bsentences?\b", re.IGNORECASE)
+
+# The sentence count inside a restated length rule, e.g. "2-4 sentences typically - "
+_SENTENCE_COUNT = re.compile(
+    r"\d+\s*-\s*\d+\s+sentences?\b(?:\s+(?:max(?:imum)?|typically|usually))?\s*[,-]?\s*", re.IGNORECASE
+)
+_EMPTY_PARENS = re.compile(r"\s*\(\s*\)")
+
+
+def strip_decorations(text: str) -> str:
+    """
+    Remove emoji, markdown bold and blank-line spacing.
+
+    Args:
+        text: Human-formatted prompt
+
+    Returns:
+        Same content with one line per directive and no decorative characters
+    """
+    text = _EMOJI.sub("", text)
+    text = _BOLD.sub(r"\1", text)
+    text = "\n".join(line.rstrip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n", text).strip()
+
+
+def _directive_key(line: str) -> str:
+    return _NON_WORD.sub(" ", _BULLET.sub("", line).lower()).strip()
+
+
+def _length_qualifiers(line: str, length_rule: str) -> str:
+    """
+    A restated length rule without its sentence count, or None if nothing else is left.
+
+    "- Keep responses concise (2-4 sentences, ADAPT to their length)" becomes
+    "- Keep responses concise (ADAPT to their length)"; "- Keep responses SHORT
+    (2-3 sentences max)" adds nothing to "KEEP RESPONSES VERY SHORT" and is dropped.
+    """
+    trimmed = _EMPTY_PARENS.sub("", _SENTENCE_COUNT.sub("", line)).rstrip()
+    rule_words = set(_directive_key(length_rule).split())
+    if set(_directive_key(trimmed).split()) <= rule_words:
+        return None
+    return trimmed
+
+
+def dedupe_directives(text: str) -> tuple:
+    """
+    Drop bullet directives that repeat an earlier one.
+
+    A bullet is dropped when its normalized wording matches an earlier line.
+    A bullet restating the response-length rule after its first statement
+    loses its (conflicting) sentence count but keeps any scenario-specific
+    qualifiers such as "ADAPT to their length"; it is dropped only when
+    nothing beyond the first statement's wording remains.
+
+    Returns:
+        tuple: (deduplicated text, list of removed or rewritten original lines)
+    """
+    kept = []
+    removed = []
+    seen = set()
+    length_rule = None
+    for line in text.split("\n"):
+        key = _directive_key(line)
+        is_bullet = bool(_BULLET.match(line))
+        is_length_rule = bool(LENGTH_DIRECTIVE.search(line))
+        if is_bullet and key in seen:
+            removed.append(line.strip())
+            continue
+        if is_bullet and is_length_rule and length_rule is not None:
+            removed.append(line.strip())
+            line = _length_qualifiers(line, length_rule)
+            if line is None:
+                continue
+            key = _directive_key(line)
+            if key in seen:
+                continue
+        if key:
+            seen.add(key)
+        if is_length_rule and length_rule is None:
+            length_rule = line
+        kept.append(line)
+    return "\n".join(kept), removed
+
+
+def minify_prompt(text: str) -> str:
+    """Lean version of a system prompt: decorations stripped, duplicate directives removed."""
+    deduped, _ = dedupe_directives(strip_decorations(text))
+    return deduped
+
+
+# Export all components
+__all__ = [
+    'LENGTH_DIRECTIVE',
+    'dedupe_directives',
+    'minify_prompt',
+    'strip_decorations'
+]
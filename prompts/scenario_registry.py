@@ -0,0 +1,254 @@
+"""
+NeuroPilot - Scenario Registry
+Scenario and avatar definitions live as data files under prompts/data and
+are loaded on first access, not at import time. Each load produces an
+immutable RegistrySnapshot that also caches the prompts compiled from it.
+The registry re-checks file mtimes at most every `check_interval` seconds
+and swaps in a new snapshot when anything changed; a session that keeps a
+reference to its snapshot keeps using the same definitions until it ends.
+
+Layout:
+    data/scenarios.json       ordered list of {key, context, character_name, difficulty, tags}
+    data/scenarios/<key>.txt  scenario prompt (ADAPTIVE_AGENT_CORE is prepended on load)
+    data/avatars.json         ordered list of avatar profiles (each with an 'id')
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Mapping
+
+from prompts.adaptive_agent_system import ADAPTIVE_AGENT_CORE
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_CHECK_INTERVAL = 2.0  # Seconds between mtime checks; None disables hot reload
+
+SCENARIOS_FILE = "scenarios.json"
+AVATARS_FILE = "avatars.json"
+SCENARIO_PROMPT_DIR = "scenarios"
+
+_MISSING = object()
+
+
+class RegistrySnapshot:
+    """
+    One version of the scenario and avatar definitions.
+
+    Snapshots are never modified after loading. cached() memoizes values
+    derived from this version (compiled prefixes, avatar blocks), so a hot
+    reload starts from an empty cache instead of invalidating entries.
+    """
+
+    def __init__(self, scenarios: dict, avatars: dict, source_version: str):
+        self.scenarios = scenarios
+        self.avatars = avatars
+        self.source_version = source_version
+        self.loaded_at = time.time()
+        self._cache = {}
+
+    def cached(self, key, build):
+        """Return the cached value for key, calling build() on first use."""
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._cache.setdefault(key, build())
+        return value
+
+    def scenario(self, scenario_key: str) -> dict:
+        if scenario_key not in self.scenarios:
+            raise ValueError(f"Unknown scenario: {scenario_key}")
+        return self.scenarios[scenario_key]
+
+    def avatar(self, avatar_id: str) -> dict:
+        if avatar_id not in self.avatars:
+            raise ValueError(f"Unknown avatar: {avatar_id}. Available: {list(self.avatars.keys())}")
+        return self.avatars[avatar_id]
+
+
+def load_snapshot(data_dir: str = DEFAULT_DATA_DIR) -> RegistrySnapshot:
+    """
+    Read every definition file in data_dir into a new snapshot.
+
+    Raises:
+        OSError: If a definition file is missing or unreadable
+        ValueError: If a file is not valid JSON or a definition is malformed
+    """
+    digest = hashlib.sha256()
+
+    def read(path):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        digest.update(f"{os.path.relpath(path, data_dir)}\0{text}\0".encode("utf-8"))
+        return text
+
+    scenarios = {}
+    for entry in json.loads(read(os.path.join(data_dir, SCENARIOS_FILE))):
+        try:
+            key = entry["key"]
+            prompt = read(os.path.join(data_dir, SCENARIO_PROMPT_DIR, f"{key}.txt")).rstrip("\n")
+            scenarios[key] = {
+                "context": entry["context"],
+                "character_name": entry["character_name"],
+                "system_prompt": f"{ADAPTIVE_AGENT_CORE}\n\n{prompt}",
+                "difficulty": entry["difficulty"],
+                "tags": entry["tags"]
+            }
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed scenario definition {entry!r}: {e}") from e
+
+    avatars = {}
+    for profile in json.loads(read(os.path.join(data_dir, AVATARS_FILE))):
+        if not isinstance(profile, dict) or "id" not in profile:
+            raise ValueError(f"Malformed avatar definition {profile!r}: missing 'id'")
+        avatars[profile["id"]] = profile
+
+    return RegistrySnapshot(scenarios, avatars, digest.hexdigest()[:16])
+
+
+def _file_signature(data_dir: str) -> tuple:
+    """(name, mtime_ns, size) of every definition file, to detect edits cheaply."""
+    signature = []
+    for name in (SCENARIOS_FILE, AVATARS_FILE):
+        try:
+            stat = os.stat(os.path.join(data_dir, name))
+            signature.append((name, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((name, None, None))
+    try:
+        with os.scandir(os.path.join(data_dir, SCENARIO_PROMPT_DIR)) as entries:
+            for entry in entries:
+                stat = entry.stat()
+                signature.append((f"{SCENARIO_PROMPT_DIR}/{entry.name}", stat.st_mtime_ns, stat.st_size))
+    except FileNotFoundError:
+        pass
+    return tuple(sorted(signature, key=lambda item: item[0]))
+
+
+class ScenarioRegistry:
+    """
+    Lazily loaded, hot-reloading scenario/avatar definitions.
+
+    snapshot() is safe to call on every request: between mtime checks it is
+    one clock read. If a changed file fails to load, the previous snapshot
+    stays active and the error is kept in `last_error` (see metrics()).
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, check_interval: float = DEFAULT_CHECK_INTERVAL,
+                 clock=time.monotonic):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self.clock = clock
+        self.last_error = None
+        self._snapshot = None
+        self._signature = None
+        self._next_check = 0.0
+        self._reloads = 0
+        self._failed_reloads = 0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> RegistrySnapshot:
+        """Current snapshot, loading it on first use and reloading it if files changed."""
+        current = self._snapshot
+        if current is not None and (self.check_interval is None or self.clock() < self._next_check):
+            return current
+        with self._lock:
+            if self._snapshot is None or (self.check_interval is not None and self.clock() >= self._next_check):
+                self._refresh()
+            return self._snapshot
+
+    def reload(self) -> RegistrySnapshot:
+        """Re-read the definition files now, even if their mtimes look unchanged."""
+        with self._lock:
+            self._signature = None
+            self._refresh()
+            return self._snapshot
+
+    def _refresh(self):
+        if self.check_interval is not None:
+            self._next_check = self.clock() + self.check_interval
+        signature = _file_signature(self.data_dir)
+        if self._snapshot is not None and signature == self._signature:
+            return
+        try:
+            snapshot = load_snapshot(self.data_dir)
+        except (OSError, ValueError) as e:
+            if self._snapshot is None:
+                raise
+            # Keep serving the last good version; retry once the files change again
+            self._signature = signature
+            self._failed_reloads += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            return
+        if self._snapshot is not None:
+            self._reloads += 1
+        self._snapshot = snapshot
+        self._signature = signature
+        self.last_error = None
+
+    def metrics(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "source_version": snapshot.source_version if snapshot is not None else None,
+            "scenarios": len(snapshot.scenarios) if snapshot is not None else 0,
+            "avatars": len(snapshot.avatars) if snapshot is not None else 0,
+            "reloads": self._reloads,
+            "failed_reloads": self._failed_reloads,
+            "last_error": self.last_error
+        }
+
+
+class SnapshotView(Mapping):
+    """
+    Read-only mapping that always reflects the registry's current snapshot.
+
+    Backs the module-level ROLEPLAY_PROMPTS / AVATAR_PROFILES names so
+    existing callers keep working and see hot-reloaded definitions.
+    """
+
+    def __init__(self, registry: ScenarioRegistry, resolve):
+        self._registry = registry
+        self._resolve = resolve  # snapshot -> dict
+
+    def _current(self) -> dict:
+        return self._resolve(self._registry.snapshot())
+
+    def __getitem__(self, key):
+        return self._current()[key]
+
+    def __contains__(self, key):
+        return key in self._current()
+
+    def __iter__(self):
+        return iter(self._current())
+
+    def __len__(self):
+        return len(self._current())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._current()!r})"
+
+
+_default_registry = ScenarioRegistry()
+
+
+def get_registry() -> ScenarioRegistry:
+    """The process-wide registry backed by prompts/data."""
+    return _default_registry
+
+
+def get_snapshot() -> RegistrySnapshot:
+    """Current snapshot of the process-wide registry (pin this for a session's lifetime)."""
+    return _default_registry.snapshot()
+
+
+# Export all components
+__all__ = [
+    'RegistrySnapshot',
+    'ScenarioRegistry',
+    'SnapshotView',
+    'get_registry',
+    'get_snapshot',
+    'load_snapshot'
+]
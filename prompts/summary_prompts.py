@@ -3,6 +3,8 @@ NeuroPilot - Summary & Takeaway Prompt Templates
 These prompts generate end-of-session summaries with actionable feedback.
 """
 
+from prompts.token_budget import estimate_tokens, select_recent_lines, trim_to_tokens
+
 SUMMARY_SYSTEM_PROMPT = """You are a supportive social communication coach providing an end-of-session summary for a neurodiverse individual who just completed a conversation practice.
 
 Your goal is to:
@@ -76,9 +78,156 @@ Provide a brief progress analysis (3-4 sentences) that:
 Keep the tone supportive and motivating. Focus on trends, not just numbers."""
 
 
+SCORE_DIMENSIONS = ("tone", "clarity", "empathy", "engagement")
+
+# Defaults for token-budgeted summaries
+DEFAULT_SUMMARY_TOKEN_BUDGET = 6000
+DEFAULT_MAX_TURN_TOKENS = 150
+DEFAULT_RECENT_SCORE_LINES = 5
+
+
+class SummaryAccumulator:
+    """
+    Incrementally builds the end-of-session summary prompt.
+    
+    Feed each message and feedback result as the session runs (running sums
+    per dimension, transcript kept as a list of lines), so build_prompt() at
+    session end only joins what is already there.
+    """
+    
+    __slots__ = ("context", "user_message_count", "score_count", "_transcript_lines", "_score_lines", "_score_rows", "_score_sums")
+    
+    def __init__(self, context):
+        self.context = context
+        self.user_message_count = 0
+        self.score_count = 0
+        self._transcript_lines = []
+        self._score_lines = []
+        self._score_rows = []
+        self._score_sums = dict.fromkeys(SCORE_DIMENSIONS, 0)
+    
+    def add_message(self, role, content):
+        """Append one message ('user' or 'assistant') to the transcript."""
+        if role == "user":
+            self.user_message_count += 1
+        speaker = "AI" if role == "assistant" else "User"
+        self._transcript_lines.append(f"[{len(self._transcript_lines) + 1}] {speaker}: {content}")
+    
+    def add_feedback(self, feedback):
+        """Record one feedback result (dict with 'tone', 'clarity', 'empathy', 'engagement' scores)."""
+        for dimension in SCORE_DIMENSIONS:
+            self._score_sums[dimension] += feedback[dimension]["score"]
+        self.score_count += 1
+        self._score_rows.append(tuple(feedback[dimension]["score"] for dimension in SCORE_DIMENSIONS))
+        self._score_lines.append(
+            f"Message {self.score_count}: Tone={feedback['tone']['score']}, Clarity={feedback['clarity']['score']}, "
+            f"Empathy={feedback['empathy']['score']}, Engagement={feedback['engagement']['score']}\n"
+        )
+    
+    def average_scores(self):
+        """Return per-dimension averages, or None if no feedback was recorded."""
+        if not self.score_count:
+            return None
+        return {dimension: total / self.score_count for dimension, total in self._score_sums.items()}
+    
+    def build_scores_summary(self, recent_score_lines=None):
+        """
+        Format the FEEDBACK SCORES section.
+        
+        Args:
+            recent_score_lines: If set, only this many latest per-message lines are
+                kept verbatim; older ones collapse into one averaged line
+        """
+        averages = self.average_scores()
+        if averages is None:
+            return "No feedback scores available."
+        
+        score_lines = self._score_lines
+        older_count = self.score_count - recent_score_lines if recent_score_lines is not None else 0
+        if older_count > 0:
+            recent_rows = self._score_rows[older_count:]
+            older = [
+                (self._score_sums[dimension] - sum(row[i] for row in recent_rows)) / older_count
+                for i, dimension in enumerate(SCORE_DIMENSIONS)
+            ]
+            label = f"Messages 1-{older_count} (averaged)" if older_count > 1 else "Message 1"
+            score_lines = [
+                f"{label}: Tone={older[0]:.1f}, Clarity={older[1]:.1f}, Empathy={older[2]:.1f}, Engagement={older[3]:.1f}\n"
+            ] + self._score_lines[older_count:]
+        
+        return f"""Average Scores:
+- Tone: {averages['tone']:.1f}/100
+- Clarity: {averages['clarity']:.1f}/100
+- Empathy: {averages['empathy']:.1f}/100
+- Engagement: {averages['engagement']:.1f}/100
+
+Individual Message Scores:
+""" + "".join(score_lines)
+    
+    def build_prompt(self):
+        """
+        Build the summary prompt from everything ingested so far.
+        
+        Returns:
+            tuple: (system_prompt, user_prompt)
+        """
+        user_prompt = SUMMARY_USER_PROMPT_TEMPLATE.format(
+            context=self.context,
+            message_count=self.user_message_count,
+            conversation_transcript="\n".join(self._transcript_lines).strip(),
+            scores_summary=self.build_scores_summary()
+        )
+        
+        return SUMMARY_SYSTEM_PROMPT, user_prompt
+    
+    def build_budgeted_prompt(self, token_budget=DEFAULT_SUMMARY_TOKEN_BUDGET,
+                              max_turn_tokens=DEFAULT_MAX_TURN_TOKENS,
+                              recent_score_lines=DEFAULT_RECENT_SCORE_LINES):
+        """
+        Build the summary prompt compacted to fit a token budget.
+        
+        Oversized turns are trimmed, older score lines are collapsed into
+        per-dimension averages, and the most recent turns are kept verbatim
+        (oldest dropped first) until the budget is used.
+        
+        Args:
+            token_budget: Estimated tokens allowed for system + user prompt
+            max_turn_tokens: Cap for any single transcript turn
+            recent_score_lines: Per-message score lines kept verbatim
+        
+        Returns:
+            tuple: (system_prompt, user_prompt, token_count)
+        """
+        scores_summary = self.build_scores_summary(recent_score_lines)
+        base_tokens = estimate_tokens(SUMMARY_SYSTEM_PROMPT) + estimate_tokens(
+            SUMMARY_USER_PROMPT_TEMPLATE.format(
+                context=self.context,
+                message_count=self.user_message_count,
+                conversation_transcript="",
+                scores_summary=scores_summary
+            )
+        )
+        
+        lines = [trim_to_tokens(line, max_turn_tokens) for line in self._transcript_lines]
+        kept, dropped = select_recent_lines(lines, token_budget - base_tokens)
+        if dropped:
+            omitted_line = f"[1-{dropped}] ({dropped} earlier messages omitted)"
+            kept, dropped = select_recent_lines(lines, token_budget - base_tokens - estimate_tokens(omitted_line) - 1)
+            kept.insert(0, f"[1-{dropped}] ({dropped} earlier messages omitted)")
+        
+        user_prompt = SUMMARY_USER_PROMPT_TEMPLATE.format(
+            context=self.context,
+            message_count=self.user_message_count,
+            conversation_transcript="\n".join(kept).strip(),
+            scores_summary=scores_summary
+        )
+        
+        return SUMMARY_SYSTEM_PROMPT, user_prompt, estimate_tokens(SUMMARY_SYSTEM_PROMPT) + estimate_tokens(user_prompt)
+
+
 def create_summary_prompt(context, conversation_history, feedback_scores):
     """
-    Create a complete session summary prompt.
+    Create a complete session summary prompt (single pass over history and scores).
     
     Args:
         context: String describing the social scenario
@@ -88,54 +237,57 @@ def create_summary_prompt(context, conversation_history, feedback_scores):
     Returns:
         tuple: (system_prompt, user_prompt)
     """
-    # Format conversation transcript
-    transcript = ""
-    for i, msg in enumerate(conversation_history, 1):
-        role = "AI" if msg["role"] == "assistant" else "User"
-        transcript += f"[{i}] {role}: {msg['content']}\n"
-    
-    # Calculate average scores
+    accumulator = SummaryAccumulator(context)
+    for msg in conversation_history:
+        accumulator.add_message(msg["role"], msg["content"])
     if feedback_scores:
-        avg_tone = sum(f["tone"]["score"] for f in feedback_scores) / len(feedback_scores)
-        avg_clarity = sum(f["clarity"]["score"] for f in feedback_scores) / len(feedback_scores)
-        avg_empathy = sum(f["empathy"]["score"] for f in feedback_scores) / len(feedback_scores)
-        avg_engagement = sum(f["engagement"]["score"] for f in feedback_scores) / len(feedback_scores)
-        
-        scores_summary = f"""Average Scores:
-- Tone: {avg_tone:.1f}/100
-- Clarity: {avg_clarity:.1f}/100
-- Empathy: {avg_empathy:.1f}/100
-- Engagement: {avg_engagement:.1f}/100
+        for feedback in feedback_scores:
+            accumulator.add_feedback(feedback)
+    
+    return accumulator.build_prompt()
 
-Individual Message Scores:
-"""
-        for i, score in enumerate(feedback_scores, 1):
-            scores_summary += f"Message {i}: Tone={score['tone']['score']}, Clarity={score['clarity']['score']}, Empathy={score['empathy']['score']}, Engagement={score['engagement']['score']}\n"
-    else:
-        scores_summary = "No feedback scores available."
-    
-    user_prompt = SUMMARY_USER_PROMPT_TEMPLATE.format(
-        context=context,
-        message_count=len([m for m in conversation_history if m["role"] == "user"]),
-        conversation_transcript=transcript.strip(),
-        scores_summary=scores_summary
-    )
+
+def create_budgeted_summary_prompt(context, conversation_history, feedback_scores,
+                                   token_budget=DEFAULT_SUMMARY_TOKEN_BUDGET,
+                                   max_turn_tokens=DEFAULT_MAX_TURN_TOKENS,
+                                   recent_score_lines=DEFAULT_RECENT_SCORE_LINES):
+    """
+    Create a session summary prompt that fits a token budget.
+    
+    Args:
+        context: String describing the social scenario
+        conversation_history: List of dicts with 'role' and 'content'
+        feedback_scores: List of feedback dicts with scores for each user message
+        token_budget: Estimated tokens allowed for system + user prompt
+        max_turn_tokens: Cap for any single transcript turn
+        recent_score_lines: Per-message score lines kept verbatim
+    
+    Returns:
+        tuple: (system_prompt, user_prompt, token_count)
+    """
+    accumulator = SummaryAccumulator(context)
+    for msg in conversation_history:
+        accumulator.add_message(msg["role"], msg["content"])
+    if feedback_scores:
+        for feedback in feedback_scores:
+            accumulator.add_feedback(feedback)
     
-    return SUMMARY_SYSTEM_PROMPT, user_prompt
+    return accumulator.build_budgeted_prompt(token_budget, max_turn_tokens, recent_score_lines)
 
 
-def create_progress_prompt(prev_session_data, current_session_data):
+def create_progress_prompt(prev_session_data, current_session_data, trend_summary=None):
     """
     Create a progress comparison prompt across sessions.
     
     Args:
         prev_session_data: Dict with previous session info (context, scores, session_num)
         current_session_data: Dict with current session info (context, scores, session_num)
+        trend_summary: Optional multi-session trend section (see progress_rollups.format_trend_summary)
     
     Returns:
         str: Complete prompt for progress analysis
     """
-    return PROGRESS_COMPARISON_PROMPT.format(
+    prompt = PROGRESS_COMPARISON_PROMPT.format(
         prev_session_num=prev_session_data["session_num"],
         prev_context=prev_session_data["context"],
         prev_tone=f"{prev_session_data['avg_scores']['tone']:.1f}",
@@ -149,6 +301,9 @@ def create_progress_prompt(prev_session_data, current_session_data):
         current_empathy=f"{current_session_data['avg_scores']['empathy']:.1f}",
         current_engagement=f"{current_session_data['avg_scores']['engagement']:.1f}"
     )
+    if trend_summary:
+        prompt += f"\n\n{trend_summary}\n\nUse the trend to judge whether changes are consistent or a one-off."
+    return prompt
 
 
 # Template for quick micro-summary (after each user message, optional)
@@ -0,0 +1,286 @@
+"""
+NeuroPilot - Token Accounting
+Counts input and output tokens per prompt template, scenario and session
+using the local estimate_tokens() heuristic, reconciled against provider
+usage fields when a response carries them. Per-session and per-day budgets
+drive a degrade path: shorter feedback history and no inline tips once a
+budget is nearly used, and a minimal history once it is exceeded.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+
+from prompts.adaptive_agent_system import ADAPTIVE_AGENT_CORE
+from prompts.feedback_prompts import (
+    DEFAULT_FEEDBACK_TOKEN_BUDGET,
+    DEFAULT_MAX_HISTORY_TURNS,
+    FEEDBACK_SYSTEM_PROMPT,
+    INLINE_FEEDBACK_PROMPT,
+    create_budgeted_feedback_prompt
+)
+from prompts.roleplay_prompts import ROLEPLAY_PROMPTS
+from prompts.summary_prompts import DEFAULT_SUMMARY_TOKEN_BUDGET, PROGRESS_COMPARISON_PROMPT, SUMMARY_SYSTEM_PROMPT
+from prompts.token_budget import estimate_tokens
+
+# Template names used as accounting keys
+TEMPLATE_ROLEPLAY = "roleplay"
+TEMPLATE_FEEDBACK = "feedback"
+TEMPLATE_BATCH_FEEDBACK = "batch_feedback"
+TEMPLATE_INLINE_FEEDBACK = "inline_feedback"
+TEMPLATE_SUMMARY = "summary"
+TEMPLATE_PROGRESS = "progress"
+
+BUDGET_NORMAL = "normal"
+BUDGET_DEGRADED = "degraded"
+BUDGET_EXCEEDED = "exceeded"
+
+DEFAULT_DEGRADE_AT = 0.8  # Fraction of a budget at which the degrade path starts
+DAYS_KEPT = 7
+
+
+def template_token_costs() -> dict:
+    """
+    Static input cost of each system template (estimated tokens).
+
+    Returns:
+        Dict of template name -> tokens; roleplay entries are per scenario
+        with the share taken by the embedded ADAPTIVE_AGENT_CORE
+    """
+    core_tokens = estimate_tokens(ADAPTIVE_AGENT_CORE)
+    costs = {
+        "adaptive_agent_core": core_tokens,
+        "feedback_system": estimate_tokens(FEEDBACK_SYSTEM_PROMPT),
+        "inline_feedback": estimate_tokens(INLINE_FEEDBACK_PROMPT),
+        "summary_system": estimate_tokens(SUMMARY_SYSTEM_PROMPT),
+        "progress_comparison": estimate_tokens(PROGRESS_COMPARISON_PROMPT),
+        "roleplay": {}
+    }
+    for scenario_key, scenario in ROLEPLAY_PROMPTS.items():
+        prompt = scenario["system_prompt"]
+        costs["roleplay"][scenario_key] = {
+            "tokens": estimate_tokens(prompt),
+            "adaptive_core_tokens": core_tokens if ADAPTIVE_AGENT_CORE in prompt else 0
+        }
+    return costs
+
+
+def usage_tokens(usage):
+    """
+    Read (input_tokens, output_tokens) from a provider usage field.
+
+    Accepts OpenAI/Groq-style dicts or objects ('prompt_tokens',
+    'completion_tokens') and Anthropic-style ('input_tokens', 'output_tokens').
+
+    Returns:
+        (input_tokens, output_tokens) or None if the usage is missing/unrecognized
+    """
+    if usage is None:
+        return None
+    get = usage.get if isinstance(usage, dict) else lambda name: getattr(usage, name, None)
+    for input_name, output_name in (("prompt_tokens", "completion_tokens"), ("input_tokens", "output_tokens")):
+        input_tokens = get(input_name)
+        if input_tokens is not None:
+            return int(input_tokens), int(get(output_name) or 0)
+    return None
+
+
+def _new_totals() -> dict:
+    return {
+        "calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "estimated_input_tokens": 0,
+        "estimated_output_tokens": 0,
+        "reported_calls": 0
+    }
+
+
+def _add(totals: dict, input_tokens, output_tokens, estimated_input, estimated_output, reported):
+    totals["calls"] += 1
+    totals["input_tokens"] += input_tokens
+    totals["output_tokens"] += output_tokens
+    totals["estimated_input_tokens"] += estimated_input
+    totals["estimated_output_tokens"] += estimated_output
+    totals["reported_calls"] += reported
+
+
+class TokenLedger:
+    """
+    Running token totals with optional per-session and per-day budgets.
+
+    Budgets count input + output tokens. When provider usage is present it
+    is authoritative; otherwise the local estimate is used, scaled by the
+    template's observed provider/estimate ratio once calibration data exists.
+    """
+
+    def __init__(self, session_budget: int = None, daily_budget: int = None,
+                 degrade_at: float = DEFAULT_DEGRADE_AT, clock=time.time):
+        self.session_budget = session_budget
+        self.daily_budget = daily_budget
+        self.degrade_at = degrade_at
+        self.clock = clock
+        self.by_template = {}
+        self.by_scenario = {}
+        self.by_session = {}
+        self.by_day = {}
+        self._calibration = {}  # template -> [estimated input, reported input] over reported calls
+        self._lock = threading.Lock()
+
+    def _day(self) -> str:
+        return datetime.fromtimestamp(self.clock(), timezone.utc).strftime("%Y-%m-%d")
+
+    def calibration(self, template: str) -> float:
+        """Provider-reported / estimated input tokens for a template (1.0 until usage is seen)."""
+        estimated, reported = self._calibration.get(template, (0, 0))
+        return reported / estimated if estimated else 1.0
+
+    def record(self, template: str, prompt_texts, output_text: str = "", usage=None,
+               scenario: str = None, session_id: str = None) -> dict:
+        """
+        Account for one model call.
+
+        Args:
+            template: Template name (TEMPLATE_* constant)
+            prompt_texts: Prompt string or sequence of strings (system, user, ...)
+            output_text: Model output text
+            usage: Provider usage field from the response, if any
+            scenario: Scenario key, if the call belongs to one
+            session_id: Session id, if the call belongs to one
+
+        Returns:
+            Dict with 'input_tokens', 'output_tokens' (as counted) and 'reported'
+        """
+        if isinstance(prompt_texts, str):
+            prompt_texts = (prompt_texts,)
+        estimated_input = sum(estimate_tokens(text) for text in prompt_texts)
+        estimated_output = estimate_tokens(output_text)
+        reported = usage_tokens(usage)
+
+        with self._lock:
+            if reported is not None:
+                input_tokens, output_tokens = reported
+                calibration = self._calibration.setdefault(template, [0, 0])
+                calibration[0] += estimated_input
+                calibration[1] += input_tokens
+            else:
+                factor = self.calibration(template)
+                input_tokens = round(estimated_input * factor)
+                output_tokens = estimated_output
+
+            values = (input_tokens, output_tokens, estimated_input, estimated_output, int(reported is not None))
+            _add(self.by_template.setdefault(template, _new_totals()), *values)
+            if scenario is not None:
+                _add(self.by_scenario.setdefault(scenario, _new_totals()), *values)
+            if session_id is not None:
+                _add(self.by_session.setdefault(session_id, _new_totals()), *values)
+            day = self._day()
+            if day not in self.by_day:
+                for old_day in sorted(self.by_day)[:max(len(self.by_day) - (DAYS_KEPT - 1), 0)]:
+                    del self.by_day[old_day]
+            _add(self.by_day.setdefault(day, _new_totals()), *values)
+
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "reported": reported is not None}
+
+    def session_tokens(self, session_id: str) -> int:
+        totals = self.by_session.get(session_id)
+        return totals["input_tokens"] + totals["output_tokens"] if totals else 0
+
+    def daily_tokens(self) -> int:
+        totals = self.by_day.get(self._day())
+        return totals["input_tokens"] + totals["output_tokens"] if totals else 0
+
+    def budget_state(self, session_id: str = None) -> str:
+        """BUDGET_NORMAL, BUDGET_DEGRADED or BUDGET_EXCEEDED (worst of session and day)."""
+        usage_ratio = 0.0
+        if self.session_budget and session_id is not None:
+            usage_ratio = max(usage_ratio, self.session_tokens(session_id) / self.session_budget)
+        if self.daily_budget:
+            usage_ratio = max(usage_ratio, self.daily_tokens() / self.daily_budget)
+        if usage_ratio >= 1.0:
+            return BUDGET_EXCEEDED
+        if usage_ratio >= self.degrade_at:
+            return BUDGET_DEGRADED
+        return BUDGET_NORMAL
+
+    def policy(self, session_id: str = None) -> dict:
+        """
+        Prompt settings for the next call under the current budget state.
+
+        Returns:
+            Dict with 'state', 'max_history_turns', 'feedback_token_budget',
+            'summary_token_budget' and 'skip_inline_tips'
+        """
+        state = self.budget_state(session_id)
+        if state == BUDGET_EXCEEDED:
+            return {
+                "state": state,
+                "max_history_turns": 2,
+                "feedback_token_budget": DEFAULT_FEEDBACK_TOKEN_BUDGET // 2,
+                "summary_token_budget": DEFAULT_SUMMARY_TOKEN_BUDGET // 3,
+                "skip_inline_tips": True
+            }
+        if state == BUDGET_DEGRADED:
+            return {
+                "state": state,
+                "max_history_turns": DEFAULT_MAX_HISTORY_TURNS // 2,
+                "feedback_token_budget": DEFAULT_FEEDBACK_TOKEN_BUDGET * 3 // 4,
+                "summary_token_budget": DEFAULT_SUMMARY_TOKEN_BUDGET // 2,
+                "skip_inline_tips": True
+            }
+        return {
+            "state": state,
+            "max_history_turns": DEFAULT_MAX_HISTORY_TURNS,
+            "feedback_token_budget": DEFAULT_FEEDBACK_TOKEN_BUDGET,
+            "summary_token_budget": DEFAULT_SUMMARY_TOKEN_BUDGET,
+            "skip_inline_tips": False
+        }
+
+    def end_session(self, session_id: str) -> dict:
+        """Drop a finished session's counters and return its totals (or None)."""
+        with self._lock:
+            return self.by_session.pop(session_id, None)
+
+    def report(self) -> dict:
+        """JSON-compatible snapshot of every total plus calibration factors."""
+        with self._lock:
+            return {
+                "by_template": {name: dict(totals) for name, totals in self.by_template.items()},
+                "by_scenario": {name: dict(totals) for name, totals in self.by_scenario.items()},
+                "by_session": {name: dict(totals) for name, totals in self.by_session.items()},
+                "by_day": {name: dict(totals) for name, totals in self.by_day.items()},
+                "calibration": {template: self.calibration(template) for template in self._calibration}
+            }
+
+
+def create_policy_feedback_prompt(ledger: TokenLedger, session_id: str, context, conversation_history, user_message):
+    """
+    create_budgeted_feedback_prompt() sized by the session's budget policy.
+
+    Returns:
+        tuple: (system_prompt, user_prompt, token_count)
+    """
+    policy = ledger.policy(session_id)
+    return create_budgeted_feedback_prompt(
+        context, conversation_history, user_message,
+        token_budget=policy["feedback_token_budget"],
+        max_history_turns=policy["max_history_turns"]
+    )
+
+
+# Export all components
+__all__ = [
+    'BUDGET_DEGRADED',
+    'BUDGET_EXCEEDED',
+    'BUDGET_NORMAL',
+    'TEMPLATE_BATCH_FEEDBACK',
+    'TEMPLATE_FEEDBACK',
+    'TEMPLATE_INLINE_FEEDBACK',
+    'TEMPLATE_PROGRESS',
+    'TEMPLATE_ROLEPLAY',
+    'TEMPLATE_SUMMARY',
+    'TokenLedger',
+    'create_policy_feedback_prompt',
+    'template_token_costs',
+    'usage_tokens'
+]
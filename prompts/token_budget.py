@@ -0,0 +1,87 @@
+"""
+NeuroPilot - Token Budget Helpers
+Fast local token estimates and transcript compaction so feedback and
+summary prompts stay inside a configurable token budget.
+"""
+
+import re
+
+# Words, numbers and individual punctuation marks each count as roughly one token
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Average characters per token for English BPE vocabularies
+CHARS_PER_TOKEN = 4
+
+TRIM_MARKER = " …[trimmed]"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without a tokenizer.
+
+    Takes the larger of the word/punctuation count and chars/4, which tracks
+    BPE tokenizers closely for conversational English.
+
+    Args:
+        text: Any prompt text
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    return max(len(_TOKEN_PATTERN.findall(text)), (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Trim a single oversized turn to roughly max_tokens.
+
+    Args:
+        text: Message text
+        max_tokens: Token allowance for this text
+
+    Returns:
+        The original text if it fits, otherwise a truncated copy ending in TRIM_MARKER
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    cut = max(max_tokens * CHARS_PER_TOKEN - len(TRIM_MARKER), 0)
+    trimmed = text[:cut]
+    # Shrink further if the text is dense in short words/punctuation
+    while trimmed and estimate_tokens(trimmed + TRIM_MARKER) > max_tokens:
+        trimmed = trimmed[:int(len(trimmed) * 0.8)]
+    return trimmed.rstrip() + TRIM_MARKER
+
+
+def select_recent_lines(lines: list, token_budget: int) -> tuple:
+    """
+    Keep the most recent lines that fit in a token budget.
+
+    Args:
+        lines: Formatted lines, oldest first
+        token_budget: Tokens available for the lines (one extra token per newline)
+
+    Returns:
+        tuple: (kept_lines oldest first, number of older lines dropped)
+    """
+    kept = []
+    used = 0
+    for line in reversed(lines):
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            break
+        kept.append(line)
+        used += cost
+    kept.reverse()
+    return kept, len(lines) - len(kept)
+
+
+# Export all components
+__all__ = [
+    'CHARS_PER_TOKEN',
+    'estimate_tokens',
+    'trim_to_tokens',
+    'select_recent_lines'
+]
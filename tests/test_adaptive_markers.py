@@ -0,0 +1,77 @@
+"""
+NeuroPilot - Adaptive marker classification tests
+MARKER_PATTERN must not fire inside unrelated words, must still catch the
+common variants of each marker, and the batch API must agree with the
+per-message functions.
+"""
+
+import pytest
+
+from prompts.adaptive_agent_system import (
+    classify_markers,
+    classify_markers_batch,
+    get_adaptive_context,
+    get_adaptive_context_batch
+)
+
+
+@pytest.mark.parametrize("message", [
+    "I brought an umbrella",
+    "My drum teacher said hi",
+    "Practice ended with drums",
+    "my translater said",
+    "Their new album is out",
+    "He was shaking his head in the humid room",
+])
+def test_markers_do_not_fire_inside_other_words(message):
+    assert classify_markers(message) == set()
+
+
+@pytest.mark.parametrize("message, category", [
+    ("goodbye!", "exit"),
+    ("Bye", "exit"),
+    ("see you later today", "exit"),
+    ("Thanks for this", "exit"),
+    ("ummm I don't know", "anxiety"),
+    ("uhh, maybe?", "anxiety"),
+    ("Um, okay", "anxiety"),
+    ("Sorry about that", "anxiety"),
+    ("I loved it", "enthusiasm"),
+    ("I'm loving this", "enthusiasm"),
+    ("The greatest day ever", "enthusiasm"),
+    ("That was so lovely", "enthusiasm"),
+    ("wow!", "enthusiasm"),
+])
+def test_marker_variants_fire(message, category):
+    assert category in classify_markers(message)
+
+
+def test_message_with_every_category():
+    assert classify_markers("Um, that was AMAZING, but I gotta run") == {"anxiety", "enthusiasm", "exit"}
+
+
+TURNS = [
+    (1, [], "hi"),
+    (3, [40, 30, 20], "goodbye!"),
+    (5, [10, 12], "ummm I think I loved it"),
+    (7, [80, 60, 25], "I brought an umbrella"),
+    (10, [15, 15, 15], "see you later"),
+    (12, [30], "The greatest day, take care"),
+    (20, [200, 180, 150], "Honestly I was nervous but it went great! " * 8),
+    (21, [5, 5, 5], ""),
+]
+
+
+def test_batch_matches_per_message():
+    messages = [message for _, _, message in TURNS]
+    assert classify_markers_batch(messages) == [classify_markers(message) for message in messages]
+    assert get_adaptive_context_batch(TURNS) == [get_adaptive_context(*turn) for turn in TURNS]
+
+
+def test_batch_does_not_match_across_messages():
+    assert classify_markers_batch(["I gotta", "run", "um", "brella"]) == [set(), set(), {"anxiety"}, set()]
+
+
+def test_exit_signal_reaches_adaptive_context():
+    context = get_adaptive_context(3, [40, 30, 20], "goodbye!")
+    assert "signaling they want to end" in context
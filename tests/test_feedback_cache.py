@@ -0,0 +1,51 @@
+"""
+NeuroPilot - Feedback cache tests
+Damaged disk entries are misses (and get removed); old version tiers are pruned.
+"""
+
+import os
+
+import pytest
+
+from prompts.feedback_cache import FeedbackCache, make_cache_key
+
+
+@pytest.mark.parametrize("content", [
+    "[]",
+    "null",
+    "not json",
+    '{"result": {"tone": 1}}',
+    '{"created_at": 1.0}',
+    '{"created_at": "yesterday", "result": {}}',
+])
+def test_bad_disk_entry_is_a_miss_and_removed(tmp_path, content):
+    cache = FeedbackCache(cache_dir=str(tmp_path))
+    path = os.path.join(cache.cache_dir, make_cache_key("ctx", [], "hi", cache.version) + ".json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+    assert cache.get("ctx", [], "hi") is None
+    assert not os.path.exists(path)
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_entry_survives_restart(tmp_path):
+    FeedbackCache(cache_dir=str(tmp_path)).put("ctx", [], "hi", {"tone": {"score": 80}})
+    cache = FeedbackCache(cache_dir=str(tmp_path))
+    assert cache.get("ctx", [], "hi") == {"tone": {"score": 80}}
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_old_version_tiers_are_pruned(tmp_path):
+    old_tier = tmp_path / "0123456789abcdef"
+    old_tier.mkdir()
+    (old_tier / "entry.json").write_text("{}")
+    unrelated = tmp_path / "notes"
+    unrelated.mkdir()
+
+    cache = FeedbackCache(cache_dir=str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == sorted([cache.version, "notes"])
+
+    old_tier.mkdir()
+    FeedbackCache(cache_dir=str(tmp_path), prune_old_versions=False)
+    assert old_tier.exists()
@@ -0,0 +1,113 @@
+"""
+NeuroPilot - Lean prompt tests
+Offline checks that lean mode keeps every directive the full prompt gives
+(including scenario-specific length qualifiers) and that recorded replies
+replayed through replay_compare are scored with count_sentences.
+"""
+
+import asyncio
+import re
+
+import pytest
+
+from prompts.lean_replay import MAX_REPLY_SENTENCES, count_sentences, replay_compare
+from prompts.prompt_compiler import COMPILED_PROMPTS, compile_system_prompt, get_static_prefix
+from prompts.prompt_minifier import LENGTH_DIRECTIVE, _directive_key, dedupe_directives, strip_decorations
+
+PREFIXES = sorted(COMPILED_PROMPTS.keys(), key=lambda key: (key[0], key[1] or ""))
+_ADAPT = re.compile(r"ADAPT[^)]*")
+
+# Recorded replies (full prefix, lean prefix) for the same turn
+FIXTURE_TURNS = [
+    {
+        "scenario": "job_interview",
+        "user_message": "um, I guess I'm good with people?",
+        "full_reply": "That's a great strength to have! Can you tell me about a time it helped you at work?",
+        "lean_reply": "That's a real strength! Could you share a time it made a difference at work?"
+    },
+    {
+        "scenario": "office_lunch",
+        "user_message": "yeah",
+        "full_reply": "Cool, cool. Any lunch spots you like around here?",
+        "lean_reply": "Nice. Got a favorite lunch spot nearby?"
+    },
+    {
+        "scenario": "thanksgiving_dinner",
+        "user_message": "My aunt keeps asking about my job and I don't know what to say.",
+        "full_reply": "Oh, that can feel like a lot! You could just say you're figuring things out. "
+                      "Want to practice a quick answer together?",
+        "lean_reply": "That can feel like a lot! Saying you're still figuring it out works fine. "
+                      "Want to try a short answer together?"
+    },
+    {
+        "scenario": "networking_event",
+        "user_message": "Hi, I'm new to the industry and trying to meet people.",
+        "full_reply": "Welcome! What got you interested in this field?",
+        "lean_reply": "Welcome! What drew you to this field?"
+    }
+]
+
+
+def _lines(prompt: str) -> list:
+    return strip_decorations(prompt).split("\n")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", 0),
+    ("Hi there!", 1),
+    ("Nice. Got a favorite lunch spot nearby?", 2),
+    ("Wow... really?! Tell me more", 3),
+])
+def test_count_sentences(text, expected):
+    assert count_sentences(text) == expected
+
+
+@pytest.mark.parametrize("scenario_key, avatar_id", PREFIXES)
+def test_lean_prefix_keeps_every_directive(scenario_key, avatar_id):
+    full = _lines(get_static_prefix(scenario_key, avatar_id))
+    lean = get_static_prefix(scenario_key, avatar_id, lean=True)
+    lean_keys = {_directive_key(line) for line in lean.split("\n")}
+
+    # The governing length rule survives
+    assert "KEEP RESPONSES VERY SHORT - 2-3 SENTENCES MAXIMUM!" in lean
+    for line in full:
+        if LENGTH_DIRECTIVE.search(line):
+            # Restated length rules keep their scenario-specific qualifier
+            for qualifier in _ADAPT.findall(line):
+                assert qualifier.strip() in lean
+        elif _directive_key(line):
+            assert _directive_key(line) in lean_keys
+
+
+def test_restated_length_rule_keeps_qualifier():
+    text = ("KEEP RESPONSES VERY SHORT - 2-3 SENTENCES MAXIMUM!\n"
+            "- Keep responses SHORT (2-3 sentences max)\n"
+            "- Keep responses concise (2-4 sentences, ADAPT to their length)")
+    deduped, removed = dedupe_directives(text)
+    assert deduped.split("\n") == [
+        "KEEP RESPONSES VERY SHORT - 2-3 SENTENCES MAXIMUM!",
+        "- Keep responses concise (ADAPT to their length)"
+    ]
+    assert removed == ["- Keep responses SHORT (2-3 sentences max)",
+                       "- Keep responses concise (2-4 sentences, ADAPT to their length)"]
+
+
+def test_replay_fixture_transcripts():
+    lean_prompts = {turn["scenario"]: compile_system_prompt(turn["scenario"], lean=True) for turn in FIXTURE_TURNS}
+    replies = {(turn["scenario"], turn["user_message"]): turn for turn in FIXTURE_TURNS}
+
+    async def generate(system_prompt, user_prompt):
+        for (scenario, message), turn in replies.items():
+            if user_prompt.endswith(message):
+                mode = "lean_reply" if system_prompt == lean_prompts[scenario] else "full_reply"
+                return {"content": turn[mode]}
+        raise AssertionError(f"Unexpected turn: {user_prompt}")
+
+    report = asyncio.run(replay_compare(FIXTURE_TURNS, generate))
+    summary = report["summary"]
+    assert summary["turns"] == len(FIXTURE_TURNS)
+    assert summary["lean_input_tokens"] < summary["full_input_tokens"]
+    assert summary["full_length_adherence"] == summary["lean_length_adherence"] == 1.0
+    for result, turn in zip(report["turns"], FIXTURE_TURNS):
+        assert result["lean_sentences"] == count_sentences(turn["lean_reply"]) <= MAX_REPLY_SENTENCES
+        assert result["full_sentences"] == count_sentences(turn["full_reply"])
@@ -0,0 +1,125 @@
+"""
+NeuroPilot - LLM scheduler tests
+Priority ordering, token-bucket refill and 429 backoff against the mock provider.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.llm_scheduler import LLMScheduler, Priority, RateLimitError, TokenBucket
+from backend.mock_providers import MockLLMProvider
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2.0, capacity=10.0, now=0.0)
+    assert bucket.wait_time(10, 0.0) == 0.0
+    bucket.consume(10, 0.0)
+    assert bucket.wait_time(4, 0.0) == pytest.approx(2.0)
+    assert bucket.wait_time(4, 1.0) == pytest.approx(1.0)
+    assert bucket.wait_time(4, 2.0) == 0.0
+    # Refill never exceeds capacity, and oversized requests wait for a full bucket
+    assert bucket.wait_time(50, 100.0) == 0.0
+    assert bucket.tokens == pytest.approx(10.0)
+
+
+def test_token_bucket_block_delays_capacity():
+    bucket = TokenBucket(rate=1.0, capacity=5.0, now=0.0)
+    bucket.block(3.0, 0.0)
+    assert bucket.wait_time(1, 1.0) == pytest.approx(2.0)
+    assert bucket.wait_time(1, 3.0) == 0.0
+
+
+def test_jobs_are_served_by_priority():
+    async def scenario():
+        scheduler = LLMScheduler()
+        scheduler.add_provider("groq", requests_per_minute=6000, tokens_per_minute=1_000_000, max_concurrency=1)
+        provider = MockLLMProvider(latency=0.0, jitter=0.0)
+        order = []
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+            return "blocker"
+
+        def call(label):
+            async def run():
+                order.append(label)
+                return await provider.complete("system", label)
+            return run
+
+        first = asyncio.create_task(scheduler.submit("groq", blocker, Priority.PROGRESS))
+        await asyncio.sleep(0.01)  # The blocker now holds the only slot
+        queued = [
+            asyncio.create_task(scheduler.submit("groq", call(label), priority))
+            for label, priority in (("progress", Priority.PROGRESS), ("summary", Priority.SUMMARY),
+                                    ("feedback", Priority.FEEDBACK), ("live", Priority.LIVE_REPLY),
+                                    ("feedback2", Priority.FEEDBACK))
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(first, *queued)
+        await scheduler.close()
+        return order
+
+    assert asyncio.run(scenario()) == ["live", "feedback", "feedback2", "summary", "progress"]
+
+
+def test_rate_limited_call_backs_off_and_retries():
+    async def scenario():
+        scheduler = LLMScheduler(max_retries=3)
+        scheduler.add_provider("groq", requests_per_minute=6000, tokens_per_minute=1_000_000)
+        provider = MockLLMProvider(latency=0.0, jitter=0.0)
+        attempts = []
+        loop = asyncio.get_running_loop()
+
+        async def flaky():
+            attempts.append(loop.time())
+            if len(attempts) == 1:
+                raise RateLimitError("429", retry_after=0.2)
+            return await provider.complete("system", "hello")
+
+        result = await scheduler.submit("groq", flaky, Priority.LIVE_REPLY)
+        metrics = scheduler.metrics()["groq"]
+        await scheduler.close()
+        return result, attempts, metrics
+
+    result, attempts, metrics = asyncio.run(scenario())
+    assert result["content"]
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.19  # Waited out retry_after before retrying
+    assert metrics["rate_limited"] == 1
+    assert metrics["retries"] == 1
+    assert metrics["completed"] == 1
+
+
+def test_rate_limit_error_after_max_retries():
+    async def scenario():
+        scheduler = LLMScheduler(max_retries=2)
+        scheduler.add_provider("groq", requests_per_minute=6000, tokens_per_minute=1_000_000)
+        provider = MockLLMProvider(latency=0.0, jitter=0.0, rate_limit_probability=1.0, retry_after=0.01)
+        try:
+            with pytest.raises(RateLimitError):
+                await scheduler.submit("groq", lambda: provider.complete("system", "hello"))
+        finally:
+            await scheduler.close()
+        return provider.calls
+
+    assert asyncio.run(scenario()) == 3
+
+
+def test_cancelled_call_resolves_caller():
+    async def scenario():
+        scheduler = LLMScheduler()
+        scheduler.add_provider("groq")
+
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        try:
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(scheduler.submit("groq", cancelled), timeout=1.0)
+        finally:
+            await scheduler.close()
+
+    asyncio.run(scenario())